@@ -0,0 +1,117 @@
+"""Helpers shared by the benchmark scripts."""
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Backend name -> directory of the Python analysis server
+BACKENDS = {
+    'lightweight': os.path.join(ROOT_DIR, 'inceptoAI--Backend-Py-lightweight'),
+    'deepface': os.path.join(ROOT_DIR, 'inceptoAI--Backend-Py-uses Deep Face'),
+}
+
+# Package shared by both backends (interview_core), if it is not installed
+CORE_DIR = os.path.join(ROOT_DIR, 'inceptoAI--Backend-Py-core')
+
+
+def use_backend(name):
+    """Make the modules of one backend importable and run from its directory."""
+    backend_dir = BACKENDS[name]
+    sys.path.insert(0, CORE_DIR)
+    sys.path.insert(0, backend_dir)
+    os.chdir(backend_dir)
+    return backend_dir
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of a list of numbers."""
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+        result[f"p{p}"] = ordered[rank]
+    return result
+
+
+def write_report(name, results, output=None, **metadata):
+    """Print (or save) a machine-readable benchmark report."""
+    report = {
+        'benchmark': name,
+        'created_at': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        **metadata,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2, default=float)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+    return report
+
+
+FIXTURES_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures')
+
+
+def load_fixtures(fixtures_dir=None, faces=None):
+    """
+    Load the JPEG frame fixtures listed in the fixtures manifest.
+
+    The default fixtures (drawn faces, see fixtures/make_fixtures.py) are
+    generated on first use.
+
+    Args:
+        fixtures_dir: Directory holding manifest.json and the JPEG files
+        faces: Only keep fixtures with this many faces
+
+    Returns:
+        List of manifest entries, each with the JPEG bytes under 'data'
+    """
+    fixtures_dir = fixtures_dir or FIXTURES_DIR
+    manifest_path = os.path.join(fixtures_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        if fixtures_dir != FIXTURES_DIR:
+            raise SystemExit(
+                f"No fixtures found in {fixtures_dir}. Generate them with: "
+                f"python benchmarks/fixtures/make_fixtures.py --output {fixtures_dir}"
+            )
+        from fixtures.make_fixtures import generate
+        generate(fixtures_dir)
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    fixtures = []
+    for entry in manifest:
+        if faces is not None and entry['faces'] != faces:
+            continue
+        with open(os.path.join(fixtures_dir, entry['file']), 'rb') as f:
+            fixtures.append({**entry, 'data': f.read()})
+    return fixtures
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
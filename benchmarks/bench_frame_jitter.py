@@ -0,0 +1,167 @@
+"""
+Frame latency jitter with pooled buffers vs the former forced collections.
+
+Runs the frames of one session through SessionDataStore._process_frame
+while other live sessions hold recorded interview data on the heap (which
+is what makes a full collection expensive). Two modes, each in a fresh
+process:
+- pooled: the current pipeline (pooled decode/resize/gray/equalize
+  buffers, no forced collections)
+- legacy: buffers allocated per frame and gc.collect() every 10 frames and
+  on every frame without a face, as the lightweight backend used to do
+
+Reported per mode: latency p50/p95/p99/p99.9/max and standard deviation,
+plus the number and total time of garbage collector runs.
+
+Usage:
+    python benchmarks/bench_frame_jitter.py --live-sessions 50 --frames 2000
+    python benchmarks/bench_frame_jitter.py --backend deepface --frames 300 --output jitter.json
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from _common import load_fixtures, percentiles, use_backend, write_report
+
+BACKENDS = ['deepface', 'lightweight']
+EMOTIONS = ['happy', 'sad', 'angry', 'fear', 'surprise', 'neutral', 'disgust']
+
+
+def fill_session(store, frames):
+    """Record `frames` synthetic results into a session, like a live interview accumulates."""
+    for frame_id in range(frames):
+        emotions = {emotion: float((frame_id * 7 + i) % 100) for i, emotion in enumerate(EMOTIONS)}
+        store._record_frame(frame_id, frame_id // 300 + 1, emotions, 50.0)
+
+
+def legacy_process_frame(store):
+    """Wrap _process_frame with the forced collections the lightweight backend used to run."""
+    process_frame = store._process_frame
+
+    def wrapper(frame_data, frame_id, question_number, trace=None):
+        recorded = len(store.session_data['emotion_analysis']['timestamps'])
+        process_frame(frame_data, frame_id, question_number, trace)
+        if len(store.session_data['emotion_analysis']['timestamps']) == recorded:
+            gc.collect()  # no face (or failed)
+        elif int(frame_id) % 10 == 0:
+            gc.collect()
+
+    return wrapper
+
+
+def run_worker(args):
+    """Measure one mode in this process and print the results as JSON."""
+    payloads = [fixture['data'] for fixture in load_fixtures(args.fixtures) if fixture['width'] <= 1280]
+
+    use_backend(args.backend)
+    os.environ['MODEL_WARMUP'] = 'false'
+    from models.session_data_store import SessionDataStore
+
+    live_sessions = [SessionDataStore(f'live-{i}') for i in range(args.live_sessions)]
+    for store in live_sessions:
+        fill_session(store, args.recorded_frames)
+
+    store = SessionDataStore('jitter-benchmark')
+    if args.mode == 'legacy':
+        store.analyzer.buffers.reuse = False
+        process_frame = legacy_process_frame(store)
+    else:
+        process_frame = store._process_frame
+
+    gc_runs = []
+    gc_started = {}
+
+    def on_gc(phase, info):
+        if phase == 'start':
+            gc_started['at'] = time.perf_counter()
+        elif 'at' in gc_started:
+            gc_runs.append((info['generation'], time.perf_counter() - gc_started.pop('at')))
+
+    # Warm up caches and models before measuring
+    for frame_id, payload in enumerate(payloads):
+        store._process_frame(payload, frame_id, 0)
+
+    gc.callbacks.append(on_gc)
+    latencies = []
+    for frame_id in range(args.frames):
+        start = time.perf_counter()
+        process_frame(payloads[frame_id % len(payloads)], frame_id, 1)
+        latencies.append(time.perf_counter() - start)
+    gc.callbacks.remove(on_gc)
+
+    latency_ms = {
+        key: value * 1000 for key, value in percentiles(latencies, points=(50, 95, 99, 99.9)).items()
+    }
+    latency_ms['max'] = max(latencies) * 1000
+    latency_ms['stdev'] = statistics.pstdev(latencies) * 1000
+
+    print(json.dumps({
+        'mode': args.mode,
+        'frames': args.frames,
+        'latency_ms': latency_ms,
+        'gc_runs': {
+            str(generation): sum(1 for g, _ in gc_runs if g == generation) for generation in (0, 1, 2)
+        },
+        'gc_seconds': sum(seconds for _, seconds in gc_runs),
+        'buffer_allocations': store.analyzer.buffers.allocations,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=BACKENDS, default='lightweight')
+    parser.add_argument('--modes', choices=['pooled', 'legacy'], nargs='+', default=['legacy', 'pooled'])
+    parser.add_argument('--frames', type=int, default=1000, help="Measured frames")
+    parser.add_argument('--live-sessions', type=int, default=20, help="Other sessions holding data on the heap")
+    parser.add_argument('--recorded-frames', type=int, default=3000, help="Frames recorded in each live session")
+    parser.add_argument('--fixtures', help="Fixtures directory (defaults to benchmarks/fixtures)")
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        args.fixtures = os.path.abspath(args.fixtures)
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    results = []
+    for mode in args.modes:
+        command = [
+            sys.executable, os.path.abspath(__file__), '--worker',
+            '--mode', mode,
+            '--backend', args.backend,
+            '--frames', str(args.frames),
+            '--live-sessions', str(args.live_sessions),
+            '--recorded-frames', str(args.recorded_frames),
+        ]
+        if args.fixtures:
+            command += ['--fixtures', args.fixtures]
+
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            sys.stderr.write(completed.stderr)
+            raise SystemExit(f"Benchmark run in {mode} mode failed")
+
+        # The server logs to stdout as well; the result is the last line
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    write_report(
+        'frame_jitter',
+        results,
+        output=os.path.abspath(args.output) if args.output else None,
+        backend=args.backend,
+        live_sessions=args.live_sessions,
+        recorded_frames_per_session=args.recorded_frames,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+End-to-end frame pipeline benchmark for the analysis servers.
+
+Pushes the JPEG fixtures through the real Socket.IO `frame` handler
+(handle_frame -> add_frame -> _process_frame) of one backend, for several
+numbers of simulated concurrent interviews. Every session count runs in a
+fresh process so that peak RSS is attributable to that run.
+
+Reported per run: frames per second, p50/p95/p99 latency of each stage
+(ingest, decode, detect, classify, record), peak RSS and CPU seconds per session.
+
+Usage:
+    python benchmarks/bench_frame_pipeline.py --backend lightweight --sessions 1 10 50
+    python benchmarks/bench_frame_pipeline.py --backend deepface --frames 50 --fps 10 --output deepface.json
+"""
+import argparse
+import base64
+import json
+import os
+import subprocess
+import sys
+import time
+
+from _common import current_rss_mb, load_fixtures, peak_rss_mb, percentiles, use_backend, write_report
+
+BACKENDS = ['deepface', 'lightweight']
+
+# Stages timed by SessionDataStore._stage. With DEEPFACE_DETECTION=deepface
+# the face is detected inside DeepFace.analyze, so there are no detect samples.
+STAGES = ['decode', 'detect', 'classify', 'record']
+
+
+def summarize(samples):
+    """Latency summary in milliseconds."""
+    if not samples:
+        return None
+    summary = {key: value * 1000 for key, value in percentiles(samples).items()}
+    summary['mean'] = sum(samples) / len(samples) * 1000
+    summary['count'] = len(samples)
+    return summary
+
+
+def instrument(store, samples, cpu_seconds):
+    """Wrap the stage timer of one store to record stage latency, and _process_frame for CPU time."""
+    stage_timer = store._stage
+
+    class TimedStage:
+        def __init__(self, name, trace=None):
+            self.name = name
+            self.inner = stage_timer(name, trace)
+
+        def __enter__(self):
+            self.start = time.perf_counter()
+            return self.inner.__enter__()
+
+        def __exit__(self, *exc_info):
+            samples[self.name].append(time.perf_counter() - self.start)
+            return self.inner.__exit__(*exc_info)
+
+    store._stage = TimedStage
+
+    process_frame = store._process_frame
+
+    def process_with_cpu(*args, **kwargs):
+        start = time.thread_time()
+        try:
+            return process_frame(*args, **kwargs)
+        finally:
+            cpu_seconds[store.session_id] = cpu_seconds.get(store.session_id, 0.0) + time.thread_time() - start
+
+    store._process_frame = process_with_cpu
+
+
+def connect_session(app, socketio, config):
+    """Connect one simulated client and return (client, its session store)."""
+    before = set(config.session_data_stores)
+    client = socketio.test_client(app)
+    session_id = (set(config.session_data_stores) - before).pop()
+    return client, config.session_data_stores[session_id]
+
+
+def run_worker(args):
+    """Run one session count in this process and print its results as JSON."""
+    fixtures = load_fixtures(args.fixtures)
+    payloads = [
+        "data:image/jpeg;base64," + base64.b64encode(fixture['data']).decode('ascii')
+        for fixture in fixtures
+    ]
+
+    use_backend(args.backend)
+    import config
+    from server import create_app
+
+    app, socketio = create_app()
+
+    # Warm up models on a throwaway session before measuring
+    client, store = connect_session(app, socketio, config)
+    for payload in payloads:
+        client.emit('frame', {'frameId': 0, 'frame': payload, 'questionNumber': 0}, callback=True)
+    store.frame_queue.join()
+    client.disconnect()
+
+    baseline_rss = current_rss_mb()
+    samples = {stage: [] for stage in ['ingest', *STAGES]}
+    cpu_seconds = {}
+
+    sessions = [connect_session(app, socketio, config) for _ in range(args.sessions)]
+    for _, store in sessions:
+        instrument(store, samples, cpu_seconds)
+
+    process_cpu_start = time.process_time()
+    start = time.perf_counter()
+    interval = 1.0 / args.fps if args.fps else 0
+
+    for frame_id in range(args.frames):
+        due = start + frame_id * interval
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        for client, _ in sessions:
+            payload = payloads[frame_id % len(payloads)]
+            sent = time.perf_counter()
+            client.emit('frame', {'frameId': frame_id, 'frame': payload, 'questionNumber': 1}, callback=True)
+            samples['ingest'].append(time.perf_counter() - sent)
+
+    for _, store in sessions:
+        store.frame_queue.join()
+
+    wall_seconds = time.perf_counter() - start
+    process_cpu_seconds = time.process_time() - process_cpu_start
+    peak_rss = peak_rss_mb()
+
+    recorded = sum(len(store.session_data['emotion_analysis']['timestamps']) for _, store in sessions)
+    for client, _ in sessions:
+        client.disconnect()
+
+    frames_total = args.frames * args.sessions
+    result = {
+        'sessions': args.sessions,
+        'frames_total': frames_total,
+        'frames_with_face': recorded,
+        'wall_seconds': wall_seconds,
+        'frames_per_second': frames_total / wall_seconds if wall_seconds else None,
+        'latency_ms': {stage: summarize(values) for stage, values in samples.items()},
+        'peak_rss_mb': peak_rss,
+        'baseline_rss_mb': baseline_rss,
+        'rss_per_session_mb': max(0.0, peak_rss - baseline_rss) / args.sessions,
+        'cpu_seconds_per_session': sum(cpu_seconds.values()) / args.sessions,
+        'process_cpu_seconds': process_cpu_seconds,
+    }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=BACKENDS, default='lightweight')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--frames', type=int, default=100, help="Frames sent by each session")
+    parser.add_argument('--fps', type=float, default=0, help="Frames per second per session (0 = as fast as possible)")
+    parser.add_argument('--fixtures', help="Fixtures directory (defaults to benchmarks/fixtures)")
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        args.fixtures = os.path.abspath(args.fixtures)
+
+    if args.worker:
+        args.sessions = args.sessions[0]
+        run_worker(args)
+        return
+
+    fixtures = load_fixtures(args.fixtures)
+    results = []
+    for session_count in args.sessions:
+        command = [
+            sys.executable, os.path.abspath(__file__), '--worker',
+            '--backend', args.backend,
+            '--sessions', str(session_count),
+            '--frames', str(args.frames),
+            '--fps', str(args.fps),
+        ]
+        if args.fixtures:
+            command += ['--fixtures', args.fixtures]
+
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            sys.stderr.write(completed.stderr)
+            raise SystemExit(f"Benchmark run with {session_count} sessions failed")
+
+        # The server logs to stdout as well; the result is the last line
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    write_report(
+        'frame_pipeline',
+        results,
+        output=os.path.abspath(args.output) if args.output else None,
+        backend=args.backend,
+        frames_per_session=args.frames,
+        fps=args.fps,
+        fixtures=[{key: value for key, value in fixture.items() if key != 'data'} for fixture in fixtures],
+    )
+
+
+if __name__ == '__main__':
+    main()
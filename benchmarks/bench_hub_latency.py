@@ -0,0 +1,241 @@
+"""
+Latency of the eventlet hub while sessions stream frames.
+
+Starts an analysis server in a subprocess (or uses --url), then polls
+GET /status a few times per second:
+- idle: no session streams
+- streaming: --sessions Socket.IO clients stream JPEG fixtures at --fps
+
+Frame analysis runs on OS threads (interview_core.offload), so /status must stay
+fast while the sessions stream. The run fails (exit status 1) when the p99
+/status latency while streaming is above --max-p99-ms, so it can be used as
+a regression test; the shared package's test suite also runs it with 20
+sessions and a p95 bound (inceptoAI--Backend-Py-core/tests/test_hub_latency.py,
+marked slow).
+
+Reported per phase: /status latency p50/p95/p99/max and request count, plus
+frame acks (count and p50/p99 latency) while streaming.
+
+Usage:
+    python benchmarks/bench_hub_latency.py --backend lightweight --sessions 20
+    python benchmarks/bench_hub_latency.py --url http://127.0.0.1:5000 --max-p99-ms 50 --output hub.json
+"""
+import argparse
+import base64
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from _common import load_fixtures, percentiles, use_backend, write_report
+
+BACKENDS = ['deepface', 'lightweight']
+
+
+def serve(args):
+    """Run the analysis server of one backend in this process."""
+    use_backend(args.backend)
+    import server
+
+    app, socketio = server.create_app()
+    socketio.run(app, host='127.0.0.1', port=args.port, debug=False, use_reloader=False, log_output=False)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args):
+    """Start the server subprocess and wait until /status answers."""
+    import requests
+
+    port = free_port()
+    command = [sys.executable, os.path.abspath(__file__), '--serve', '--backend', args.backend, '--port', str(port)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+
+    deadline = time.perf_counter() + args.startup_timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with status {process.returncode}")
+        try:
+            if requests.get(url + '/status', timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+
+    process.kill()
+    raise SystemExit(f"Server did not answer within {args.startup_timeout} s")
+
+
+class StatusPoller:
+    """Polls /status on its own thread and records the latencies."""
+
+    def __init__(self, url, interval):
+        import requests
+
+        self.http = requests.Session()
+        self.url = url + '/status'
+        self.interval = interval
+        self.latencies = []
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            try:
+                ok = self.http.get(self.url, timeout=10).ok
+            except Exception:
+                ok = False
+            self.latencies.append(time.perf_counter() - start)
+            self.errors += 0 if ok else 1
+            self._stop.wait(max(0.0, self.interval - (time.perf_counter() - start)))
+
+    def measure(self, seconds):
+        self.latencies, self.errors = [], 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        time.sleep(seconds)
+        self._stop.set()
+        self._thread.join()
+        return self.summary()
+
+    def summary(self):
+        latency_ms = {key: value * 1000 for key, value in percentiles(self.latencies, (50, 95, 99)).items()}
+        latency_ms['max'] = max(self.latencies) * 1000 if self.latencies else None
+        return {'requests': len(self.latencies), 'errors': self.errors, 'latency_ms': latency_ms}
+
+
+class StreamingSession:
+    """One Socket.IO client streaming frames at a fixed rate."""
+
+    def __init__(self, url, payloads, fps, offset):
+        import socketio
+
+        self.url = url
+        self.payloads = payloads
+        self.fps = fps
+        self.offset = offset
+        self.sio = socketio.Client(reconnection=False)
+        self.ack_latencies = []
+        self.ack_errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.sio.connect(self.url, transports=['websocket'])
+        self._thread.start()
+
+    def _run(self):
+        frame_id = 0
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            sent = time.perf_counter()
+
+            def on_ack(response=None, sent=sent):
+                self.ack_latencies.append(time.perf_counter() - sent)
+                if not isinstance(response, dict) or response.get('status') != 'success':
+                    self.ack_errors += 1
+
+            payload = self.payloads[(self.offset + frame_id) % len(self.payloads)]
+            self.sio.emit('frame', {'frameId': frame_id, 'frame': payload, 'questionNumber': 1}, callback=on_ack)
+            frame_id += 1
+            self._stop.wait(max(0.0, start + frame_id / self.fps - time.perf_counter()))
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sio.disconnect()
+
+
+def run(args):
+    payloads = [
+        'data:image/jpeg;base64,' + base64.b64encode(fixture['data']).decode('ascii')
+        for fixture in load_fixtures(args.fixtures)
+    ]
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(args)
+
+    try:
+        poller = StatusPoller(url, args.interval)
+        results = [{'phase': 'idle', 'status': poller.measure(args.seconds)}]
+
+        sessions = [StreamingSession(url, payloads, args.fps, i) for i in range(args.sessions)]
+        for session in sessions:
+            session.start()
+        # Let the sessions reach a steady state before measuring
+        time.sleep(args.settle)
+        status = poller.measure(args.seconds)
+        for session in sessions:
+            session.stop()
+
+        acks = [latency for session in sessions for latency in session.ack_latencies]
+        results.append({
+            'phase': 'streaming',
+            'status': status,
+            'frames': {
+                'acked': len(acks),
+                'errors': sum(session.ack_errors for session in sessions),
+                'ack_latency_ms': {key: value * 1000 for key, value in percentiles(acks, (50, 99)).items()},
+            },
+        })
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    write_report(
+        'hub_latency',
+        results,
+        output=os.path.abspath(args.output) if args.output else None,
+        backend=None if args.url else args.backend,
+        sessions=args.sessions,
+        fps=args.fps,
+        max_p99_ms=args.max_p99_ms,
+    )
+
+    p99 = results[-1]['status']['latency_ms']['p99']
+    if p99 is None or p99 > args.max_p99_ms or results[-1]['status']['errors']:
+        raise SystemExit(f"/status p99 while streaming is {p99} ms, expected at most {args.max_p99_ms} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=BACKENDS, default='lightweight')
+    parser.add_argument('--url', help="Use this running server instead of starting one")
+    parser.add_argument('--sessions', type=int, default=20, help="Sessions streaming frames")
+    parser.add_argument('--fps', type=float, default=10.0, help="Frames per second per session")
+    parser.add_argument('--seconds', type=float, default=20.0, help="Measured seconds per phase")
+    parser.add_argument('--settle', type=float, default=3.0, help="Seconds of streaming before measuring")
+    parser.add_argument('--interval', type=float, default=0.1, help="Seconds between /status requests")
+    parser.add_argument('--max-p99-ms', type=float, default=100.0, help="Fail above this /status p99 while streaming")
+    parser.add_argument('--startup-timeout', type=float, default=120.0)
+    parser.add_argument('--fixtures', help="Fixtures directory (defaults to benchmarks/fixtures)")
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        args.fixtures = os.path.abspath(args.fixtures)
+
+    if args.serve:
+        serve(args)
+        return
+
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
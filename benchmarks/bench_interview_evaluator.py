@@ -0,0 +1,184 @@
+"""
+Benchmark the InterviewEvaluator metric layer on large sessions.
+
+Compares the previous dict-by-dict metric code with the NumPy metric layer,
+checks that both give identical results and reports timings as JSON.
+
+Usage:
+    python benchmarks/bench_interview_evaluator.py --backend lightweight
+    python benchmarks/bench_interview_evaluator.py --frames 10000 100000 1000000 --output eval.json
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from _common import use_backend, write_report
+
+EMOTIONS = ("happy", "sad", "angry", "fear", "surprise", "neutral", "disgust")
+
+
+# ========== Previous implementation, kept as the reference ==========
+
+def legacy_emotional_balance(emotions):
+    positive = emotions.get('happy', 0) + emotions.get('surprise', 0) * 0.5
+    negative = emotions.get('sad', 0) + emotions.get('angry', 0) + emotions.get('fear', 0) + emotions.get('disgust', 0)
+    neutral = emotions.get('neutral', 0)
+    return min(100, max(0, (positive * 0.6 + neutral * 0.4 - negative * 0.8) * 10))
+
+
+def legacy_engagement_score(emotion_analysis):
+    timestamps = emotion_analysis.get('timestamps', [])
+    if not timestamps:
+        return 0
+    emotion_values = []
+    for emotion, values in emotion_analysis.get('detailed_emotions', {}).items():
+        if values:
+            values_only = [v.get('value', 0) for v in values]
+            if values_only:
+                emotion_values.extend(values_only)
+    if emotion_values:
+        variation = np.std(emotion_values) * 100
+        return min(100, max(0, 50 + variation * 2))
+    return 50
+
+
+def legacy_stress_indicator(emotions):
+    stress_score = (
+        emotions.get('fear', 0) * 0.4 +
+        emotions.get('angry', 0) * 0.3 +
+        emotions.get('sad', 0) * 0.2 +
+        emotions.get('disgust', 0) * 0.1
+    ) * 100
+    return min(100, max(0, stress_score))
+
+
+def legacy_emotion_metrics(emotion_analysis):
+    return {
+        "confidence_score": emotion_analysis.get('average_confidence', 0),
+        "emotional_balance": legacy_emotional_balance(emotion_analysis.get('average_emotions', {})),
+        "engagement_score": legacy_engagement_score(emotion_analysis),
+        "stress_indicator": legacy_stress_indicator(emotion_analysis.get('average_emotions', {})),
+    }
+
+
+# ========== Synthetic sessions ==========
+
+def make_session(frame_count, seed=0, pool_size=4096):
+    """
+    Build a session_data dict with `frame_count` recorded frames.
+
+    Frame entries are drawn from a fixed pool of dicts so that sessions with
+    a million frames fit in memory; the metric code reads them the same way.
+    """
+    rng = random.Random(seed)
+    pools = {
+        emotion: [
+            {'value': rng.uniform(0, 100), 'question': 1 + i % 5, 'frame_id': i, 'timestamp': '2026-01-01T00:00:00'}
+            for i in range(pool_size)
+        ]
+        for emotion in EMOTIONS
+    }
+    detailed = {emotion: [pool[i % pool_size] for i in range(frame_count)] for emotion, pool in pools.items()}
+    timestamps = [{'frame_id': i, 'question': 1, 'timestamp': '2026-01-01T00:00:00'} for i in range(min(frame_count, pool_size))]
+    timestamps = [timestamps[i % len(timestamps)] for i in range(frame_count)]
+
+    averages = {emotion: sum(v['value'] for v in pools[emotion]) / pool_size / 100 for emotion in EMOTIONS}
+    return {
+        'session_id': f"bench_{seed}",
+        'responses': {
+            str(q): {'question_number': q, 'answer': "I designed and tested the solution. It worked well! " * q}
+            for q in range(1, 6)
+        },
+        'emotion_analysis': {
+            'average_emotions': averages,
+            'average_confidence': rng.uniform(0, 100),
+            'detailed_emotions': detailed,
+            'confidence_signals': [],
+            'timestamps': timestamps,
+        },
+    }
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('lightweight', 'deepface'), default='lightweight')
+    parser.add_argument('--frames', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--batch-sessions', type=int, default=100, help="Sessions scored by the batch API")
+    parser.add_argument('--batch-frames', type=int, default=1_000, help="Frames per session in the batch run")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    use_backend(args.backend)
+    from models.interview_evaluator import InterviewEvaluator
+
+    results = []
+    for frame_count in args.frames:
+        session = make_session(frame_count)
+        emotion_analysis = session['emotion_analysis']
+
+        legacy_time, legacy = timed(lambda: legacy_emotion_metrics(emotion_analysis), args.repeat)
+        vector_time, vector = timed(lambda: InterviewEvaluator.calculate_emotion_metrics(emotion_analysis), args.repeat)
+
+        # Arrays as handed over by the session frame index
+        arrays = InterviewEvaluator.emotion_value_arrays(emotion_analysis)
+        arrays_time, from_arrays = timed(
+            lambda: InterviewEvaluator.calculate_emotion_metrics(emotion_analysis, arrays), args.repeat
+        )
+
+        identical = legacy == vector == from_arrays
+        results.append({
+            'frames': frame_count,
+            'legacy_seconds': legacy_time,
+            'vectorized_seconds': vector_time,
+            'vectorized_from_arrays_seconds': arrays_time,
+            'speedup': legacy_time / vector_time if vector_time else None,
+            'speedup_from_arrays': legacy_time / arrays_time if arrays_time else None,
+            'identical': identical,
+        })
+        if not identical:
+            raise SystemExit(f"Metric mismatch at {frame_count} frames: {legacy} != {vector} / {from_arrays}")
+
+    sessions = [make_session(args.batch_frames, seed=i) for i in range(args.batch_sessions)]
+    loop_time, loop_scores = timed(
+        lambda: [legacy_emotion_metrics(s['emotion_analysis']) for s in sessions], args.repeat
+    )
+    batch_time, batch_scores = timed(lambda: InterviewEvaluator.score_sessions(sessions), args.repeat)
+    batch_identical = loop_scores == [score['emotion_metrics'] for score in batch_scores]
+
+    write_report(
+        'interview_evaluator_metrics',
+        {
+            'single_session': results,
+            'batch': {
+                'sessions': args.batch_sessions,
+                'frames_per_session': args.batch_frames,
+                'legacy_loop_seconds': loop_time,
+                'score_sessions_seconds': batch_time,
+                'identical': batch_identical,
+            },
+        },
+        output=output,
+        backend=args.backend,
+        repeat=args.repeat,
+    )
+    if not batch_identical:
+        raise SystemExit("Batch metric mismatch")
+
+
+if __name__ == '__main__':
+    main()
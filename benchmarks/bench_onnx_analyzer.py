@@ -0,0 +1,219 @@
+"""
+Accuracy parity, throughput and memory of the ONNX Runtime emotion analyzer
+against DeepFace.analyze.
+
+Every variant (deepface, onnx float, onnx int8) runs in a fresh process so
+that its resident memory is attributable to the model it loads. Reported:
+- parity: on the same face crops, DeepFace.analyze(detector_backend='skip')
+  vs the ONNX classifier: dominant emotion agreement and the mean / max
+  absolute score difference in percentage points, plus the same comparison
+  end to end (each analyzer detecting faces itself)
+- throughput: frames per second and latency percentiles of analyze_frame,
+  and classifier-only throughput for batches of face crops (ONNX only)
+- memory: RSS added by loading the model and peak RSS
+
+Export the models first (in the DeepFace backend directory):
+    python -m interview_core.analyzers.export_onnx --quantize static --calibration ../benchmarks/fixtures
+
+Usage:
+    python benchmarks/bench_onnx_analyzer.py
+    python benchmarks/bench_onnx_analyzer.py --variants deepface onnx-int8 --threads 1 4 --repeat 20
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from _common import current_rss_mb, load_fixtures, peak_rss_mb, percentiles, use_backend, write_report
+
+VARIANTS = ['deepface', 'onnx', 'onnx-int8']
+BATCH_SIZES = [1, 8, 32]
+
+
+def decode(frame_data, max_width=640):
+    """Color and grayscale versions of a frame, downscaled like the analyzers do."""
+    import cv2
+    bgr = cv2.imdecode(np.frombuffer(frame_data, np.uint8), cv2.IMREAD_COLOR)
+    height, width = bgr.shape[:2]
+    if width > max_width:
+        scale = max_width / width
+        bgr = cv2.resize(bgr, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    return bgr, cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+
+
+def create_variant(name, threads):
+    """Return (analyzer, classify(bgr, gray, face) -> emotions) for one variant."""
+    if name == 'deepface':
+        from interview_core.analyzers.deepface import DeepFaceAnalyzer
+        from deepface import DeepFace
+
+        def classify(bgr, gray, face):
+            crop = bgr[face['y']:face['y'] + face['h'], face['x']:face['x'] + face['w']]
+            result = DeepFace.analyze(
+                crop, actions=['emotion'], detector_backend='skip', enforce_detection=False, silent=True
+            )
+            result = result[0] if isinstance(result, list) else result
+            return {emotion: float(value) for emotion, value in result['emotion'].items()}
+
+        return DeepFaceAnalyzer(), classify
+
+    from interview_core.analyzers.onnx_runtime import OnnxEmotionAnalyzer
+    analyzer = OnnxEmotionAnalyzer(int8=name == 'onnx-int8', intra_op_threads=threads)
+    return analyzer, lambda bgr, gray, face: analyzer.classify(gray, face)
+
+
+def run_worker(args):
+    """Measure one variant in this process and print the results as JSON."""
+    fixtures = [fixture for fixture in load_fixtures(args.fixtures) if fixture['faces'] > 0]
+    use_backend('deepface')
+    from interview_core.analyzers.detection import detect_faces
+    from interview_core.analyzers.onnx_runtime import preprocess_faces
+
+    baseline_rss = current_rss_mb()
+    analyzer, classify = create_variant(args.variants[0], args.threads[0])
+    analyzer.warm_up()
+    model_rss = current_rss_mb() - baseline_rss
+
+    # Parity inputs: the same crops for every variant, and each analyzer's own end-to-end result
+    crops = []
+    face_batch = []
+    end_to_end = {}
+    for fixture in fixtures:
+        bgr, gray = decode(fixture['data'])
+        faces = detect_faces(gray)
+        if faces:
+            crops.append({'file': fixture['file'], 'emotions': classify(bgr, gray, faces[0])})
+            face_batch.append(preprocess_faces(gray, faces[:1]))
+        analysis = analyzer.analyze_frame(fixture['data'])
+        end_to_end[fixture['file']] = analysis.emotions if analysis is not None else None
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for fixture in fixtures:
+            frame_start = time.perf_counter()
+            analyzer.analyze_frame(fixture['data'])
+            latencies.append(time.perf_counter() - frame_start)
+    wall_seconds = time.perf_counter() - start
+
+    batched = {}
+    if args.variants[0] != 'deepface' and face_batch:
+        face_batch = np.concatenate(face_batch)
+        classifier = {}
+        for batch_size in BATCH_SIZES:
+            batch = np.resize(face_batch, (batch_size,) + face_batch.shape[1:])
+            analyzer.predict(batch)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                analyzer.predict(batch)
+            classifier[batch_size] = batch_size * args.repeat / (time.perf_counter() - start)
+
+        frames = [fixture['data'] for fixture in fixtures]
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            analyzer.analyze_batch(frames)
+        batched = {
+            'classifier_faces_per_second': classifier,
+            'analyze_batch_frames_per_second': len(frames) * args.repeat / (time.perf_counter() - start),
+        }
+
+    print(json.dumps({
+        'variant': args.variants[0],
+        'threads': args.threads[0],
+        'crops': crops,
+        'end_to_end': end_to_end,
+        'frames_per_second': len(latencies) / wall_seconds,
+        'latency_ms': {key: value * 1000 for key, value in percentiles(latencies).items()},
+        'batched': batched,
+        'model_rss_mb': model_rss,
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+
+
+def compare(reference, candidate):
+    """Dominant emotion agreement and absolute score differences between two lists of emotion dicts."""
+    pairs = [(ref, other) for ref, other in zip(reference, candidate) if ref and other]
+    if not pairs:
+        return None
+    differences = [abs(ref[emotion] - other.get(emotion, 0.0)) for ref, other in pairs for emotion in ref]
+    agree = sum(max(ref, key=ref.get) == max(other, key=other.get) for ref, other in pairs)
+    return {
+        'samples': len(pairs),
+        'dominant_agreement': agree / len(pairs),
+        'mean_abs_diff': sum(differences) / len(differences),
+        'max_abs_diff': max(differences),
+    }
+
+
+def parity(reference, result):
+    crops = {crop['file']: crop['emotions'] for crop in result['crops']}
+    files = [crop['file'] for crop in reference['crops'] if crop['file'] in crops]
+    reference_crops = {crop['file']: crop['emotions'] for crop in reference['crops']}
+    return {
+        'classifier': compare([reference_crops[f] for f in files], [crops[f] for f in files]),
+        'end_to_end': compare(
+            [reference['end_to_end'][f] for f in sorted(reference['end_to_end'])],
+            [result['end_to_end'].get(f) for f in sorted(reference['end_to_end'])]
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--variants', choices=VARIANTS, nargs='+', default=VARIANTS)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1], help="ONNX Runtime intra-op thread counts")
+    parser.add_argument('--repeat', type=int, default=10, help="Passes over the fixtures for throughput")
+    parser.add_argument('--fixtures', help="Fixtures directory (defaults to benchmarks/fixtures)")
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        args.fixtures = os.path.abspath(args.fixtures)
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    runs = [(variant, 0) for variant in args.variants if variant == 'deepface']
+    runs += [(variant, threads) for variant in args.variants if variant != 'deepface' for threads in args.threads]
+
+    results = []
+    for variant, threads in runs:
+        command = [
+            sys.executable, os.path.abspath(__file__), '--worker',
+            '--variants', variant,
+            '--threads', str(threads),
+            '--repeat', str(args.repeat),
+        ]
+        if args.fixtures:
+            command += ['--fixtures', args.fixtures]
+
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            sys.stderr.write(completed.stderr)
+            raise SystemExit(f"Benchmark run of {variant} failed")
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    reference = next((result for result in results if result['variant'] == 'deepface'), None)
+    for result in results:
+        if reference is not None and result is not reference:
+            result['parity_vs_deepface'] = parity(reference, result)
+        # Per-fixture scores are only needed for the parity comparison
+        result.pop('crops')
+        result.pop('end_to_end')
+
+    write_report(
+        'onnx_analyzer',
+        results,
+        output=os.path.abspath(args.output) if args.output else None,
+        repeat=args.repeat,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Startup-time benchmark for the analysis servers.
+
+Every run starts a fresh interpreter and measures, for one backend:
+- import: importing the server module (and everything it pulls in)
+- create_app: building the Flask/Socket.IO app
+- ready: time from process start until the analyzer model is warm, with
+  the background warm-up enabled (MODEL_WARMUP=true)
+- first_frame / second_frame: analysis time of the first two frames of a
+  session, which shows the model-load stall a cold worker hands to its
+  first candidate (MODEL_WARMUP=false) and that warming removes it
+
+Usage:
+    python benchmarks/bench_startup.py --backend deepface --runs 3
+    python benchmarks/bench_startup.py --backend lightweight --warmup off --output startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from _common import load_fixtures, peak_rss_mb, percentiles, use_backend, write_report
+
+BACKENDS = ['deepface', 'lightweight']
+
+
+def run_worker(args):
+    """Measure one startup in this process and print the results as JSON."""
+    process_start = time.perf_counter()
+    fixture = load_fixtures(args.fixtures, faces=1)[0]['data']
+
+    use_backend(args.backend)
+    os.environ['MODEL_WARMUP'] = 'true' if args.warmup == 'on' else 'false'
+
+    start = time.perf_counter()
+    import server
+    import_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    server.create_app()
+    create_app_seconds = time.perf_counter() - start
+
+    from interview_core.analyzers.warmup import model_warmup
+    from models.session_data_store import SessionDataStore
+
+    ready_seconds = None
+    if args.warmup == 'on':
+        if not model_warmup.wait(args.timeout):
+            raise SystemExit(f"Analyzer not warm after {args.timeout} s: {model_warmup.snapshot()}")
+        ready_seconds = time.perf_counter() - process_start
+
+    store = SessionDataStore('startup-benchmark')
+    frame_seconds = []
+    for _ in range(2):
+        start = time.perf_counter()
+        store.analyzer.analyze_frame(fixture)
+        frame_seconds.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        'import_seconds': import_seconds,
+        'create_app_seconds': create_app_seconds,
+        'ready_seconds': ready_seconds,
+        'warmup_seconds': model_warmup.seconds,
+        'first_frame_seconds': frame_seconds[0],
+        'second_frame_seconds': frame_seconds[1],
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+
+
+def heavy_modules_loaded(args):
+    """Heavy modules imported by `import server` alone, checked in a separate interpreter."""
+    code = (
+        "import sys, os\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+        "from _common import use_backend\n"
+        f"use_backend({args.backend!r})\n"
+        "os.environ['MODEL_WARMUP'] = 'false'\n"
+        "import server\n"
+        "print(' '.join(m for m in ('deepface', 'tensorflow', 'torch', 'langchain_google_genai', 'groq')"
+        " if m in sys.modules))\n"
+    )
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr)
+        raise SystemExit("Importing the server failed")
+    return completed.stdout.strip().splitlines()[-1].split() if completed.stdout.strip() else []
+
+
+def summarize(runs, key):
+    values = [run[key] for run in runs if run[key] is not None]
+    if not values:
+        return None
+    summary = percentiles(values, points=(50, 95))
+    summary['min'] = min(values)
+    summary['max'] = max(values)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=BACKENDS, default='deepface')
+    parser.add_argument('--warmup', choices=['on', 'off', 'both'], default='both')
+    parser.add_argument('--runs', type=int, default=3, help="Fresh processes per warm-up setting")
+    parser.add_argument('--timeout', type=float, default=300, help="Seconds to wait for the warm-up")
+    parser.add_argument('--fixtures', help="Fixtures directory (defaults to benchmarks/fixtures)")
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        args.fixtures = os.path.abspath(args.fixtures)
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    heavy_modules = heavy_modules_loaded(args)
+    results = []
+    for warmup in (['on', 'off'] if args.warmup == 'both' else [args.warmup]):
+        runs = []
+        for _ in range(args.runs):
+            command = [
+                sys.executable, os.path.abspath(__file__), '--worker',
+                '--backend', args.backend,
+                '--warmup', warmup,
+                '--timeout', str(args.timeout),
+            ]
+            if args.fixtures:
+                command += ['--fixtures', args.fixtures]
+
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                sys.stderr.write(completed.stderr)
+                raise SystemExit(f"Startup run with warm-up {warmup} failed")
+
+            # The server logs to stdout as well; the result is the last line
+            runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+        results.append({
+            'warmup': warmup,
+            'runs': runs,
+            'seconds': {
+                key: summarize(runs, f"{key}_seconds")
+                for key in ('import', 'create_app', 'ready', 'warmup', 'first_frame', 'second_frame')
+            },
+        })
+
+    write_report(
+        'startup',
+        results,
+        output=os.path.abspath(args.output) if args.output else None,
+        backend=args.backend,
+        heavy_modules_after_import=heavy_modules,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Size and encoding time of the interview report uploaded to the Express backend.
+
+Builds synthetic evaluated sessions of --minutes of recording at --fps and
+compares the report as it used to be uploaded (the full session_data,
+serialized by requests' json=) with the compact report of
+interview_core/report_payload.py, uncompressed and with each available content coding.
+
+Reported per session length: for each payload, the body size, its ratio to
+the previous upload, and best-of---repeat shape/serialize/compress times.
+The run fails (exit status 1) if the compact report lacks a field the
+Express backend reads.
+
+Usage:
+    python benchmarks/bench_upload_payload.py --backend lightweight
+    python benchmarks/bench_upload_payload.py --minutes 5 30 60 --fps 10 --output payload.json
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from _common import use_backend, write_report
+from bench_interview_evaluator import EMOTIONS, timed
+
+# Fields read by the Express backend's uploadResult
+EXPRESS_FIELDS = (
+    ('session_id',), ('role',), ('user_id',), ('responses',),
+    ('evaluation', 'overall_score'), ('evaluation', 'interview_duration_seconds'),
+)
+
+
+def make_session(frame_count, questions=5, seed=0):
+    """An evaluated session_data with `frame_count` recorded frames, as complete_interview uploads it."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, 10, 0, 0)
+    per_question = max(1, frame_count // questions)
+
+    detailed = {emotion: [] for emotion in EMOTIONS}
+    confidence, timestamps = [], []
+    for frame_id in range(frame_count):
+        question = min(questions, 1 + frame_id // per_question)
+        timestamp = (start + timedelta(milliseconds=100 * frame_id)).isoformat()
+        for emotion in EMOTIONS:
+            detailed[emotion].append({'value': rng.uniform(0, 100), 'question': question,
+                                      'frame_id': frame_id, 'timestamp': timestamp})
+        confidence.append({'value': rng.uniform(0, 100), 'question': question,
+                           'frame_id': frame_id, 'timestamp': timestamp})
+        timestamps.append({'frame_id': frame_id, 'question': question, 'timestamp': timestamp})
+
+    speech_analyses, responses = [], {}
+    for q in range(1, questions + 1):
+        analysis = {'id': f"speech_{q}", 'questionNumber': q, 'wpm': rng.randint(110, 160),
+                    'clarity': rng.randint(60, 95), 'completeness': rng.randint(50, 95),
+                    'wordCount': rng.randint(80, 250), 'duration': rng.randint(30, 120),
+                    'transcript': "I designed and tested the solution, then measured the result. " * 8}
+        speech_analyses.append(analysis)
+        responses[str(q)] = {
+            'question_number': q,
+            'question_text': f"Question {q}: tell me about a project you are proud of.",
+            'answer': analysis['transcript'],
+            'speech_analysis': analysis,
+            'video_analysis': {'average_emotions': {emotion: rng.random() for emotion in EMOTIONS},
+                               'average_confidence': rng.uniform(0, 100), 'frames': per_question},
+        }
+
+    return {
+        'session_id': f"bench_{seed}",
+        'created_at': start.isoformat(),
+        'updated_at': (start + timedelta(milliseconds=100 * frame_count)).isoformat(),
+        'responses': responses,
+        'speech_analyses': speech_analyses,
+        'emotion_analysis': {
+            'average_emotions': {emotion: rng.random() for emotion in EMOTIONS},
+            'average_confidence': rng.uniform(0, 100),
+            'detailed_emotions': detailed,
+            'confidence_signals': confidence,
+            'eye_contact': [],
+            'timestamps': timestamps,
+        },
+        'evaluation': {
+            'overall_score': 74.5,
+            'interview_duration_seconds': frame_count / 10,
+            'detail_evaluations': {str(q): {'score': rng.randint(50, 90)} for q in range(1, questions + 1)},
+            'ai_evaluation': {'answer_scores': [rng.randint(50, 90) for _ in range(questions)],
+                              'emotional_insights': ["Calm and focused."] * questions},
+        },
+        'user_id': "bench_user",
+        'role': "Software Engineer",
+    }
+
+
+def missing_fields(report):
+    missing = []
+    for path in EXPRESS_FIELDS:
+        value = report
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is None:
+            missing.append('.'.join(path))
+    return missing
+
+
+def measure(payload, report_payload, repeat, baseline_bytes=None):
+    """Body sizes and encoding times of one payload, uncompressed and per content coding."""
+    serialize_seconds, body = timed(lambda: report_payload.encode_body(payload), repeat)
+    result = {
+        'identity': {'bytes': len(body), 'serialize_seconds': serialize_seconds},
+    }
+    for coding in report_payload.CONTENT_ENCODINGS:
+        total_seconds, encoded = timed(lambda: report_payload.encode_body(payload, coding), repeat)
+        result[coding] = {
+            'bytes': len(encoded),
+            'serialize_seconds': serialize_seconds,
+            'compress_seconds': max(0.0, total_seconds - serialize_seconds),
+        }
+    if baseline_bytes:
+        for entry in result.values():
+            entry['ratio_to_previous'] = entry['bytes'] / baseline_bytes
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('lightweight', 'deepface'), default='lightweight')
+    parser.add_argument('--minutes', type=float, nargs='+', default=[5, 15, 30], help="Recorded minutes per session")
+    parser.add_argument('--fps', type=float, default=10.0, help="Analyzed frames per second")
+    parser.add_argument('--timeline-points', type=int, help="Emotion timeline points (default: the backend's config)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    use_backend(args.backend)
+    import config
+    from interview_core import report_payload
+
+    timeline_points = config.UPLOAD_TIMELINE_POINTS if args.timeline_points is None else args.timeline_points
+
+    results = []
+    failures = []
+    for minutes in args.minutes:
+        frames = int(minutes * 60 * args.fps)
+        session = make_session(frames)
+
+        # Previous upload: requests.post(json=session_data)
+        previous_seconds, previous = timed(lambda: json.dumps(session).encode('utf-8'), args.repeat)
+
+        shape_seconds, compact = timed(lambda: report_payload.shape_report(session, timeline_points), args.repeat)
+        missing = missing_fields(compact)
+        if missing:
+            failures.append(f"{minutes} min: compact report lacks {', '.join(missing)}")
+
+        results.append({
+            'minutes': minutes,
+            'frames': frames,
+            'previous': {'bytes': len(previous), 'serialize_seconds': previous_seconds},
+            'full': measure(session, report_payload, args.repeat, len(previous)),
+            'compact': {
+                'shape_seconds': shape_seconds,
+                'timeline_points': len(compact['emotion_analysis'].get('timeline', [])),
+                **measure(compact, report_payload, args.repeat, len(previous)),
+            },
+        })
+
+    write_report(
+        'upload_payload',
+        results,
+        output=output,
+        backend=args.backend,
+        fps=args.fps,
+        timeline_points=timeline_points,
+        content_encodings=list(report_payload.CONTENT_ENCODINGS),
+        repeat=args.repeat,
+    )
+    if failures:
+        raise SystemExit('; '.join(failures))
+
+
+if __name__ == '__main__':
+    main()
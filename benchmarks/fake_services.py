@@ -0,0 +1,298 @@
+"""
+Local stand-ins for the external services called by the analysis servers.
+
+Fake LLM (one server for both providers):
+    POST /openai/v1/chat/completions              Groq (OpenAI-compatible) API
+    POST /v1beta/models/<model>:generateContent   Gemini REST API
+Prompts asking for JSON get an answer evaluation, everything else gets a question.
+
+Fake Express backend:
+    POST /api/users/interview/complete[/]         Stores nothing, answers 201 (200 for a known Idempotency-Key)
+    POST /api/users/interview/complete/batch      Same for {results: [{idempotency_key, result}]}
+Both accept gzip (and zstd, with zstandard installed) request bodies and say so in Accept-Encoding.
+
+Both servers answer GET /stats with their request counters.
+
+Point the analysis server at them through its environment:
+    lightweight:  GROQ_BASE_URL=http://127.0.0.1:8101
+                  EXPRESS_BACKEND_API_COMPLETE_INTERVIEW=http://127.0.0.1:8102/api/users/interview/complete/
+    deepface:     GOOGLE_GEMINI_API_ENDPOINT=http://127.0.0.1:8101
+                  EXPRESS_BACKEND_API_COMPLETE_INTERVIEW=http://127.0.0.1:8102/api/users/interview/complete/
+
+Usage:
+    python benchmarks/fake_services.py --llm-latency 1.5 --llm-jitter 0.5 --llm-error-rate 0.02
+    python benchmarks/fake_services.py --llm-rate-limit-rate 0.05 --express-latency 0.2
+"""
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EVALUATION = {
+    "answer_score": 72,
+    "better_answer": "Give a concrete example and the measurable result.",
+    "completeness": 70,
+    "relevance": 80,
+    "structure": 68,
+    "key_strengths": ["Clear example", "Good ownership"],
+    "improvement_areas": ["Quantify the impact"],
+    "emotional_assessment": "Calm and focused.",
+    "ideal_keywords": ["impact", "ownership", "metrics"],
+    "missing_elements": "Outcome of the project",
+}
+
+QUESTIONS = [
+    "Tell me about a project where you had to learn a new technology quickly.",
+    "Describe a time you disagreed with a teammate and how you resolved it.",
+    "How do you prioritize work when several deadlines collide?",
+    "Walk me through the most difficult bug you have fixed.",
+    "What would you improve in the last system you designed?",
+]
+
+
+def decode_body(body, encoding):
+    """Undo a request's Content-Encoding (gzip, or zstd if zstandard is installed)."""
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(body)
+    if encoding not in (None, 'identity'):
+        raise ValueError(f"unsupported content coding {encoding}")
+    return body
+
+
+class Behaviour:
+    """Latency and failure settings of one fake service, plus its counters."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0, retry_after=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def outcome(self):
+        """Sleep for the configured latency and return the status code to answer with."""
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    behaviour = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            body = decode_body(body, self.headers.get('Content-Encoding'))
+            return json.loads(body or b'{}')
+        except ValueError:
+            return {}
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_failure(self, status):
+        self.behaviour.count(str(status))
+        if status == 429:
+            self._send_json(429, {"error": {"message": "Rate limit reached", "code": 429}},
+                            {'Retry-After': str(self.behaviour.retry_after)})
+        else:
+            self._send_json(status, {"error": {"message": "Injected failure", "code": status}})
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.behaviour.counts)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+class FakeLLMHandler(FakeHandler):
+
+    @staticmethod
+    def _reply(prompt):
+        if 'JSON' in prompt:
+            return json.dumps(EVALUATION)
+        return random.choice(QUESTIONS)
+
+    def do_POST(self):
+        payload = self._read_json()
+
+        if self.path.endswith('/chat/completions'):
+            provider = 'groq'
+            prompt = ' '.join(str(m.get('content', '')) for m in payload.get('messages', []))
+        elif ':generateContent' in self.path:
+            provider = 'gemini'
+            prompt = ' '.join(
+                str(part.get('text', ''))
+                for content in payload.get('contents', [])
+                for part in content.get('parts', [])
+            )
+        else:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        self.behaviour.count(provider)
+        status = self.behaviour.outcome()
+        if status:
+            self._send_failure(status)
+            return
+
+        text = self._reply(prompt)
+        if provider == 'groq':
+            self._send_json(200, {
+                "id": f"chatcmpl-fake-{random.getrandbits(32):08x}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get('model', 'fake'),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                          "total_tokens": (len(prompt) + len(text)) // 4},
+            })
+        else:
+            self._send_json(200, {
+                "candidates": [{
+                    "content": {"role": "model", "parts": [{"text": text}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4},
+            })
+
+
+class FakeExpressHandler(FakeHandler):
+    # Content codings advertised for request bodies (RFC 7694), as the Express backend does
+    ACCEPT_ENCODING = {'Accept-Encoding': 'zstd, gzip' if zstandard is not None else 'gzip'}
+    # Idempotency keys of the results saved so far, shared by all requests
+    saved_keys = set()
+    saved_lock = threading.Lock()
+
+    def _save(self, key):
+        """Status of saving one result: 201, or 200 if its idempotency key was saved before."""
+        if key:
+            with self.saved_lock:
+                if key in self.saved_keys:
+                    self.behaviour.count('duplicate')
+                    return 200
+                self.saved_keys.add(key)
+        self.behaviour.count('complete')
+        return 201
+
+    def do_POST(self):
+        path = self.path.rstrip('/')
+        if path.endswith('/interview/complete/batch'):
+            batch = True
+        elif path.endswith('/interview/complete'):
+            batch = False
+        else:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        payload = self._read_json()
+        self.behaviour.count('batch' if batch else 'single')
+        self.behaviour.count(f"encoding_{self.headers.get('Content-Encoding') or 'identity'}")
+        status = self.behaviour.outcome()
+        if status:
+            self._send_failure(status)
+            return
+
+        if batch:
+            results = [
+                {"idempotency_key": item.get('idempotency_key'), "status": self._save(item.get('idempotency_key'))}
+                for item in payload.get('results', [])
+            ]
+            self._send_json(200, {"success": True, "results": results}, self.ACCEPT_ENCODING)
+        else:
+            self._send_json(self._save(self.headers.get('Idempotency-Key')),
+                            {"success": True, "message": "Interview result saved"}, self.ACCEPT_ENCODING)
+
+
+def start_server(handler_class, behaviour, host, port):
+    """Serve one fake on a daemon thread and return the server."""
+    handler = type(handler_class.__name__, (handler_class,), {'behaviour': behaviour})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser):
+    """Add the fake service options to a parser (shared with load_test.py)."""
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--llm-port', type=int, default=8101)
+    parser.add_argument('--llm-latency', type=float, default=1.0, help="Seconds per LLM call")
+    parser.add_argument('--llm-jitter', type=float, default=0.3, help="Uniform +/- jitter in seconds")
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help="Fraction of LLM calls answered with 500")
+    parser.add_argument('--llm-rate-limit-rate', type=float, default=0.0, help="Fraction of LLM calls answered with 429")
+    parser.add_argument('--llm-retry-after', type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument('--express-port', type=int, default=8102)
+    parser.add_argument('--express-latency', type=float, default=0.05)
+    parser.add_argument('--express-jitter', type=float, default=0.02)
+    parser.add_argument('--express-error-rate', type=float, default=0.0)
+
+
+def start_services(args):
+    """Start both fakes from parsed arguments and return (llm_server, express_server)."""
+    llm = start_server(FakeLLMHandler, Behaviour(
+        args.llm_latency, args.llm_jitter, args.llm_error_rate, args.llm_rate_limit_rate, args.llm_retry_after
+    ), args.host, args.llm_port)
+    express = start_server(FakeExpressHandler, Behaviour(
+        args.express_latency, args.express_jitter, args.express_error_rate
+    ), args.host, args.express_port)
+    return llm, express
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    start_services(args)
+    print(f"Fake LLM listening on http://{args.host}:{args.llm_port}")
+    print(f"Fake Express listening on http://{args.host}:{args.express_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
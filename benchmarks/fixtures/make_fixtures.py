@@ -0,0 +1,155 @@
+"""
+Generate the JPEG frame fixtures used by the frame pipeline benchmarks.
+
+Frames are composed from one or more faces pasted onto a noisy background,
+for every combination of frame size and face count. Without --face the
+faces are drawn (skin-toned head, eyes, brows and mouth, which OpenCV's
+frontal face cascade detects), so the fixtures are the same on every
+machine for a given seed. Face photos (head-and-shoulders crops work best)
+can be given instead to benchmark the emotion models on real faces. A
+manifest.json describing each fixture is written next to them.
+
+The benchmarks generate the drawn fixtures on first use, so running this
+script is only needed to use photos, another seed or another JPEG quality.
+
+Usage:
+    python benchmarks/fixtures/make_fixtures.py
+    python benchmarks/fixtures/make_fixtures.py --face face1.jpg --face face2.jpg
+"""
+import argparse
+import json
+import os
+
+import cv2
+import numpy as np
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SIZES = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+FACE_COUNTS = [0, 1, 2, 3]
+
+# Faces drawn when no photos are given
+DRAWN_FACES = 3
+DRAWN_FACE_HEIGHT = 400
+
+
+def draw_face(height, rng):
+    """A frontal face drawing on a dark background, with skin tone and features varied by `rng`."""
+    width = int(height * 0.8)
+    face = np.full((height, width, 3), 60, dtype=np.uint8)
+    cx, cy = width // 2, int(height * 0.52)
+
+    skin = tuple(int(c) for c in rng.integers((120, 150, 185), (165, 195, 230)))
+    cv2.ellipse(face, (cx, cy), (int(width * 0.40), int(height * 0.44)), 0, 0, 360, skin, -1)
+    hair = tuple(int(c) for c in rng.integers(20, 60, size=3))
+    cv2.ellipse(face, (cx, int(height * 0.2)), (int(width * 0.42), int(height * 0.18)), 0, 180, 360, hair, -1)
+
+    eye_y = int(height * rng.uniform(0.42, 0.44))
+    eye_dx = int(width * rng.uniform(0.17, 0.19))
+    for side in (-1, 1):
+        eye_x = cx + side * eye_dx
+        cv2.ellipse(face, (eye_x, eye_y - int(height * 0.06)), (int(width * 0.11), int(height * 0.02)),
+                    0, 0, 360, (40, 50, 60), -1)
+        cv2.ellipse(face, (eye_x, eye_y), (int(width * 0.09), int(height * 0.035)), 0, 0, 360, (230, 230, 230), -1)
+        cv2.circle(face, (eye_x, eye_y), int(height * 0.028), (40, 30, 20), -1)
+
+    nose = tuple(int(c * 0.75) for c in skin)
+    cv2.ellipse(face, (cx, int(height * 0.6)), (int(width * 0.06), int(height * 0.03)), 0, 0, 360, nose, -1)
+    cv2.ellipse(face, (cx, int(height * 0.73)), (int(width * rng.uniform(0.12, 0.16)), int(height * 0.035)),
+                0, 0, 360, (70, 70, 140), -1)
+
+    return cv2.GaussianBlur(face, (0, 0), height / 120)
+
+
+def make_frame(width, height, faces, rng):
+    """Paste `faces` side by side onto a noisy background of the given size."""
+    frame = rng.integers(40, 200, size=(height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (0, 0), 5)
+
+    if not faces:
+        return frame
+
+    slot_width = width // len(faces)
+    for i, face in enumerate(faces):
+        # Each face takes about half of the frame height
+        target_height = height // 2
+        target_width = min(slot_width - 10, int(face.shape[1] * target_height / face.shape[0]))
+        target_height = int(face.shape[0] * target_width / face.shape[1])
+        resized = cv2.resize(face, (target_width, target_height))
+
+        x = i * slot_width + (slot_width - target_width) // 2
+        y = (height - target_height) // 3
+        frame[y:y + target_height, x:x + target_width] = resized
+
+    return frame
+
+
+def generate(fixtures_dir=FIXTURES_DIR, face_paths=None, quality=80, seed=0):
+    """
+    Write the fixtures and their manifest.
+
+    Args:
+        fixtures_dir: Directory to write them to
+        face_paths: Face photos to paste into frames (None = drawn faces)
+        quality: JPEG quality
+        seed: Seed of the backgrounds and drawn faces
+
+    Returns:
+        list: The manifest entries
+    """
+    rng = np.random.default_rng(seed)
+    if face_paths:
+        faces = []
+        for path in face_paths:
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                raise SystemExit(f"Could not read face image: {path}")
+            faces.append(image)
+    else:
+        faces = [draw_face(DRAWN_FACE_HEIGHT, rng) for _ in range(DRAWN_FACES)]
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    manifest = []
+    for width, height in SIZES:
+        for face_count in FACE_COUNTS:
+            frame_faces = [faces[i % len(faces)] for i in range(face_count)]
+            frame = make_frame(width, height, frame_faces, rng)
+
+            name = f"frame_{width}x{height}_{face_count}faces.jpg"
+            _, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            _write_atomic(os.path.join(fixtures_dir, name), jpeg.tobytes())
+            manifest.append({
+                'file': name,
+                'width': width,
+                'height': height,
+                'faces': face_count,
+                'drawn': not face_paths,
+                'bytes': len(jpeg),
+            })
+
+    # Written last: benchmarks started at the same time only read complete fixtures
+    _write_atomic(os.path.join(fixtures_dir, 'manifest.json'), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def _write_atomic(path, data):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--face', action='append', help="Face photo to paste into frames (default: drawn faces)")
+    parser.add_argument('--quality', type=int, default=80, help="JPEG quality")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=FIXTURES_DIR, help="Directory to write the fixtures to")
+    args = parser.parse_args()
+
+    manifest = generate(args.output, args.face, args.quality, args.seed)
+    print(f"Wrote {len(manifest)} fixtures to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
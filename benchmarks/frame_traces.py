@@ -0,0 +1,200 @@
+"""
+Collect and summarize the per-frame traces exported by the analysis servers.
+
+Tracing is enabled on the server with TRACE_SAMPLE_RATE (fraction of frames
+traced). Traces go to TRACE_FILE (JSON lines, the default) or, with
+TRACE_EXPORTER=otlp, to an OTLP/HTTP collector at TRACE_OTLP_ENDPOINT.
+
+collect    Local OTLP/HTTP JSON collector stand-in. Accepts POST /v1/traces and
+           appends every export request to a JSON-lines file, in the same
+           format as the server's file exporter.
+summarize  Reads one or more trace files and reports, per session and overall,
+           where frame time goes: count, mean, p50/p95/p99 and share of the
+           end-to-end frame time for each stage, plus frame outcomes.
+
+Usage:
+    python benchmarks/frame_traces.py collect --port 4318 --output traces.jsonl
+    python benchmarks/frame_traces.py summarize traces.jsonl
+    python benchmarks/frame_traces.py summarize traces.jsonl --session <sid> --json
+"""
+import argparse
+import json
+import sys
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from _common import percentiles
+
+# Stage order used in reports; unknown stages are listed after these
+STAGE_ORDER = ('base64_decode', 'queue_wait', 'jpeg_decode', 'detect', 'classify', 'record')
+
+
+# ========== Collector ==========
+
+def make_collector_handler(output, lock):
+    class CollectorHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/v1/traces':
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length)
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_response(400)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            with lock:
+                output.write(json.dumps(payload) + '\n')
+                output.flush()
+
+            reply = b'{}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+    return CollectorHandler
+
+
+def collect(args):
+    with open(args.output, 'a') as output:
+        server = ThreadingHTTPServer((args.host, args.port), make_collector_handler(output, threading.Lock()))
+        print(f"Collecting OTLP traces on http://{args.host}:{args.port}/v1/traces into {args.output}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+# ========== Summary ==========
+
+def _attribute(attributes, key):
+    for attribute in attributes or ():
+        if attribute.get('key') == key:
+            value = attribute.get('value', {})
+            return next(iter(value.values()), None)
+    return None
+
+
+def load_spans(paths):
+    """Yield every span of the OTLP JSON export requests stored in the given files."""
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                for resource_spans in json.loads(line).get('resourceSpans', []):
+                    for scope_spans in resource_spans.get('scopeSpans', []):
+                        yield from scope_spans.get('spans', [])
+
+
+def _duration_ms(span):
+    return (int(span['endTimeUnixNano']) - int(span['startTimeUnixNano'])) / 1e6
+
+
+def _stage_summary(samples, total_ms):
+    summary = percentiles(samples)
+    summary['count'] = len(samples)
+    summary['mean'] = sum(samples) / len(samples)
+    summary['share'] = sum(samples) / total_ms if total_ms else None
+    return summary
+
+
+def summarize_spans(spans, session=None):
+    """
+    Group spans by session and summarize stage latencies (milliseconds).
+
+    Returns:
+        {session id: {'frames', 'outcomes', 'frame_ms', 'stages'}}, including an 'all' entry
+    """
+    frames = defaultdict(list)       # session -> root span durations
+    outcomes = defaultdict(lambda: defaultdict(int))
+    stages = defaultdict(lambda: defaultdict(list))
+
+    for span in spans:
+        session_id = _attribute(span.get('attributes'), 'session.id') or 'unknown'
+        if session is not None and session_id != session:
+            continue
+        duration = _duration_ms(span)
+        for key in (session_id, 'all'):
+            if span.get('name') == 'frame' and not span.get('parentSpanId'):
+                frames[key].append(duration)
+                outcomes[key][_attribute(span.get('attributes'), 'frame.outcome') or 'unknown'] += 1
+            else:
+                stages[key][span['name']].append(duration)
+
+    report = {}
+    for key in sorted(set(frames) | set(stages), key=lambda k: (k == 'all', k)):
+        total_ms = sum(frames[key])
+        names = sorted(stages[key], key=lambda n: (STAGE_ORDER.index(n) if n in STAGE_ORDER else len(STAGE_ORDER), n))
+        report[key] = {
+            'frames': len(frames[key]),
+            'outcomes': dict(outcomes[key]),
+            'frame_ms': _stage_summary(frames[key], total_ms) if frames[key] else None,
+            'stages': {name: _stage_summary(stages[key][name], total_ms) for name in names},
+        }
+    return report
+
+
+def print_report(report):
+    for session_id, summary in report.items():
+        title = "All sessions" if session_id == 'all' else f"Session {session_id}"
+        print(f"\n{title}: {summary['frames']} traced frames {summary['outcomes']}")
+        rows = list(summary['stages'].items())
+        if summary['frame_ms']:
+            rows.append(('frame (total)', summary['frame_ms']))
+        print(f"  {'stage':<16}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'share':>8}")
+        for name, stage in rows:
+            share = f"{stage['share'] * 100:.1f}%" if stage['share'] is not None else '-'
+            print(f"  {name:<16}{stage['count']:>8}{stage['mean']:>10.2f}{stage['p50']:>10.2f}"
+                  f"{stage['p95']:>10.2f}{stage['p99']:>10.2f}{share:>8}")
+
+
+def summarize(args):
+    report = summarize_spans(load_spans(args.files), args.session)
+    if not report:
+        raise SystemExit("No spans found")
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    collect_parser = commands.add_parser('collect', help="Run a local OTLP/HTTP collector stand-in")
+    collect_parser.add_argument('--host', default='127.0.0.1')
+    collect_parser.add_argument('--port', type=int, default=4318)
+    collect_parser.add_argument('--output', default='frame_traces.jsonl')
+    collect_parser.set_defaults(handler=collect)
+
+    summarize_parser = commands.add_parser('summarize', help="Summarize stage latencies per session")
+    summarize_parser.add_argument('files', nargs='+')
+    summarize_parser.add_argument('--session', help="Only this session id")
+    summarize_parser.add_argument('--json', action='store_true', help="Print the summary as JSON")
+    summarize_parser.set_defaults(handler=summarize)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
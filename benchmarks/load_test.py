@@ -0,0 +1,278 @@
+"""
+Load test for a running analysis server.
+
+Simulates N concurrent candidates going through the full interview flow:
+
+    connect -> generate-question -> 5 x (stream frames at 5-15 fps, next-question)
+            -> stop_capture -> complete_interview -> disconnect
+
+Frames are the JPEG fixtures of benchmarks/fixtures. The server should talk to
+the fakes of fake_services.py rather than the real LLM and Express backends;
+with --start-fakes they are started in this process (see fake_services.py for
+the environment variables that point the server at them).
+
+Reported per HTTP endpoint and Socket.IO event: request count, throughput,
+error rate, error reasons and p50/p95/p99 latency.
+
+Usage:
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --clients 20 --start-fakes
+    python benchmarks/load_test.py --clients 100 --ramp-up 60 --answer-seconds 20 --output load.json
+"""
+import argparse
+import base64
+import random
+import threading
+import time
+from collections import defaultdict
+
+import requests
+import socketio
+
+import fake_services
+from _common import load_fixtures, percentiles, write_report
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella"]
+ROLES = ["software engineer", "data scientist", "product manager", "designer"]
+ANSWER = (
+    "In my last project I led a small team to redesign our deployment pipeline. "
+    "We measured build times, removed the slowest steps and cut releases from an hour to ten minutes."
+)
+
+
+class Recorder:
+    """Thread-safe latency and error counters keyed by endpoint or event name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name, seconds, error=None):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            if error:
+                self.errors[name][error] += 1
+
+    def summary(self, wall_seconds):
+        with self._lock:
+            result = {}
+            for name, samples in sorted(self.latencies.items()):
+                error_count = sum(self.errors[name].values())
+                result[name] = {
+                    'count': len(samples),
+                    'throughput_per_second': len(samples) / wall_seconds if wall_seconds else None,
+                    'errors': error_count,
+                    'error_rate': error_count / len(samples),
+                    'error_reasons': dict(self.errors[name]),
+                    'latency_ms': {key: value * 1000 for key, value in percentiles(samples).items()},
+                }
+            return result
+
+
+def response_error(response):
+    """Error reason of an HTTP or Socket.IO response, or None when it succeeded."""
+    if isinstance(response, requests.Response):
+        if response.status_code >= 400:
+            return f"http_{response.status_code}"
+        try:
+            response = response.json()
+        except ValueError:
+            return 'invalid_json'
+    if isinstance(response, dict) and response.get('status') == 'error':
+        return 'status_error'
+    return None
+
+
+class VirtualCandidate:
+    """One simulated interview, run on its own thread."""
+
+    def __init__(self, index, args, payloads, recorder):
+        self.index = index
+        self.args = args
+        self.payloads = payloads
+        self.recorder = recorder
+        self.rng = random.Random(args.seed + index)
+        self.http = requests.Session()
+        self.sio = socketio.Client(reconnection=False)
+        self.frames_sent = 0
+        self.frames_acked = 0
+        self._acks = threading.Lock()
+
+    # ========== Timed calls ==========
+
+    def post(self, name, path, payload):
+        start = time.perf_counter()
+        try:
+            response = self.http.post(self.args.url + path, json=payload, timeout=self.args.timeout)
+            error = response_error(response)
+        except requests.RequestException as e:
+            response, error = None, type(e).__name__
+        self.recorder.record(name, time.perf_counter() - start, error)
+        if error:
+            return None
+        return response.json()
+
+    def call(self, event, data):
+        start = time.perf_counter()
+        try:
+            response = self.sio.call(event, data, timeout=self.args.timeout)
+            error = response_error(response)
+        except Exception as e:
+            response, error = None, type(e).__name__
+        self.recorder.record(event, time.perf_counter() - start, error)
+        return response
+
+    def send_frame(self, frame_id, question_number):
+        sent = time.perf_counter()
+
+        def on_ack(response=None):
+            with self._acks:
+                self.frames_acked += 1
+            self.recorder.record('frame', time.perf_counter() - sent, response_error(response))
+
+        payload = self.payloads[(self.index + frame_id) % len(self.payloads)]
+        self.sio.emit('frame', {'frameId': frame_id, 'frame': payload, 'questionNumber': question_number},
+                      callback=on_ack)
+        self.frames_sent += 1
+
+    # ========== Flow ==========
+
+    def stream_answer(self, question_number):
+        """Stream frames for one answer at a random 5-15 fps, like a webcam capture."""
+        fps = self.rng.uniform(self.args.min_fps, self.args.max_fps)
+        frames = max(1, int(fps * self.args.answer_seconds))
+        start = time.perf_counter()
+        for frame_id in range(frames):
+            delay = start + frame_id / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.send_frame(frame_id, question_number)
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            self.sio.connect(self.args.url, transports=self.args.transports, wait_timeout=self.args.timeout)
+        except Exception as e:
+            self.recorder.record('connect', time.perf_counter() - start, type(e).__name__)
+            return False
+        self.recorder.record('connect', time.perf_counter() - start)
+
+        client_id = self.sio.get_sid()
+        company = self.rng.choice(COMPANIES)
+        role = self.rng.choice(ROLES)
+
+        try:
+            result = self.post('/api/generate-question', '/api/generate-question', {
+                'company': company, 'role': role, 'questionNumber': 1, 'client_id': client_id,
+            })
+            question_text = (result or {}).get('question', "Question 1")
+
+            for question_number in range(1, self.args.questions + 1):
+                self.stream_answer(question_number)
+                result = self.post('/api/next-question', '/api/next-question', {
+                    'company': company,
+                    'role': role,
+                    'questionNumber': question_number,
+                    'question_text': question_text,
+                    'answer': ANSWER,
+                    'client_id': client_id,
+                    'analysis': {'wpm': self.rng.randint(110, 160), 'clarity': self.rng.randint(60, 95)},
+                })
+                question_text = (result or {}).get('nextQuestion', f"Question {question_number + 1}")
+
+            self.call('stop_capture', {'transcript': ANSWER})
+            result = self.post('/api/complete_interview', f"/api/complete_interview/{client_id}", {})
+            return result is not None
+        finally:
+            # Give outstanding frame acks a moment before leaving
+            deadline = time.perf_counter() + self.args.timeout
+            while self.frames_acked < self.frames_sent and time.perf_counter() < deadline:
+                time.sleep(0.05)
+            self.sio.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="Analysis server base URL")
+    parser.add_argument('--clients', type=int, default=10, help="Concurrent simulated candidates")
+    parser.add_argument('--ramp-up', type=float, default=10.0, help="Seconds over which clients are started")
+    parser.add_argument('--questions', type=int, default=5, help="next-question calls per interview")
+    parser.add_argument('--answer-seconds', type=float, default=10.0, help="Seconds of frames streamed per answer")
+    parser.add_argument('--min-fps', type=float, default=5.0)
+    parser.add_argument('--max-fps', type=float, default=15.0)
+    parser.add_argument('--transports', nargs='+', default=['websocket'], choices=('websocket', 'polling'))
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fixtures', help="Fixtures directory (defaults to benchmarks/fixtures)")
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    parser.add_argument('--start-fakes', action='store_true', help="Run the fake LLM and Express services in-process")
+    fake_services.add_arguments(parser)
+    args = parser.parse_args()
+    args.url = args.url.rstrip('/')
+
+    fakes = fake_services.start_services(args) if args.start_fakes else None
+
+    payloads = [
+        "data:image/jpeg;base64," + base64.b64encode(fixture['data']).decode('ascii')
+        for fixture in load_fixtures(args.fixtures)
+    ]
+
+    recorder = Recorder()
+    candidates = [VirtualCandidate(i, args, payloads, recorder) for i in range(args.clients)]
+    outcomes = [False] * args.clients
+    session_seconds = []
+
+    def run_candidate(i):
+        start = time.perf_counter()
+        try:
+            outcomes[i] = candidates[i].run()
+        except Exception as e:
+            recorder.record('session', time.perf_counter() - start, type(e).__name__)
+            return
+        session_seconds.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = []
+    for i in range(args.clients):
+        thread = threading.Thread(target=run_candidate, args=(i,), daemon=True)
+        thread.start()
+        threads.append(thread)
+        if args.clients > 1:
+            time.sleep(args.ramp_up / args.clients)
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - start
+
+    frames_sent = sum(c.frames_sent for c in candidates)
+    frames_acked = sum(c.frames_acked for c in candidates)
+    results = {
+        'wall_seconds': wall_seconds,
+        'interviews_completed': sum(outcomes),
+        'interviews_failed': args.clients - sum(outcomes),
+        'interviews_per_minute': sum(outcomes) / wall_seconds * 60 if wall_seconds else None,
+        'interview_seconds': percentiles(session_seconds),
+        'frames_sent': frames_sent,
+        'frames_unacknowledged': frames_sent - frames_acked,
+        'endpoints': recorder.summary(wall_seconds),
+    }
+    if fakes:
+        results['fake_services'] = {
+            'llm': fakes[0].RequestHandlerClass.behaviour.counts,
+            'express': fakes[1].RequestHandlerClass.behaviour.counts,
+        }
+
+    write_report(
+        'load_test',
+        results,
+        output=args.output,
+        url=args.url,
+        clients=args.clients,
+        ramp_up_seconds=args.ramp_up,
+        questions=args.questions,
+        answer_seconds=args.answer_seconds,
+        fps_range=[args.min_fps, args.max_fps],
+    )
+
+
+if __name__ == '__main__':
+    main()
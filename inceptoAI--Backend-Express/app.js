@@ -49,7 +49,8 @@ const allowedOrigins = [
 
 // Middlewares
 app.use(express.urlencoded({ extended: true }));
-app.use(express.json());
+// Interview results are large, and the analysis server uploads them in batches
+app.use(express.json({ limit: "10mb" }));
 app.use(
   cors({
     origin: function (origin, callback) {
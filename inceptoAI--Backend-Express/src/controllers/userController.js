@@ -79,26 +79,42 @@ export const getResult = async (req, res) => {
   }
 };
 
-export const uploadResult = async (req, res) => {
-  try {
-    const interviewResult = req.body;
-
-    // Extract essential values
-    const session_id = interviewResult?.session_id;
-    const role = interviewResult?.role;
-    const user_id = interviewResult?.user_id;
-    const overallScore = interviewResult?.evaluation?.overall_score;
-    const duration = interviewResult?.evaluation?.interview_duration_seconds;
-    const status =
-      Object.keys(interviewResult.responses).length === 5
-        ? "completed"
-        : "abandoned";
-
-    console.log(interviewResult);
-
-    // Check if any required field is missing
-    if (!session_id || !role || !user_id || !overallScore || !duration) {
-      return res.status(400).json({
+// Saves one interview result posted by the analysis server and returns the
+// status and body to answer with. The analysis server retries failed uploads,
+// so a result already saved under the same idempotency key is returned as is.
+const saveInterviewResult = async (interviewResult, idempotencyKey) => {
+  if (idempotencyKey) {
+    const existing = await Result.findOne({ idempotency_key: idempotencyKey });
+    if (existing) {
+      return {
+        status: 200,
+        body: {
+          success: true,
+          message: "Interview result already uploaded",
+          result: existing,
+        },
+      };
+    }
+  }
+
+  // Extract essential values
+  const session_id = interviewResult?.session_id;
+  const role = interviewResult?.role;
+  const user_id = interviewResult?.user_id;
+  const overallScore = interviewResult?.evaluation?.overall_score;
+  const duration = interviewResult?.evaluation?.interview_duration_seconds;
+  const status =
+    Object.keys(interviewResult?.responses || {}).length === 5
+      ? "completed"
+      : "abandoned";
+
+  console.log(interviewResult);
+
+  // Check if any required field is missing
+  if (!session_id || !role || !user_id || !overallScore || !duration) {
+    return {
+      status: 400,
+      body: {
         success: false,
         message: "Missing required fields",
         received: {
@@ -108,61 +124,90 @@ export const uploadResult = async (req, res) => {
           user_id: user_id || "(missing)",
           duration: duration || "(missing)",
         },
-      });
-    }
+      },
+    };
+  }
 
-    // Generate a download URL for the interview result
-    const uploadResult = await handleUpload(session_id, interviewResult);
-
-    const downloadUrl =
-      typeof uploadResult === "object" && uploadResult.url
-        ? uploadResult.url
-        : uploadResult;
-
-    // Process responses to extract only what's needed for the UI
-    const responsesSummary = {};
-    if (interviewResult?.responses) {
-      Object.keys(interviewResult.responses).forEach((key) => {
-        const response = interviewResult.responses[key];
-        responsesSummary[key] = {
-          question_text: response.question_text,
-          answer: response.answer,
-          completeness: response.speech_analysis?.completeness || 0,
-        };
-      });
-    }
+  // Generate a download URL for the interview result
+  const uploadResult = await handleUpload(session_id, interviewResult);
+
+  const downloadUrl =
+    typeof uploadResult === "object" && uploadResult.url
+      ? uploadResult.url
+      : uploadResult;
 
-    // Create a new result document with only UI-necessary fields
-    const newResult = new Result({
-      url: downloadUrl,
-      date: new Date(),
-      topic: role,
-      overall_score: overallScore,
-      interview_duration_seconds: duration,
-      status: status,
+  // Process responses to extract only what's needed for the UI
+  const responsesSummary = {};
+  if (interviewResult?.responses) {
+    Object.keys(interviewResult.responses).forEach((key) => {
+      const response = interviewResult.responses[key];
+      responsesSummary[key] = {
+        question_text: response.question_text,
+        answer: response.answer,
+        completeness: response.speech_analysis?.completeness || 0,
+      };
     });
+  }
 
-    // Save the result to the database
-    const savedResult = await newResult.save();
+  // Create a new result document with only UI-necessary fields
+  const newResult = new Result({
+    url: downloadUrl,
+    date: new Date(),
+    topic: role,
+    overall_score: overallScore,
+    interview_duration_seconds: duration,
+    status: status,
+    idempotency_key: idempotencyKey || undefined,
+  });
 
-    // Associate the result with the user account
-    try {
-      const updatedUser = await User.findByIdAndUpdate(
-        user_id,
-        { $push: { results: savedResult._id } },
-        { new: true },
-      );
-    } catch (userError) {
-      console.error("Error updating user:", userError.message);
-      // Don't fail the entire operation if user update fails
+  // Save the result to the database
+  let savedResult;
+  try {
+    savedResult = await newResult.save();
+  } catch (error) {
+    // A concurrent upload of the same result was saved first
+    if (error.code === 11000 && idempotencyKey) {
+      return {
+        status: 200,
+        body: {
+          success: true,
+          message: "Interview result already uploaded",
+          result: await Result.findOne({ idempotency_key: idempotencyKey }),
+        },
+      };
     }
+    throw error;
+  }
 
-    // Return success response
-    return res.status(201).json({
+  // Associate the result with the user account
+  try {
+    const updatedUser = await User.findByIdAndUpdate(
+      user_id,
+      { $push: { results: savedResult._id } },
+      { new: true },
+    );
+  } catch (userError) {
+    console.error("Error updating user:", userError.message);
+    // Don't fail the entire operation if user update fails
+  }
+
+  return {
+    status: 201,
+    body: {
       success: true,
       message: "Interview result uploaded successfully",
       result: savedResult,
-    });
+    },
+  };
+};
+
+export const uploadResult = async (req, res) => {
+  try {
+    const { status, body } = await saveInterviewResult(
+      req.body,
+      req.get("Idempotency-Key"),
+    );
+    return res.status(status).json(body);
   } catch (error) {
     console.error("Error uploading interview result:", error);
     return res.status(500).json({
@@ -172,3 +217,41 @@ export const uploadResult = async (req, res) => {
     });
   }
 };
+
+// Saves several interview results in one request: the analysis server batches
+// the uploads that queued up while this backend was slow or unreachable.
+// Expects { results: [{ idempotency_key, result }] } and answers the status of
+// each result, so the analysis server retries only those that failed.
+export const uploadResultBatch = async (req, res) => {
+  const items = req.body?.results;
+  if (!Array.isArray(items)) {
+    return res.status(400).json({
+      success: false,
+      message: "Expected a results array",
+    });
+  }
+
+  const results = [];
+  for (const item of items) {
+    try {
+      const { status, body } = await saveInterviewResult(
+        item?.result,
+        item?.idempotency_key,
+      );
+      results.push({
+        idempotency_key: item?.idempotency_key,
+        status,
+        message: body.message,
+      });
+    } catch (error) {
+      console.error("Error uploading interview result:", error);
+      results.push({
+        idempotency_key: item?.idempotency_key,
+        status: 500,
+        message: error.message,
+      });
+    }
+  }
+
+  return res.status(200).json({ success: true, results });
+};
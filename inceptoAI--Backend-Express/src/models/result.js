@@ -28,6 +28,12 @@ const resultSchema = new mongoose.Schema({
     default: "completed",
     required: true,
   },
+  // Key of the analysis server's upload, so retried uploads are saved once
+  idempotency_key: {
+    type: String,
+    unique: true,
+    sparse: true,
+  },
 });
 
 export default mongoose.model("result", resultSchema);
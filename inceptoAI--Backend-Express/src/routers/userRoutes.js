@@ -4,17 +4,31 @@ import {
   getAllResults,
   getResult,
   uploadResult,
+  uploadResultBatch,
 } from "../controllers/userController.js";
 
 import express from "express";
 
 const Router = express.Router();
 
+// The analysis server compresses its uploads once we advertise the content
+// codings we accept in requests (RFC 7694); express.json() inflates gzip
+const acceptCompressedUploads = (req, res, next) => {
+  res.set("Accept-Encoding", "gzip");
+  next();
+};
+
 Router.post("/signup", userSignup);
 
 Router.post("/login", userLogin);
 
-Router.post("/interview/complete", uploadResult);
+Router.post("/interview/complete", acceptCompressedUploads, uploadResult);
+
+Router.post(
+  "/interview/complete/batch",
+  acceptCompressedUploads,
+  uploadResultBatch,
+);
 
 Router.get("/interview/result/:resultId", getResult);
 
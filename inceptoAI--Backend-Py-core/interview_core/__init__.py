@@ -0,0 +1,15 @@
+"""
+Modules shared by the InceptoAI Python backends (lightweight and DeepFace).
+
+Frame analyzers, session snapshots, keyword matching, answer evaluations,
+LLM call scheduling and sharing, the report outbox and upload payloads,
+outbound HTTP, offloading, logging, tracing and metrics live here once;
+each backend keeps only its own configuration, LLM provider, session store
+and routes.
+
+The modules read their settings from interview_core.settings, which each
+backend configures at startup, and are given the backend's session stores
+explicitly; they never import a backend module. Install the package into
+the backend's environment with `pip install -e ../inceptoAI--Backend-Py-core`
+(listed in its requirements.txt).
+"""
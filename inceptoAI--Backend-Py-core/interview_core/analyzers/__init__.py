@@ -0,0 +1,42 @@
+"""
+Frame analyzers: frame in, faces + emotions + confidence out.
+
+Implementations are registered by name and imported on first use, so a
+backend only needs the dependencies of the analyzer it is configured with
+(EMOTION_ANALYZER, see interview_core.settings).
+"""
+import importlib
+
+from interview_core import settings
+from interview_core.analyzers.base import NO_FACE, EmotionAnalyzer, FrameAnalysis, confidence_from_emotions
+
+# Analyzer name -> "module:class"
+ANALYZERS = {
+    'haar': 'interview_core.analyzers.haar:HaarCascadeAnalyzer',
+    'deepface': 'interview_core.analyzers.deepface:DeepFaceAnalyzer',
+    'onnx': 'interview_core.analyzers.onnx_runtime:OnnxEmotionAnalyzer',
+}
+
+
+def register_analyzer(name, path):
+    """Register an analyzer implementation given as "module:class"."""
+    ANALYZERS[name] = path
+
+
+def get_analyzer_class(name=None):
+    name = name or settings.EMOTION_ANALYZER
+    if name not in ANALYZERS:
+        raise ValueError(f"Unknown emotion analyzer '{name}', expected one of {sorted(ANALYZERS)}")
+    module_name, class_name = ANALYZERS[name].split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_analyzer(name=None, **options):
+    """Create the configured (or named) analyzer."""
+    return get_analyzer_class(name)(**options)
+
+
+__all__ = [
+    'ANALYZERS', 'NO_FACE', 'EmotionAnalyzer', 'FrameAnalysis', 'confidence_from_emotions',
+    'create_analyzer', 'get_analyzer_class', 'register_analyzer',
+]
@@ -0,0 +1,97 @@
+from collections import namedtuple
+
+import numpy as np
+
+
+# Result of analyzing one frame.
+#   faces:      detected face regions as {'x', 'y', 'w', 'h'} dicts, largest first
+#   emotions:   {emotion: score 0-100} of the analyzed face, or None without a face
+#   confidence: confidence signal 0-100 derived from the emotions
+FrameAnalysis = namedtuple('FrameAnalysis', ['faces', 'emotions', 'confidence'])
+
+NO_FACE = FrameAnalysis([], None, 0.0)
+
+
+class _NoStage:
+    """Stage timer used when the caller does not time stages."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def no_stage(name):
+    return _NO_STAGE
+
+
+def confidence_from_emotions(emotions):
+    """Simple confidence signal estimation (smile + neutral - fear - sad), clamped to 0-100."""
+    confidence = (
+        emotions.get('happy', 0) +
+        emotions.get('neutral', 0) * 0.5 -
+        emotions.get('fear', 0) -
+        emotions.get('sad', 0)
+    )
+    return float(max(0, min(100, confidence)))
+
+
+def face_region(x, y, w, h):
+    return {'x': int(x), 'y': int(y), 'w': int(w), 'h': int(h)}
+
+
+class EmotionAnalyzer:
+    """
+    Frame in, faces + emotions + confidence out.
+
+    Implementations provide decode() and either detect() + classify() or
+    their own analyze(). `stage` is a callable returning a context manager
+    per stage name ('detect', 'classify'), used by the session store to time
+    stages into its metrics and traces.
+    """
+
+    name = None
+
+    # Size of the blank frame used to warm up the analyzer
+    WARMUP_SHAPE = (480, 640, 3)
+
+    def decode(self, frame_data):
+        """Decode JPEG bytes into the image representation used by this analyzer, or None."""
+        raise NotImplementedError
+
+    def detect(self, image):
+        """Return face regions in the decoded image, largest first."""
+        raise NotImplementedError
+
+    def classify(self, image, face):
+        """Return {emotion: score} for one face region of the decoded image."""
+        raise NotImplementedError
+
+    def analyze(self, image, stage=no_stage):
+        """Detect the faces of a decoded image and classify the largest one."""
+        with stage('detect'):
+            faces = self.detect(image)
+
+        if not faces:
+            return NO_FACE
+
+        with stage('classify'):
+            emotions = self.classify(image, faces[0])
+
+        return FrameAnalysis(faces, emotions, confidence_from_emotions(emotions))
+
+    def analyze_frame(self, frame_data, stage=no_stage):
+        """Decode and analyze JPEG bytes; returns None if the frame cannot be decoded."""
+        with stage('decode'):
+            image = self.decode(frame_data)
+        if image is None:
+            return None
+        return self.analyze(image, stage)
+
+    def warm_up(self):
+        """Load the model and run one inference on a blank frame."""
+        self.analyze(self.decode(np.zeros(self.WARMUP_SHAPE, dtype=np.uint8)))
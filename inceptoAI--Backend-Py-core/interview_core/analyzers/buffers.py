@@ -0,0 +1,79 @@
+import cv2
+import numpy as np
+
+# Grayscale decode flags by JPEG downscale factor; libjpeg scales while decoding
+GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+class BufferPool:
+    """
+    Named image buffers reused frame after frame.
+
+    A pool belongs to one analyzer, i.e. to one session's analysis worker,
+    so its buffers are never used by two threads. A buffer is reallocated
+    only when the requested shape or dtype changes (a new camera
+    resolution). With reuse=False every request allocates, as before pooling.
+    """
+
+    def __init__(self, reuse=True):
+        self.reuse = reuse
+        self.allocations = 0
+        self._buffers = {}
+
+    def get(self, name, shape, dtype=np.uint8):
+        buffer = self._buffers.get(name)
+        if not self.reuse or buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+        return buffer
+
+
+class GrayFrameDecoder:
+    """
+    Decodes JPEG frames to grayscale images at most `max_width` wide.
+
+    imdecode cannot write into an existing array, so the decode is made
+    smaller instead: the frame is decoded straight to grayscale, and
+    downscaled by libjpeg by the largest power of two that keeps it at
+    least `max_width` wide (learned from the previous frame of the
+    session). The final resize and color conversion write into pooled
+    buffers. The returned image is only valid until the next decode.
+    """
+
+    def __init__(self, max_width, pool):
+        self.max_width = max_width
+        self.pool = pool
+        self.reduction = 1
+
+    def decode(self, frame_data):
+        if isinstance(frame_data, bytes):
+            frame = cv2.imdecode(np.frombuffer(frame_data, np.uint8), GRAYSCALE_FLAGS[self.reduction])
+            if frame is None or frame.size == 0:
+                return None
+            self.reduction = self._reduction_for(frame.shape[1] * self.reduction)
+        else:
+            frame = frame_data
+            if frame is None or frame.size == 0:
+                return None
+            if frame.ndim == 3:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.pool.get('gray', frame.shape[:2]))
+
+        height, width = frame.shape[:2]
+        if width > self.max_width:
+            size = (self.max_width, int(height * self.max_width / width))
+            frame = cv2.resize(
+                frame, size, dst=self.pool.get('resized', (size[1], size[0])), interpolation=cv2.INTER_AREA
+            )
+        return frame
+
+    def _reduction_for(self, width):
+        reduction = 1
+        while reduction < 8 and width / (reduction * 2) >= self.max_width:
+            reduction *= 2
+        return reduction
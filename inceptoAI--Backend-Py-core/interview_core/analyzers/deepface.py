@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+
+from interview_core import settings
+
+from interview_core.analyzers.base import (
+    NO_FACE, EmotionAnalyzer, FrameAnalysis, confidence_from_emotions, face_region, no_stage
+)
+from interview_core.analyzers.buffers import BufferPool
+from interview_core.analyzers.detection import TrackingFaceDetector
+
+
+def emotions_from_result(result):
+    """Emotion scores of one DeepFace.analyze result, as Python floats."""
+    return {emotion: float(value) for emotion, value in result.get('emotion', {}).items()}
+
+
+class DeepFaceAnalyzer(EmotionAnalyzer):
+    """
+    DeepFace emotion model.
+
+    With detection='pipeline' (DEEPFACE_DETECTION) faces are detected and
+    tracked here, and DeepFace only classifies the face crop
+    (detector_backend='skip'). With detection='deepface', DeepFace.analyze
+    detects the face itself on every full frame, so detection is part of the
+    'classify' stage.
+    """
+
+    name = 'deepface'
+
+    def __init__(self, detector_backend='opencv', detection=None):
+        self.detector_backend = detector_backend
+        self.detection = detection or settings.DEEPFACE_DETECTION
+        if self.detection not in ('pipeline', 'deepface'):
+            raise ValueError(f"Unknown DeepFace detection mode '{self.detection}', expected 'pipeline' or 'deepface'")
+        self.detector = TrackingFaceDetector() if self.detection == 'pipeline' else None
+        self.buffers = BufferPool()
+
+    def decode(self, frame_data):
+        """Decode a JPEG frame into a BGR image, or None if it cannot be decoded."""
+        if isinstance(frame_data, bytes):
+            nparr = np.frombuffer(frame_data, np.uint8)
+            return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        return frame_data
+
+    def detect(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=self.buffers.get('gray', image.shape[:2]))
+        return self.detector.detect(gray)
+
+    def classify(self, image, face):
+        from deepface import DeepFace
+
+        crop = image[face['y']:face['y'] + face['h'], face['x']:face['x'] + face['w']]
+        result = DeepFace.analyze(
+            crop,
+            actions=['emotion'],
+            detector_backend='skip',
+            enforce_detection=False,
+            silent=True
+        )
+        return emotions_from_result(result[0] if isinstance(result, list) else result)
+
+    def analyze(self, image, stage=no_stage):
+        if self.detection == 'pipeline':
+            return super().analyze(image, stage)
+
+        from deepface import DeepFace
+
+        with stage('classify'):
+            result = DeepFace.analyze(
+                image,
+                actions=['emotion'],
+                detector_backend=self.detector_backend,
+                enforce_detection=False,
+                silent=True
+            )
+
+        # DeepFace might return a list or a single result depending on faces found
+        if isinstance(result, list):
+            if not result:  # Empty list (no faces detected)
+                return NO_FACE
+            results = result
+        else:
+            results = [result]
+
+        faces = [
+            face_region(r['region']['x'], r['region']['y'], r['region']['w'], r['region']['h'])
+            for r in results if r.get('region')
+        ]
+
+        # The first face is analyzed
+        emotions = emotions_from_result(results[0])
+        return FrameAnalysis(faces, emotions, confidence_from_emotions(emotions))
+
+    def warm_up(self):
+        if self.detection == 'pipeline':
+            # A blank frame has no face, so classify it as a whole to load the model
+            image = self.decode(np.zeros(self.WARMUP_SHAPE, dtype=np.uint8))
+            self.detect(image)
+            self.classify(image, face_region(0, 0, image.shape[1], image.shape[0]))
+        else:
+            super().warm_up()
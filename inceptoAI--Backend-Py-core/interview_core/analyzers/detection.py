@@ -0,0 +1,161 @@
+import threading
+from collections import deque
+
+import cv2
+
+from interview_core.metrics import FACE_DETECTION_PASSES, FACE_DETECTION_RESULTS
+
+from interview_core.analyzers.base import face_region
+
+# Cascades of detect_faces() callers that do not bring their own, one per thread:
+# a CascadeClassifier must not be used by several threads at once
+_local = threading.local()
+
+
+def load_face_cascade():
+    """A new instance of the face cascade of DeepFace's 'opencv' detector."""
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    if cascade.empty():
+        raise Exception("Failed to load face cascade!")
+    return cascade
+
+
+def detect_faces(gray, min_size=None, max_size=None, cascade=None):
+    """
+    Detect faces in a grayscale image with the cascade and parameters of
+    DeepFace's 'opencv' detector.
+
+    Args:
+        gray: Grayscale image
+        min_size, max_size: Bounds of the face size in pixels
+        cascade: Cascade from load_face_cascade(), used by one thread at a
+            time (default: one of the calling thread's own)
+
+    Returns:
+        Face regions as {'x', 'y', 'w', 'h'} dicts, largest first
+    """
+    if cascade is None:
+        cascade = getattr(_local, 'cascade', None)
+        if cascade is None:
+            cascade = _local.cascade = load_face_cascade()
+
+    sizes = {}
+    if min_size:
+        sizes['minSize'] = (min_size, min_size)
+    if max_size:
+        sizes['maxSize'] = (max_size, max_size)
+    faces = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=10, **sizes)
+    faces = sorted(faces, key=lambda f: f[2] * f[3], reverse=True)
+    return [face_region(*face) for face in faces]
+
+
+class FaceTracker:
+    """
+    Where the candidate's face was in the previous frames, and how big.
+
+    Webcam interviews show one face that moves little between frames, so
+    the next search can be limited to a window around the last face and to
+    face sizes close to the recent ones. The whole frame is searched again
+    when the face is lost and every `redetect_interval` frames; sizes are
+    forgotten once the face has been missing for `history` frames.
+    """
+
+    def __init__(self, margin=0.5, size_tolerance=0.3, redetect_interval=30, history=10):
+        self.margin = margin
+        self.size_tolerance = size_tolerance
+        self.redetect_interval = redetect_interval
+        self.last_face = None
+        self.sizes = deque(maxlen=history)
+        self.misses = 0
+        self.frames_since_full_search = 0
+
+    def search_window(self, shape):
+        """(x0, y0, x1, y1) to search in, or None to search the whole frame."""
+        if self.last_face is None or self.frames_since_full_search >= self.redetect_interval:
+            return None
+        face = self.last_face
+        dx = int(face['w'] * self.margin)
+        dy = int(face['h'] * self.margin)
+        height, width = shape[:2]
+        return (
+            max(0, face['x'] - dx), max(0, face['y'] - dy),
+            min(width, face['x'] + face['w'] + dx), min(height, face['y'] + face['h'] + dy)
+        )
+
+    def size_range(self, tolerance=None):
+        """(min_size, max_size) of the faces seen recently, widened by `tolerance`; None without history."""
+        if not self.sizes:
+            return None
+        tolerance = self.size_tolerance if tolerance is None else tolerance
+        return int(min(self.sizes) * (1 - tolerance)), int(max(self.sizes) * (1 + tolerance)) + 1
+
+    def update(self, faces, full_search):
+        self.frames_since_full_search = 0 if full_search else self.frames_since_full_search + 1
+        if faces:
+            self.last_face = faces[0]
+            self.sizes.append(max(faces[0]['w'], faces[0]['h']))
+            self.misses = 0
+        else:
+            self.last_face = None
+            self.misses += 1
+            if self.misses >= self.sizes.maxlen:
+                self.sizes.clear()
+
+
+def detect_scaled(cascade, gray, size_range, target_size, **params):
+    """
+    cascade.detectMultiScale() for faces within `size_range` only.
+
+    The image is first downscaled so that the smallest expected face is
+    about `target_size` pixels, so the image pyramid starts near the
+    expected face size instead of at the cascade's window size.
+
+    Returns:
+        Face regions in the coordinates of `gray`, largest first
+    """
+    min_size, max_size = size_range
+    scale = min(1.0, target_size / max(min_size, 1))
+    image = gray
+    if scale < 1.0:
+        image = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    faces = cascade.detectMultiScale(
+        image,
+        minSize=(int(min_size * scale), int(min_size * scale)),
+        maxSize=(int(max_size * scale) + 1, int(max_size * scale) + 1),
+        **params
+    )
+    faces = sorted(faces, key=lambda f: f[2] * f[3], reverse=True)
+    return [face_region(x / scale, y / scale, w / scale, h / scale) for (x, y, w, h) in faces]
+
+
+# Escalation levels of the tracking detectors, cheapest first
+PASSES = {level: FACE_DETECTION_PASSES.labels(level=level) for level in ('tracked', 'full', 'relaxed')}
+RESULTS = {level: FACE_DETECTION_RESULTS.labels(level=level) for level in ('tracked', 'full', 'relaxed', 'none')}
+
+
+class TrackingFaceDetector:
+    """detect_faces() restricted to the window around the tracked face, with a whole-frame fallback."""
+
+    def __init__(self, tracker=None):
+        self.tracker = tracker or FaceTracker()
+        # Its own cascade, like its analyzer's other state: sessions are analyzed on different threads
+        self.cascade = load_face_cascade()
+
+    def detect(self, gray):
+        window = self.tracker.search_window(gray.shape)
+        if window is not None:
+            x0, y0, x1, y1 = window
+            PASSES['tracked'].inc()
+            faces = detect_faces(gray[y0:y1, x0:x1], *self.tracker.size_range(), cascade=self.cascade)
+            if faces:
+                faces = [face_region(f['x'] + x0, f['y'] + y0, f['w'], f['h']) for f in faces]
+                self.tracker.update(faces, full_search=False)
+                RESULTS['tracked'].inc()
+                return faces
+
+        PASSES['full'].inc()
+        faces = detect_faces(gray, cascade=self.cascade)
+        self.tracker.update(faces, full_search=True)
+        RESULTS['full' if faces else 'none'].inc()
+        return faces
@@ -0,0 +1,112 @@
+"""
+Export DeepFace's emotion classifier to ONNX for the 'onnx' analyzer.
+
+Needs deepface, tensorflow and tf2onnx (export only; the analyzer itself
+only needs onnxruntime and OpenCV). Optionally writes an int8 quantized
+copy next to the float model:
+- dynamic: int8 weights, activations quantized on the fly
+- static: int8 weights and activations, calibrated on face crops taken from
+  JPEG frames (e.g. the benchmark fixtures)
+
+Usage (from the backend directory):
+    python -m interview_core.analyzers.export_onnx --output data/models/emotion.onnx
+    python -m interview_core.analyzers.export_onnx --quantize static --calibration ../benchmarks/fixtures
+"""
+import argparse
+import glob
+import os
+
+import cv2
+
+from interview_core import settings
+
+from interview_core.analyzers.detection import detect_faces
+from interview_core.analyzers.onnx_runtime import INPUT_SIZE, preprocess_faces
+
+
+def load_keras_model():
+    """The Keras emotion model DeepFace.analyze uses."""
+    from deepface import DeepFace
+
+    try:
+        client = DeepFace.build_model(model_name='Emotion', task='facial_attribute')
+    except TypeError:
+        # deepface < 0.0.90 has no task argument
+        client = DeepFace.build_model('Emotion')
+    # Newer deepface versions wrap the Keras model in a client object
+    return getattr(client, 'model', client)
+
+
+def export(output_path, opset=13):
+    import tensorflow as tf
+    import tf2onnx
+
+    model = load_keras_model()
+    signature = (tf.TensorSpec((None, INPUT_SIZE, INPUT_SIZE, 1), tf.float32, name='face'),)
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=opset, output_path=output_path)
+
+
+def calibration_batches(directory, limit=200):
+    """Preprocessed face crops from the JPEG frames of a directory, one batch per face."""
+    batches = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.jpg'))):
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+        batches.extend(preprocess_faces(gray, [face]) for face in detect_faces(gray))
+        if len(batches) >= limit:
+            break
+    if not batches:
+        raise SystemExit(f"No faces found for calibration in {directory}")
+    return batches
+
+
+def quantize(model_path, output_path, mode, calibration=None):
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType
+    from onnxruntime.quantization import quantize_dynamic, quantize_static
+
+    if mode == 'dynamic':
+        quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+        return
+
+    import onnxruntime as ort
+    input_name = ort.InferenceSession(model_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+
+    class FaceReader(CalibrationDataReader):
+        def __init__(self, batches):
+            self.batches = iter(batches)
+
+        def get_next(self):
+            batch = next(self.batches, None)
+            return None if batch is None else {input_name: batch}
+
+    quantize_static(
+        model_path, output_path, FaceReader(calibration_batches(calibration)),
+        quant_format=QuantFormat.QDQ, activation_type=QuantType.QInt8, weight_type=QuantType.QInt8
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=settings.ONNX_EMOTION_MODEL, help="Path of the float ONNX model")
+    parser.add_argument('--opset', type=int, default=13)
+    parser.add_argument('--quantize', choices=['none', 'dynamic', 'static'], default='none')
+    parser.add_argument('--calibration', help="Directory of JPEG frames used to calibrate static quantization")
+    args = parser.parse_args()
+
+    if args.quantize == 'static' and not args.calibration:
+        parser.error("--quantize static needs --calibration")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    export(args.output, args.opset)
+    print(f"Exported {args.output}")
+
+    if args.quantize != 'none':
+        root, ext = os.path.splitext(args.output)
+        quantized_path = f"{root}.int8{ext}"
+        quantize(args.output, quantized_path, args.quantize, args.calibration)
+        print(f"Quantized ({args.quantize}) {quantized_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+import cv2
+import numpy as np
+
+from interview_core.metrics import FACE_DETECTION_SKIPPED
+
+from interview_core.analyzers.base import EmotionAnalyzer, face_region
+from interview_core.analyzers.buffers import BufferPool, GrayFrameDecoder
+from interview_core.analyzers.detection import PASSES, RESULTS, FaceTracker, detect_scaled
+
+RELAXED_SKIPPED = FACE_DETECTION_SKIPPED.labels(level='relaxed')
+
+
+class HaarCascadeAnalyzer(EmotionAnalyzer):
+    """
+    Lightweight analyzer: Haar cascade face detection and a smile/brightness
+    heuristic for emotions. Needs only OpenCV.
+
+    Detection escalates through bounded levels, cheapest first:
+    - tracked: the window around the last face, for face sizes close to
+      the recent ones, on an image scaled to the expected face size
+    - full: the whole frame, for a wider range of recent face sizes
+    - relaxed: the whole frame with relaxed parameters; run for the first
+      RELAXED_MAX_MISSES frames without a face, then only every
+      RELAXED_INTERVAL frames while the face stays missing
+    """
+
+    name = 'haar'
+
+    # Frames wider than this are downscaled before detection
+    MAX_WIDTH = 640
+
+    # Smallest expected face after scaling the image for a bounded search,
+    # about twice the cascade's 20x20 window
+    TARGET_FACE_SIZE = 40
+    # Widening of the recent face size range for the whole-frame search
+    FULL_FRAME_TOLERANCE = 0.6
+    RELAXED_MAX_MISSES = 3
+    RELAXED_INTERVAL = 10
+
+    # Faces wider than this are downscaled before looking for a smile
+    SMILE_FACE_WIDTH = 96
+    # The mouth is looked for below this fraction of the face height
+    MOUTH_TOP = 0.5
+
+    def __init__(self):
+        # Try alternative cascade - often more reliable
+        try:
+            self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_alt2.xml')
+        except:
+            self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+        self.smile_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_smile.xml')
+
+        if self.face_cascade.empty():
+            raise Exception("Failed to load face cascade!")
+
+        self.tracker = FaceTracker()
+        self.buffers = BufferPool()
+        self.decoder = GrayFrameDecoder(self.MAX_WIDTH, self.buffers)
+
+    def decode(self, frame_data):
+        """Decode a JPEG frame into an equalized grayscale image, or None if it is invalid."""
+        gray = self.decoder.decode(frame_data)
+        if gray is None:
+            return None
+
+        # Enhance contrast for better detection
+        return cv2.equalizeHist(gray, dst=self.buffers.get('equalized', gray.shape))
+
+    def detect(self, gray):
+        """Detect faces in an equalized grayscale frame, largest first."""
+        faces = []
+        window = self.tracker.search_window(gray.shape)
+        if window is not None:
+            x0, y0, x1, y1 = window
+            PASSES['tracked'].inc()
+            faces = detect_scaled(
+                self.face_cascade, gray[y0:y1, x0:x1], self.tracker.size_range(), self.TARGET_FACE_SIZE,
+                scaleFactor=1.05, minNeighbors=2
+            )
+            faces = [face_region(f['x'] + x0, f['y'] + y0, f['w'], f['h']) for f in faces]
+            level = 'tracked'
+
+        if not faces:
+            PASSES['full'].inc()
+            size_range = self.tracker.size_range(self.FULL_FRAME_TOLERANCE)
+            if size_range is not None:
+                faces = detect_scaled(
+                    self.face_cascade, gray, size_range, self.TARGET_FACE_SIZE, scaleFactor=1.05, minNeighbors=2
+                )
+            else:
+                faces = self._detect(gray, scaleFactor=1.05, minNeighbors=2, minSize=(20, 20))
+            level = 'full'
+
+        if not faces:
+            misses = self.tracker.misses
+            if misses < self.RELAXED_MAX_MISSES or misses % self.RELAXED_INTERVAL == 0:
+                PASSES['relaxed'].inc()
+                faces = self._detect(gray, scaleFactor=1.1, minNeighbors=1, minSize=(15, 15))
+                level = 'relaxed'
+            else:
+                RELAXED_SKIPPED.inc()
+
+        self.tracker.update(faces, full_search=level != 'tracked')
+        RESULTS[level if faces else 'none'].inc()
+        return faces
+
+    def _detect(self, gray, **params):
+        faces = self.face_cascade.detectMultiScale(gray, flags=cv2.CASCADE_SCALE_IMAGE, **params)
+        faces = sorted(faces, key=lambda f: f[2] * f[3], reverse=True)
+        return [face_region(*face) for face in faces]
+
+    def classify(self, gray, face):
+        region = gray[face['y']:face['y'] + face['h'], face['x']:face['x'] + face['w']]
+        return {emotion: float(score) for emotion, score in self.analyze_facial_features(region).items()}
+
+    def analyze_facial_features(self, face_region):
+        """Memory-efficient facial feature analysis"""
+        emotions = {
+            'happy': 0.0,
+            'neutral': 60.0,
+            'sad': 0.0,
+            'angry': 0.0,
+            'surprise': 0.0,
+            'disgust': 0.0,
+            'fear': 0.0
+        }
+
+        # Detect smiles with optimized parameters, on the downscaled mouth area only
+        smiles = self.smile_cascade.detectMultiScale(
+            self._mouth_region(face_region),
+            scaleFactor=1.8,
+            minNeighbors=20,
+            minSize=(25, 25)  # Smaller minimum size for efficiency
+        )
+
+        if len(smiles) > 0:
+            emotions['happy'] = 75.0
+            emotions['neutral'] = 25.0
+            return emotions
+
+        # Quick statistical analysis
+        brightness = float(np.mean(face_region))  # Convert to float to save memory
+
+        # Simple emotion mapping
+        if brightness < 80:
+            emotions['sad'] = 40.0
+            emotions['neutral'] = 40.0
+            emotions['angry'] = 20.0
+        elif brightness > 140:
+            emotions['surprise'] = 35.0
+            emotions['neutral'] = 45.0
+            emotions['happy'] = 20.0
+        else:
+            emotions['neutral'] = 80.0
+            emotions['happy'] = 10.0
+            emotions['sad'] = 10.0
+
+        return emotions
+
+    def _mouth_region(self, face_region):
+        """Lower part of a face region, downscaled to at most SMILE_FACE_WIDTH wide."""
+        height, width = face_region.shape[:2]
+        mouth = face_region[int(height * self.MOUTH_TOP):]
+        if width > self.SMILE_FACE_WIDTH:
+            scale = self.SMILE_FACE_WIDTH / width
+            mouth = cv2.resize(
+                mouth, (self.SMILE_FACE_WIDTH, max(1, int(mouth.shape[0] * scale))), interpolation=cv2.INTER_AREA
+            )
+        return mouth
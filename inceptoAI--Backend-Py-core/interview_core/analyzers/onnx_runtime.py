@@ -0,0 +1,134 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from interview_core import settings
+
+from interview_core.analyzers.base import NO_FACE, EmotionAnalyzer, FrameAnalysis, confidence_from_emotions
+from interview_core.analyzers.buffers import BufferPool, GrayFrameDecoder
+from interview_core.analyzers.detection import TrackingFaceDetector
+
+# Output order of the DeepFace emotion model
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+# Input size of the DeepFace emotion model (48x48 grayscale)
+INPUT_SIZE = 48
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(model_path, intra_op_threads=0):
+    """
+    Shared ONNX Runtime CPU session for one model file and thread count.
+
+    Sessions are thread-safe for run(), so every analysis worker uses the
+    same one instead of loading a copy of the model per interview.
+    """
+    key = (model_path, intra_op_threads)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                import onnxruntime as ort
+
+                options = ort.SessionOptions()
+                options.intra_op_num_threads = intra_op_threads
+                options.inter_op_num_threads = 1
+                options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+                _sessions[key] = session
+    return session
+
+
+def preprocess_faces(gray, faces):
+    """Crop face regions of a grayscale image into a (N, 48, 48, 1) float batch scaled to [0, 1]."""
+    batch = np.empty((len(faces), INPUT_SIZE, INPUT_SIZE, 1), dtype=np.float32)
+    for i, face in enumerate(faces):
+        crop = gray[face['y']:face['y'] + face['h'], face['x']:face['x'] + face['w']]
+        batch[i, :, :, 0] = cv2.resize(crop, (INPUT_SIZE, INPUT_SIZE))
+    batch *= 1.0 / 255
+    return batch
+
+
+class OnnxEmotionAnalyzer(EmotionAnalyzer):
+    """
+    DeepFace's emotion classifier exported to ONNX (optionally int8
+    quantized) and run on ONNX Runtime's CPU provider, without TensorFlow.
+
+    Faces are detected like DeepFace's 'opencv' detector does, around the
+    face tracked from the previous frames. Export the model with
+    `python -m interview_core.analyzers.export_onnx`.
+    """
+
+    name = 'onnx'
+
+    MAX_WIDTH = 640
+
+    def __init__(self, model_path=None, int8=None, intra_op_threads=None):
+        self.model_path = model_path or settings.ONNX_EMOTION_MODEL
+        if settings.ONNX_INT8 if int8 is None else int8:
+            # The int8 model is written next to the float one by export_onnx
+            root, ext = os.path.splitext(self.model_path)
+            self.model_path = f"{root}.int8{ext}"
+        self.intra_op_threads = settings.ONNX_INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+        self.session = get_session(self.model_path, self.intra_op_threads)
+        self.input_name = self.session.get_inputs()[0].name
+        self.detector = TrackingFaceDetector()
+        self.buffers = BufferPool()
+        self.decoder = GrayFrameDecoder(self.MAX_WIDTH, self.buffers)
+
+    def decode(self, frame_data):
+        """Decode a JPEG frame into a grayscale image, or None if it cannot be decoded."""
+        return self.decoder.decode(frame_data)
+
+    def detect(self, gray):
+        """Detect faces in a grayscale frame, largest first."""
+        return self.detector.detect(gray)
+
+    def predict(self, batch):
+        """Run the classifier on a preprocessed batch; returns (N, 7) scores in percent."""
+        return self.session.run(None, {self.input_name: batch})[0] * 100
+
+    def classify(self, gray, face):
+        return self.classify_batch(gray, [face])[0]
+
+    def classify_batch(self, gray, faces):
+        """Classify several faces of one image with a single model call."""
+        return [self._emotions(scores) for scores in self.predict(preprocess_faces(gray, faces))]
+
+    def analyze_batch(self, frames_data):
+        """
+        Analyze several JPEG frames, classifying the largest face of every
+        frame in one batched model call.
+
+        Returns:
+            One FrameAnalysis per frame (NO_FACE without a face, None if undecodable)
+        """
+        results = [None] * len(frames_data)
+        crops = []
+        pending = []
+        for i, frame_data in enumerate(frames_data):
+            gray = self.decode(frame_data)
+            if gray is None:
+                continue
+            faces = self.detect(gray)
+            if not faces:
+                results[i] = NO_FACE
+                continue
+            crops.append(preprocess_faces(gray, faces[:1]))
+            pending.append((i, faces))
+
+        if crops:
+            for (i, faces), scores in zip(pending, self.predict(np.concatenate(crops))):
+                emotions = self._emotions(scores)
+                results[i] = FrameAnalysis(faces, emotions, confidence_from_emotions(emotions))
+        return results
+
+    @staticmethod
+    def _emotions(scores):
+        return {label: float(score) for label, score in zip(EMOTION_LABELS, scores)}
@@ -0,0 +1,77 @@
+import logging
+import time
+
+from interview_core import settings
+from interview_core.offload import os_threading
+
+from interview_core.analyzers import create_analyzer
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyzerWarmup:
+    """
+    Warm-up state of the configured frame analyzer.
+
+    The model is cold until either the background warm-up or the first
+    analyzed frame has loaded it. The state is one of 'cold', 'warming',
+    'warm' or 'failed', and is reported by the /ready endpoint.
+    """
+
+    def __init__(self, analyzer_name=None):
+        self.analyzer_name = analyzer_name
+        self.state = 'cold'
+        self.error = None
+        self.started_at = None
+        self.seconds = None
+        # Set from frame worker threads: the unpatched primitives (see interview_core.offload)
+        self._warm = os_threading.Event()
+        self._lock = os_threading.Lock()
+
+    @property
+    def warm(self):
+        return self._warm.is_set()
+
+    def start(self):
+        """Warm the analyzer up on a background OS thread, off the eventlet hub; no-op if already started."""
+        with self._lock:
+            if self.state in ('warming', 'warm'):
+                return
+            self.state = 'warming'
+            self.started_at = time.time()
+        os_threading.Thread(target=self.run, name='analyzer-warmup', daemon=True).start()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            create_analyzer(self.analyzer_name).warm_up()
+        except Exception as e:
+            self.state = 'failed'
+            self.error = str(e)
+            logger.error(f"Analyzer warm-up failed: {str(e)}", exc_info=True)
+            return
+        self.seconds = time.perf_counter() - start
+        self.mark_warm()
+        logger.info(f"Analyzer warm-up finished in {self.seconds:.2f} s")
+
+    def mark_warm(self):
+        """Record that the model is loaded, e.g. after the first analyzed frame."""
+        self.state = 'warm'
+        self.error = None
+        self._warm.set()
+
+    def wait(self, timeout=None):
+        """Block until the model is warm; returns False on timeout."""
+        return self._warm.wait(timeout)
+
+    def snapshot(self):
+        return {
+            'state': self.state,
+            'analyzer': self.analyzer_name or settings.EMOTION_ANALYZER,
+            'warmup_seconds': self.seconds,
+            'error': self.error,
+        }
+
+
+# Process-wide warm-up state of the configured analyzer
+model_warmup = AnalyzerWarmup()
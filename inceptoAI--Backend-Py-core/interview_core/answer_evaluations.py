@@ -0,0 +1,230 @@
+"""
+LLM evaluation of each answer as soon as it is submitted.
+
+complete_interview used to evaluate every answer one after the other, so
+the candidate waited for five LLM calls at the end of the interview.
+Instead, saving an answer (next-question, POST /api/question-answers or the
+question_answer_data event) calls answer_evaluations.submit(), which queues
+an evaluation of each answer of the session that changed since it was last
+evaluated. The evaluation is stored on its response with a fingerprint of
+what it was based on (question, answer, speech metrics and role);
+complete_interview reuses the evaluations whose fingerprint still matches,
+waits up to EVALUATION_WAIT_SECONDS for those still running, and evaluates
+only the rest. A running evaluation is tracked until it finishes; its
+result then lives on the session's response only.
+
+An evaluation sees the session's emotion analysis as of when it starts:
+frames of the answer that are analyzed later do not change it. The
+report's emotion metrics are computed at completion, from all frames.
+
+The evaluations run on their own event loop thread, so they proceed in
+eventlet mode (where each request runs its coroutines with asyncio.run) as
+well as in ASGI mode. INCREMENTAL_EVALUATION=false turns them off.
+
+Each backend creates its instance with its own InterviewEvaluator (see
+models/interview_evaluator.py), which evaluates answers with its LLM, and
+binds the interview_answer_evaluations_pending gauge to it.
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+
+from interview_core import settings
+from interview_core.metrics import (
+    ANSWER_EVALUATION_WAIT_SECONDS, ANSWER_EVALUATIONS, ANSWER_EVALUATIONS_QUEUED
+)
+from interview_core.offload import os_threading
+
+logger = logging.getLogger(__name__)
+
+
+def answer_fingerprint(response, role):
+    """Fingerprint of what the evaluation of an answer depends on."""
+    speech = response.get('speech_analysis') or {}
+    key = json.dumps(
+        [role, str(response.get('question_number')), response.get('question_text'), response.get('answer'),
+         speech.get('wpm', 0), speech.get('clarity', 0)],
+        default=str,
+    )
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class AnswerEvaluations:
+    """
+    Background evaluations of the answers of all sessions.
+
+    Args:
+        evaluator_class: Class whose instances evaluate answers, with a
+            session_role(responses) static method and an async
+            evaluate_answer(response, emotion_data, role, raise_errors) method
+        session_store: Callable returning the session data store of a
+            session ID, or None once the session is gone
+
+    Usage:
+        answer_evaluations = AnswerEvaluations(InterviewEvaluator, session_stores.get)
+        answer_evaluations.submit(session_id)            # after saving an answer
+        evaluation = await answer_evaluations.result(session_id, response, role)
+    """
+
+    def __init__(self, evaluator_class, session_store, enabled=None, wait_seconds=None):
+        self.evaluator_class = evaluator_class
+        self.session_store = session_store
+        self.enabled = settings.INCREMENTAL_EVALUATION if enabled is None else enabled
+        self.wait_seconds = settings.EVALUATION_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        # (session_id, question key) -> (fingerprint, concurrent.futures.Future), until it finishes
+        self._pending = {}
+        self._lock = os_threading.Lock()
+        self._loop = None
+        self._evaluator = None
+
+    def __len__(self):
+        """Evaluations queued or running."""
+        with self._lock:
+            return sum(1 for _, future in self._pending.values() if not future.done())
+
+    def _event_loop(self):
+        """The event loop the evaluations run on, started on first use. Callers hold _lock."""
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            os_threading.Thread(target=loop.run_forever, name='answer-evaluations', daemon=True).start()
+            self._loop = loop
+        return self._loop
+
+    def submit(self, session_id):
+        """
+        Queue the evaluation of each answer of a session that is new or changed.
+
+        Args:
+            session_id: Session whose answers to evaluate
+
+        Returns:
+            int: Number of evaluations queued
+        """
+        store = self.session_store(session_id)
+        if not self.enabled or store is None:
+            return 0
+
+        responses = store.snapshot().responses
+        role = self.evaluator_class.session_role(responses)
+        queued = 0
+        for question_key, response in responses.items():
+            if not isinstance(response, dict) or not response.get('answer'):
+                continue
+            fingerprint = answer_fingerprint(response, role)
+            if response.get('evaluation_fingerprint') == fingerprint:
+                continue
+
+            with self._lock:
+                pending = self._pending.get((session_id, question_key))
+                if pending is not None and pending[0] == fingerprint:
+                    continue
+                future = asyncio.run_coroutine_threadsafe(
+                    self._evaluate(session_id, question_key, fingerprint, response, role), self._event_loop()
+                )
+                self._pending[(session_id, question_key)] = (fingerprint, future)
+            if pending is not None:
+                # The answer changed: its previous evaluation is of no use. Cancelled
+                # without the lock, which the future's done callback takes
+                pending[1].cancel()
+            future.add_done_callback(functools.partial(self._finished, (session_id, question_key)))
+            queued += 1
+
+        ANSWER_EVALUATIONS_QUEUED.inc(queued)
+        return queued
+
+    def _finished(self, key, future):
+        """Stop tracking an evaluation once it is done (stored on its response, failed or cancelled)."""
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None and pending[1] is future:
+                del self._pending[key]
+
+    async def _evaluate(self, session_id, question_key, fingerprint, response, role):
+        """Evaluate one answer on the evaluation loop and store the result on its response."""
+        if self._evaluator is None:
+            # Created on the evaluation loop, which its LLM client then belongs to
+            self._evaluator = self.evaluator_class()
+
+        # As of now: frames analyzed while the LLM evaluates are not taken into account
+        store = self.session_store(session_id)
+        emotion_data = store.snapshot().emotion_analysis() if store is not None else None
+
+        # Failures raise, so that complete_interview evaluates the answer again
+        evaluation = await self._evaluator.evaluate_answer(response, emotion_data, role, raise_errors=True)
+
+        store = self.session_store(session_id)
+        if store is not None:
+            store.set_answer_evaluation(question_key, evaluation, fingerprint)
+        return evaluation
+
+    async def result(self, session_id, response, role):
+        """
+        The background evaluation of an answer, if there is one for its current content.
+
+        Waits up to wait_seconds for an evaluation that is still running.
+
+        Args:
+            session_id: Session of the answer
+            response: The response, as in the session snapshot being evaluated
+            role: Role the session is evaluated for
+
+        Returns:
+            dict or None: The evaluation, or None if the answer has to be evaluated now
+        """
+        fingerprint = answer_fingerprint(response, role)
+        if response.get('evaluation_fingerprint') == fingerprint and response.get('evaluation'):
+            ANSWER_EVALUATIONS.labels(source='background').inc()
+            return response['evaluation']
+
+        question_key = str(response.get('question_number'))
+        with self._lock:
+            pending = self._pending.get((session_id, question_key))
+        if pending is None or pending[0] != fingerprint:
+            # It may have finished since `response` was read: look on the session's current response
+            return self._stored(session_id, question_key, fingerprint)
+
+        fingerprint, future = pending
+        if future.done() and not future.cancelled() and future.exception() is None:
+            ANSWER_EVALUATIONS.labels(source='background').inc()
+            return future.result()
+
+        started = time.perf_counter()
+        try:
+            evaluation = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.wait_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"Evaluation of question {response.get('question_number')} of session {session_id} "
+                           f"still running after {self.wait_seconds}s, evaluating it again")
+            return None
+        except Exception as e:
+            # Failed or cancelled in the background
+            logger.warning(f"Background evaluation of question {response.get('question_number')} "
+                           f"of session {session_id} failed: {str(e)}")
+            return None
+        finally:
+            ANSWER_EVALUATION_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+        ANSWER_EVALUATIONS.labels(source='awaited').inc()
+        return evaluation
+
+    def _stored(self, session_id, question_key, fingerprint):
+        """The evaluation stored on an answer's current response, if it is for `fingerprint`."""
+        store = self.session_store(session_id)
+        if store is None:
+            return None
+        response = store.snapshot().responses.get(question_key)
+        if not isinstance(response, dict) or response.get('evaluation_fingerprint') != fingerprint:
+            return None
+        if response.get('evaluation'):
+            ANSWER_EVALUATIONS.labels(source='background').inc()
+        return response.get('evaluation')
+
+    def discard(self, session_id):
+        """Cancel and forget the evaluations of a session (when it ends)."""
+        with self._lock:
+            futures = [self._pending.pop(key)[1] for key in list(self._pending) if key[0] == session_id]
+        for future in futures:
+            future.cancel()
+
@@ -0,0 +1,276 @@
+"""
+Shared outbound HTTP clients: pooled keep-alive connections, per-host
+limits, default timeouts and latency metrics.
+
+- http_client serves the blocking callers (the report outbox, the OTLP
+  trace exporter). It is a requests session whose connection pools keep
+  HTTP_POOL_MAXSIZE connections per host open between calls; a host with a
+  limit in HTTP_HOST_LIMITS never has more connections than that, and
+  further calls wait for a free one.
+- async_http_client.client is an httpx.AsyncClient with the same limits,
+  for SDKs that take one (the Groq client). Its connections belong to the
+  event loop that opened them, and in eventlet mode each request runs its
+  coroutines on a new loop, so the client lives on a loop of its own: the
+  calls that use it go through async_http_client.run().
+
+close_http_clients() closes both when the server exits.
+
+Every request is timed into interview_http_request_seconds by host, method
+and status (or exception name).
+"""
+import asyncio
+import functools
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from interview_core import settings
+from interview_core.metrics import HTTP_REQUEST_SECONDS
+from interview_core.offload import os_threading
+
+
+def parse_host_limits(value):
+    """Per-host connection limits from 'host[:port]=n,...' (HTTP_HOST_LIMITS)."""
+    limits = {}
+    for part in (value or '').split(','):
+        host, _, limit = part.strip().partition('=')
+        if host and limit:
+            limits[host.strip().lower()] = int(limit)
+    return limits
+
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _host(url):
+    return urlsplit(str(url)).netloc.lower()
+
+
+class HttpClient:
+    """
+    Pooled blocking HTTP client.
+
+    Usage:
+        response = http_client.post(url, json=payload)
+    """
+
+    def __init__(self, pool_maxsize=None, host_limits=None, connect_timeout=None, read_timeout=None):
+        self.pool_maxsize = pool_maxsize or settings.HTTP_POOL_MAXSIZE
+        self.host_limits = parse_host_limits(settings.HTTP_HOST_LIMITS) if host_limits is None else host_limits
+        self.timeout = (
+            connect_timeout or settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+            read_timeout or settings.HTTP_READ_TIMEOUT_SECONDS,
+        )
+        self._session = None
+        self._lock = os_threading.Lock()
+
+    def session(self):
+        """The underlying requests session, created on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        # Imported on first use so that server startup does not load requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        def adapter(maxsize, block):
+            # pool_block makes the pool size a hard limit on connections to the host
+            return HTTPAdapter(pool_connections=32, pool_maxsize=maxsize, pool_block=block)
+
+        session = requests.Session()
+        session.mount('http://', adapter(self.pool_maxsize, False))
+        session.mount('https://', adapter(self.pool_maxsize, False))
+        for host, limit in self.host_limits.items():
+            session.mount(f'http://{host}', adapter(limit, True))
+            session.mount(f'https://{host}', adapter(limit, True))
+        return session
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """
+        Send a request on a pooled connection.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            timeout: Seconds, or (connect, read) seconds (default: HTTP_CONNECT/READ_TIMEOUT_SECONDS)
+            **kwargs: Passed to requests (json, data, headers, ...)
+
+        Returns:
+            requests.Response; connection errors and timeouts are raised
+        """
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            response = self.session().request(method, url, timeout=timeout or self.timeout, **kwargs)
+            status = str(response.status_code)
+            return response
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            HTTP_REQUEST_SECONDS.labels(host=_host(url), method=method, status=status).observe(
+                time.perf_counter() - started
+            )
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Close the pooled connections; the next call opens new ones."""
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def connections_opened(self):
+        """Connections opened so far by the host pools in use (reused connections count once)."""
+        if self._session is None:
+            return 0
+        opened = 0
+        for adapter in set(self._session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+        return opened
+
+
+# ========== Async client (httpx) ==========
+
+@functools.lru_cache(maxsize=None)
+def _timed_transport_class():
+    # Imported on first use, like requests: only the Groq client needs httpx
+    import httpx
+
+    class TimedTransport(httpx.AsyncHTTPTransport):
+        """Times each request into the HTTP latency metric."""
+
+        async def handle_async_request(self, request):
+            started = time.perf_counter()
+            status = 'error'
+            try:
+                response = await super().handle_async_request(request)
+                status = str(response.status_code)
+                return response
+            except Exception as e:
+                status = type(e).__name__
+                raise
+            finally:
+                HTTP_REQUEST_SECONDS.labels(host=_host(request.url), method=request.method, status=status).observe(
+                    time.perf_counter() - started
+                )
+
+    return TimedTransport
+
+
+def create_async_http_client():
+    """A new httpx.AsyncClient with the shared limits, timeouts and metrics."""
+    import httpx
+
+    def transport(keepalive, limit=None):
+        limits = httpx.Limits(max_connections=limit, max_keepalive_connections=keepalive)
+        return _timed_transport_class()(limits=limits)
+
+    return httpx.AsyncClient(
+        transport=transport(settings.HTTP_POOL_MAXSIZE),
+        mounts={f'all://{host}': transport(limit, limit)
+                for host, limit in parse_host_limits(settings.HTTP_HOST_LIMITS).items()},
+        timeout=httpx.Timeout(settings.HTTP_READ_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS),
+    )
+
+
+class AsyncHttpClient:
+    """
+    One long-lived httpx.AsyncClient on its own event loop thread.
+
+    Coroutines using the client must run on that loop: run() schedules
+    them there and awaits their result from the caller's loop.
+
+    Usage:
+        groq = AsyncGroq(api_key=api_key, http_client=async_http_client.client)
+        response = await async_http_client.run(lambda: groq.chat.completions.create(**params))
+    """
+
+    def __init__(self):
+        self._lock = os_threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._client = None
+
+    def _start(self):
+        """Start the loop and create the client (once)."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = os_threading.Thread(target=loop.run_forever, name='async-http-client', daemon=True)
+                self._thread.start()
+                self._client = create_async_http_client()
+                self._loop = loop
+            return self._loop, self._client
+
+    @property
+    def client(self):
+        """The shared httpx.AsyncClient."""
+        return self._start()[1]
+
+    async def run(self, call):
+        """
+        Await `call()` on the client's event loop.
+
+        Args:
+            call: Function returning a coroutine that uses the client
+
+        Returns:
+            The coroutine's result; cancelling the caller cancels it
+        """
+        loop = self._start()[0]
+        future = asyncio.run_coroutine_threadsafe(call(), loop)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def close(self, timeout=5):
+        """Close the client's connections and stop its loop."""
+        with self._lock:
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+
+
+def close_http_clients():
+    """Close the pooled connections of both clients (at server exit)."""
+    http_client.close()
+    async_http_client.close()
+
+
+# Shared by all blocking outbound calls
+http_client = HttpClient()
+# Shared by all async outbound calls
+async_http_client = AsyncHttpClient()
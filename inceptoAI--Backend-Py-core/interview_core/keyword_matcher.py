@@ -0,0 +1,124 @@
+# interview_core/keyword_matcher.py
+import json
+import logging
+import os
+import re
+from functools import lru_cache
+
+from interview_core import settings
+
+logger = logging.getLogger(__name__)
+
+# Used when the role dictionary file has no "default" entry or cannot be read
+DEFAULT_KEYWORDS = ["experience", "team", "project", "challenge", "success", "communicate", "learn", "improve", "goal", "collaborate"]
+
+# Words, keeping hyphenated and apostrophe compounds ("user-centered", "don't") together
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+# Suffixes removed by the light stemmer, longest first
+STEM_SUFFIXES = ("ization", "isation", "ations", "ation", "ments", "ment", "ings", "ing", "ness",
+                 "ies", "ied", "ers", "er", "ed", "es", "ly", "s", "e")
+
+
+def light_stem(token):
+    """Strip one common English suffix, keeping at least three characters of stem."""
+    for suffix in STEM_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+class KeywordMatcher:
+    """
+    Counts keyword and key-phrase occurrences in a single pass over the text.
+
+    Keywords are compiled once into a token trie. The text is tokenized once and
+    every token position is matched against the trie, so matching is linear in
+    the text instead of one substring scan per keyword. Matches respect word
+    boundaries ("code" does not match "decode"). With stemming enabled, both
+    keywords and text are reduced with light_stem() ("optimizing" matches "optimize").
+    Each keyword is counted independently, so overlapping key phrases
+    ("user" and "user experience") both count.
+    """
+
+    def __init__(self, keywords, stemming=False):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.stemming = stemming
+
+        # Token trie: node -> {token: child node}; keywords ending at a node are stored under None
+        self._trie = {}
+        for keyword in self.keywords:
+            tokens = self._tokens(keyword.lower())
+            if not tokens:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(None, []).append(keyword)
+
+    def _tokens(self, text):
+        tokens = TOKEN_PATTERN.findall(text)
+        if self.stemming:
+            tokens = [light_stem(token) for token in tokens]
+        return tokens
+
+    def count(self, text):
+        """Return {keyword: occurrences} for one text."""
+        counts = dict.fromkeys(self.keywords, 0)
+        if not text:
+            return counts
+
+        tokens = self._tokens(text.lower())
+        trie = self._trie
+        for start in range(len(tokens)):
+            node = trie.get(tokens[start])
+            position = start + 1
+            while node is not None:
+                for keyword in node.get(None, ()):
+                    counts[keyword] += 1
+                if position >= len(tokens):
+                    break
+                node = node.get(tokens[position])
+                position += 1
+
+        return counts
+
+    def count_batch(self, texts):
+        """Return one {keyword: occurrences} dict per text."""
+        return [self.count(text) for text in texts]
+
+
+def load_role_keywords(path=None):
+    """
+    Load the role keyword dictionaries.
+
+    The file is JSON: {"default": [keywords], "roles": {"role name": [keywords]}}.
+
+    Returns:
+        (default_keywords, {lowercase role: keywords})
+    """
+    path = path or settings.ROLE_KEYWORDS_FILE
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except Exception as e:
+        logger.warning(f"Could not load role keywords from {path}: {str(e)}")
+        return DEFAULT_KEYWORDS, {}
+
+    roles = {role.lower(): keywords for role, keywords in data.get('roles', {}).items()}
+    return data.get('default', DEFAULT_KEYWORDS), roles
+
+
+@lru_cache(maxsize=None)
+def _role_matchers(path, stemming):
+    default_keywords, roles = load_role_keywords(path)
+    matchers = {role: KeywordMatcher(keywords, stemming) for role, keywords in roles.items()}
+    return KeywordMatcher(default_keywords, stemming), matchers
+
+
+def get_role_matcher(role, stemming=None):
+    """Compiled matcher for a role, falling back to the default keywords."""
+    if stemming is None:
+        stemming = settings.KEYWORD_STEMMING
+    default_matcher, matchers = _role_matchers(os.path.abspath(settings.ROLE_KEYWORDS_FILE), stemming)
+    return matchers.get((role or '').lower(), default_matcher)
@@ -0,0 +1,375 @@
+"""
+Central scheduler of LLM calls: rate limits per provider and model,
+priority classes, Retry-After and bounded queueing.
+
+Every LLM call used to go out as soon as it was made, and a failed
+question generation was retried by tenacity after sleeping 4-10 s. In a
+burst the provider answered 429 to everyone at once, every caller retried
+at about the same time, and a candidate waiting for the next question
+queued behind the background evaluations of other interviews.
+
+llm_scheduler.run() now grants each call a slot first:
+
+- Each provider:model has a token bucket of LLM_RATE_LIMITS requests per
+  minute (up to LLM_RATE_BURST at once), and at most LLM_MAX_CONCURRENCY
+  of its calls are in flight at once.
+- Waiting calls are served by priority class: live question generation
+  ('interactive'), then answer evaluations ('evaluation'), then anything
+  else ('batch'), and in arrival order within a class.
+- A call that waits longer than its class allows (LLM_QUEUE_TIMEOUTS)
+  fails with LLMQueueTimeout, so callers fall back instead of hanging. The
+  time counts from the first attempt, retries included.
+- A 429 answer pauses the whole model for its Retry-After (or an
+  exponential backoff with jitter), and the call waits in the queue for its
+  retry. When the pause ends, calls are let through one per
+  LLM_RESUME_INTERVAL_SECONDS for as long as the pause lasted, with or
+  without a rate limit, so the calls held back do not all retry at once.
+  5xx answers and connection errors are retried after a backoff. At most
+  LLM_MAX_RETRIES retries, and never one later than the class's queue
+  timeout. The backends create their SDK clients with max_retries=0, so a
+  429 reaches the scheduler on every attempt instead of being retried
+  inside the SDK while the call holds its slot.
+
+Calls can come from several event loops (each eventlet request runs its
+own): waiting calls are granted their slot by a dispatcher on an OS thread
+(interview_core.offload).
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+
+from interview_core import settings
+from interview_core.http_client import retry_after_seconds
+from interview_core.metrics import LLM_QUEUE_SECONDS, LLM_QUEUE_TIMEOUTS, LLM_RATE_LIMITED, LLM_RETRIES
+from interview_core.offload import os_threading
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, served in this order
+PRIORITY_CLASSES = ('interactive', 'evaluation', 'batch')
+# Class of each LLM call purpose; other purposes are 'batch'
+PURPOSE_CLASSES = {'question': 'interactive', 'evaluation': 'evaluation'}
+
+RATE_LIMITED_STATUS = 429
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class LLMQueueTimeout(Exception):
+    """An LLM call waited longer than its priority class allows."""
+
+
+def parse_settings(value):
+    """Numbers by key from 'key=n,...' (LLM_RATE_LIMITS, LLM_QUEUE_TIMEOUTS)."""
+    settings = {}
+    for part in (value or '').split(','):
+        key, _, number = part.strip().partition('=')
+        if key and number:
+            settings[key.strip().lower()] = float(number)
+    return settings
+
+
+def error_status(exc):
+    """HTTP status of a failed LLM call (Groq, httpx and Google API errors), or None."""
+    for status in (getattr(exc, 'status_code', None),
+                   getattr(getattr(exc, 'response', None), 'status_code', None),
+                   getattr(exc, 'code', None)):
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def error_retry_after(exc):
+    """Seconds from the Retry-After header of a failed LLM call's response, or None."""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    if headers is None:
+        return None
+    return retry_after_seconds(headers.get('retry-after'))
+
+
+def is_retryable(exc, status):
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    # Connection errors and timeouts of the SDKs (APIConnectionError, ConnectTimeout, ...)
+    name = type(exc).__name__
+    return isinstance(exc, (ConnectionError, TimeoutError)) or 'Connection' in name or 'Timeout' in name
+
+
+class TokenBucket:
+    """
+    Requests-per-minute limit of one provider:model; rate None = unlimited.
+
+    After a pause, calls are granted one per `resume_interval` seconds for
+    as long as the pause lasted, whatever the rate.
+    """
+
+    def __init__(self, per_minute=None, burst=1, resume_interval=1.0):
+        self.rate = per_minute / 60 if per_minute else None
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.resume_interval = resume_interval
+        self.resuming_until = 0.0
+        self.next_resume_at = 0.0
+
+    def _refill(self, now):
+        # Nothing comes in while paused
+        start = max(self.updated, self.paused_until)
+        if self.rate is not None and now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self.updated = max(self.updated, now)
+
+    def wait_time(self, now):
+        """Seconds until a call can be granted."""
+        self._refill(now)
+        wait = max(0.0, self.paused_until - now)
+        if self.rate is not None and self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        if now < self.resuming_until:
+            wait = max(wait, self.next_resume_at - now)
+        return wait
+
+    def take(self, now):
+        """Grant a call if the model is not paused and a token is left."""
+        if self.wait_time(now) > 0:
+            return False
+        if self.rate is not None:
+            self.tokens -= 1
+        if now < self.resuming_until:
+            self.next_resume_at = now + self.resume_interval
+        return True
+
+    def pause(self, seconds, now):
+        """Grant nothing for `seconds`, then resume one call at a time from an empty bucket."""
+        self._refill(now)
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.resuming_until = self.paused_until + max(seconds, self.resume_interval)
+        self.next_resume_at = self.paused_until
+        self.tokens = 0.0
+
+
+class _Waiter:
+    __slots__ = ('loop', 'future', 'deadline', 'abandoned', 'granted')
+
+    def __init__(self, loop, deadline):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.deadline = deadline
+        self.abandoned = False
+        self.granted = False
+
+    def _settle(self, error):
+        if self.future.done():
+            return
+        if error is None:
+            self.future.set_result(None)
+        else:
+            self.future.set_exception(error)
+
+    def settle(self, error=None):
+        """Wake the waiting call from the dispatcher thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._settle, error)
+        except RuntimeError:  # Its event loop is closed: nobody is waiting any more
+            pass
+
+
+class LLMScheduler:
+    """
+    Grants LLM calls their slot and retries the ones that fail transiently.
+
+    Usage:
+        content = await llm_scheduler.run('groq', model, 'question', call)
+    """
+
+    def __init__(self, rate_limits=None, burst=None, queue_timeouts=None, max_retries=None, backoff=None,
+                 max_concurrency=None, resume_interval=None):
+        self.rate_limits = parse_settings(settings.LLM_RATE_LIMITS) if rate_limits is None else rate_limits
+        self.burst = settings.LLM_RATE_BURST if burst is None else burst
+        self.max_concurrency = settings.LLM_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+        self.resume_interval = settings.LLM_RESUME_INTERVAL_SECONDS if resume_interval is None else resume_interval
+        self.queue_timeouts = {
+            **dict.fromkeys(PRIORITY_CLASSES, 60.0),
+            **(parse_settings(settings.LLM_QUEUE_TIMEOUTS) if queue_timeouts is None else queue_timeouts),
+        }
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = settings.LLM_RETRY_BACKOFF_SECONDS if backoff is None else backoff
+        self._buckets = {}    # (provider, model) -> TokenBucket
+        self._queues = {}     # (provider, model) -> heap of (class index, arrival, priority class, _Waiter)
+        self._in_flight = {}  # (provider, model) -> calls granted and not finished
+        self._arrivals = itertools.count()
+        self._condition = os_threading.Condition()
+        self._thread = None
+
+    def queue_depths(self):
+        """Waiting calls by (provider, priority class)."""
+        depths = {}
+        with self._condition:
+            for (provider, _), queue in self._queues.items():
+                for _, _, priority, waiter in queue:
+                    if not waiter.abandoned:
+                        depths[(provider, priority)] = depths.get((provider, priority), 0) + 1
+        return depths
+
+    async def run(self, provider, model, purpose, call):
+        """
+        Make an LLM call once it is granted a slot, retrying transient failures.
+
+        Args:
+            provider: 'groq', 'gemini', ...
+            model: Model name; rate limits apply per provider:model (or per provider)
+            purpose: Purpose of the call, which sets its priority class
+            call: Function returning an awaitable of the call's result
+
+        Returns:
+            The call's result
+
+        Raises:
+            LLMQueueTimeout: No slot within the priority class's queue timeout
+            The call's exception once it is not worth retrying
+        """
+        priority = PURPOSE_CLASSES.get(purpose, 'batch')
+        key = (provider, model)
+        # Retries wait within the same queue timeout as the first attempt
+        deadline = time.monotonic() + self.queue_timeouts[priority]
+        attempt = 0
+        while True:
+            await self._acquire(key, priority, deadline)
+            try:
+                return await call()
+            except Exception as e:
+                status = error_status(e)
+                if attempt >= self.max_retries or not is_retryable(e, status):
+                    raise
+                attempt += 1
+
+                retry_after = error_retry_after(e)
+                delay = retry_after if retry_after is not None else (
+                    self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+                )
+                if time.monotonic() + delay > deadline:
+                    # Could not be retried within the time the caller is willing to wait
+                    raise
+
+                LLM_RETRIES.labels(provider=provider, reason=str(status or type(e).__name__)).inc()
+                logger.warning(f"{provider} {purpose} call failed ({status or type(e).__name__}), "
+                               f"retrying in {delay:.1f}s (retry {attempt}/{self.max_retries})")
+                if status == RATE_LIMITED_STATUS:
+                    # The limit is the model's, not this call's: hold back every call to it
+                    LLM_RATE_LIMITED.labels(provider=provider).inc()
+                    self._pause(key, delay)
+                    delay = 0
+            finally:
+                self._release(key)
+
+            if delay:
+                await asyncio.sleep(delay)
+
+    def _bucket(self, key):
+        """The token bucket of a provider:model. Callers hold _condition."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            provider, model = key
+            limit = self.rate_limits.get(f"{provider}:{model}".lower(), self.rate_limits.get(provider.lower()))
+            bucket = self._buckets[key] = TokenBucket(limit, self.burst, self.resume_interval)
+        return bucket
+
+    def _has_slot(self, key):
+        """Whether another call to a provider:model may be in flight. Callers hold _condition."""
+        return not self.max_concurrency or self._in_flight.get(key, 0) < self.max_concurrency
+
+    def _grant(self, key):
+        """Count a call as in flight. Callers hold _condition."""
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+    def _release(self, key):
+        """A granted call finished: its slot goes to the next waiting call."""
+        with self._condition:
+            self._in_flight[key] -= 1
+            self._condition.notify()
+
+    def _pause(self, key, seconds):
+        with self._condition:
+            self._bucket(key).pause(seconds, time.monotonic())
+            self._condition.notify()
+
+    async def _acquire(self, key, priority, deadline):
+        """Wait until `deadline` for a slot for one call to a provider:model; _release() gives it back."""
+        started = time.monotonic()
+        provider = key[0]
+        with self._condition:
+            queue = self._queues.setdefault(key, [])
+            # Calls already waiting go first, whatever their class
+            if not queue and self._has_slot(key) and self._bucket(key).take(started):
+                self._grant(key)
+                waiter = None
+            else:
+                waiter = _Waiter(asyncio.get_running_loop(), deadline)
+                heapq.heappush(queue, (PRIORITY_CLASSES.index(priority), next(self._arrivals), priority, waiter))
+                self._start()
+                self._condition.notify()
+
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._condition:
+                    waiter.abandoned = True
+                    if waiter.granted:
+                        # Granted as the caller went away: the slot is not used
+                        self._in_flight[key] -= 1
+                        self._condition.notify()
+                raise
+            except LLMQueueTimeout:
+                LLM_QUEUE_TIMEOUTS.labels(provider=provider, priority=priority).inc()
+                raise
+
+        LLM_QUEUE_SECONDS.labels(provider=provider, priority=priority).observe(time.monotonic() - started)
+
+    def _start(self):
+        """Start the dispatcher thread. Callers hold _condition."""
+        if self._thread is None:
+            self._thread = os_threading.Thread(target=self._dispatch, name='llm-scheduler', daemon=True)
+            self._thread.start()
+
+    def _dispatch(self):
+        """Grant waiting calls their slot as tokens and slots free up, and time out those waiting too long."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                wake = None
+                for key, queue in self._queues.items():
+                    bucket = self._bucket(key)
+
+                    # Time out calls waiting too long, wherever they are in the queue
+                    expired = [entry for entry in queue if entry[3].deadline <= now or entry[3].abandoned]
+                    if expired:
+                        queue[:] = [entry for entry in queue if entry not in expired]
+                        heapq.heapify(queue)
+                        for _, _, priority, waiter in expired:
+                            if not waiter.abandoned:
+                                waiter.settle(LLMQueueTimeout(
+                                    f"No {key[0]} slot within {self.queue_timeouts[priority]}s for a {priority} call"
+                                ))
+
+                    while queue and self._has_slot(key) and bucket.take(now):
+                        waiter = heapq.heappop(queue)[3]
+                        self._grant(key)
+                        waiter.granted = True
+                        waiter.settle()
+
+                    if queue:
+                        wait = min(entry[3].deadline for entry in queue) - now
+                        if self._has_slot(key):
+                            wait = min(wait, bucket.wait_time(now))
+                        # Otherwise _release() wakes the dispatcher when a call finishes
+                        wake = wait if wake is None else min(wake, wait)
+
+                self._condition.wait(None if wake is None else max(wake, 0.001))
+
+
+# Shared by all LLM calls of the process
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,250 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import time
+import weakref
+
+from interview_core import settings
+from interview_core.offload import os_threading
+
+# Attributes of every LogRecord; anything else on a record came in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+# Seconds between flushes of the rate-limited logs' pending summaries
+_FLUSH_INTERVAL_SECONDS = 1.0
+_rate_limited_logs = weakref.WeakSet()
+_flusher = None
+_flusher_lock = os_threading.Lock()
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats records as text or JSON lines, including structured fields.
+
+    Fields are passed with `extra={...}` (or by RateLimitedLog) and are
+    appended as key=value pairs in text mode.
+    """
+
+    def __init__(self, json_lines=False):
+        super().__init__('%(asctime)s - %(levelname)s - %(message)s')
+        self.json_lines = json_lines
+
+    @staticmethod
+    def fields(record):
+        return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+    def format(self, record):
+        fields = self.fields(record)
+        if not self.json_lines:
+            if fields:
+                pairs = ' '.join(f"{key}={value}" for key, value in fields.items())
+                record = logging.makeLogRecord({**vars(record), 'msg': f"{record.getMessage()} {pairs}", 'args': None})
+            return super().format(record)
+
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **fields,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Render the message and traceback now, since arguments and exc_info may
+        # not survive the trip to the listener thread, but keep the fields
+        # for the listener's formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging():
+    """
+    Configure application logging.
+
+    Records are put on a bounded queue by the calling thread and written to
+    stderr by a background listener thread, so logging never waits on console
+    I/O. LOG_LEVEL sets the level and LOG_FORMAT=json switches to JSON lines.
+    """
+    global _listener
+
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL)
+
+    if _listener is None:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(StructuredFormatter(json_lines=settings.LOG_FORMAT == 'json'))
+
+        log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(NonBlockingQueueHandler(log_queue))
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+    logger = logging.getLogger(__name__)
+    return logger
+
+
+def shutdown_logging():
+    """Emit the pending rate-limited summaries and write out the queued records (at exit)."""
+    global _listener
+
+    flush_rate_limited_logs()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def flush_rate_limited_logs(expired_only=False):
+    """Flush every RateLimitedLog (see RateLimitedLog.flush)."""
+    with _flusher_lock:
+        logs = list(_rate_limited_logs)
+    for rate_limited_log in logs:
+        rate_limited_log.flush(expired_only)
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(_FLUSH_INTERVAL_SECONDS)
+        flush_rate_limited_logs(expired_only=True)
+
+
+def _track(rate_limited_log):
+    """Flush `rate_limited_log` from the flusher thread, started on first use."""
+    global _flusher
+
+    with _flusher_lock:
+        _rate_limited_logs.add(rate_limited_log)
+        if _flusher is None:
+            _flusher = os_threading.Thread(target=_flush_periodically, name='rate-limited-log', daemon=True)
+            _flusher.start()
+            atexit.register(flush_rate_limited_logs)
+
+
+class RateLimitedLog:
+    """
+    Per-key rate limiting and aggregation in front of a logger.
+
+    `log()` emits at most one record per key every `interval` seconds and
+    reports how many were suppressed in between. `count()` only counts
+    occurrences and emits one summary per key and interval, such as
+    "42 frames with no face in the last 10 s". Messages use lazy %-style
+    arguments, so suppressed records are never formatted.
+
+    What is still pending when a key goes quiet (a partial count, the last
+    suppressed record) is emitted by a background flusher once its interval
+    is over, and by flush() when the session ends or the process exits.
+    """
+
+    def __init__(self, logger, interval=None, **fields):
+        self.logger = logger
+        self.interval = settings.LOG_RATE_LIMIT_SECONDS if interval is None else interval
+        self.fields = fields
+        self._last = {}       # key -> (last emitted time, suppressed count, last suppressed record or None)
+        self._counts = {}     # key -> (window start, count, level, message)
+        self._lock = os_threading.Lock()
+        _track(self)
+
+    def log(self, level, key, msg, *args, exc_info=None, **fields):
+        if not self.logger.isEnabledFor(level):
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed, _ = self._last.get(key, (None, 0, None))
+            if last is not None and now - last < self.interval:
+                # Kept without its traceback, which would hold the frame's locals
+                self._last[key] = (last, suppressed + 1, (level, msg, args, fields))
+                return
+            self._last[key] = (now, 0, None)
+
+        self._emit(level, msg, args, exc_info, fields, suppressed)
+
+    def count(self, key, msg, level=logging.INFO, **fields):
+        """
+        Count one occurrence of `key` and emit a summary once per interval.
+
+        `msg` may use {count} and {interval} placeholders.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            start, count, _, _ = self._counts.get(key, (now, 0, level, msg))
+            count += 1
+            if now - start < self.interval:
+                self._counts[key] = (start, count, level, msg)
+                return
+            self._counts.pop(key, None)
+
+        self._emit_count(level, msg, count, now - start, fields)
+
+    def flush(self, expired_only=False):
+        """
+        Emit what is pending: the summaries of partially filled count windows,
+        and the last suppressed record of each key with the number of others.
+
+        Args:
+            expired_only: Only for keys whose interval is over (the periodic flush)
+        """
+        now = time.monotonic()
+        counts, records = [], []
+        with self._lock:
+            for key, (start, count, level, msg) in list(self._counts.items()):
+                if not expired_only or now - start >= self.interval:
+                    del self._counts[key]
+                    counts.append((start, count, level, msg))
+            for key, (last, suppressed, record) in list(self._last.items()):
+                if record is not None and (not expired_only or now - last >= self.interval):
+                    self._last[key] = (now, 0, None)
+                    records.append((record, suppressed))
+
+        for start, count, level, msg in counts:
+            self._emit_count(level, msg, count, now - start, {})
+        for (level, msg, args, fields), suppressed in records:
+            self._emit(level, msg, args, None, fields, suppressed - 1)
+
+    def _emit(self, level, msg, args, exc_info, fields, suppressed):
+        extra = {**self.fields, **fields}
+        if suppressed:
+            extra['suppressed'] = suppressed
+        self.logger.log(level, msg, *args, exc_info=exc_info, extra=extra)
+
+    def _emit_count(self, level, msg, count, elapsed, fields):
+        self.logger.log(
+            level,
+            msg.format(count=count, interval=f"{max(elapsed, 0):.0f}"),
+            extra={**self.fields, **fields, 'count': count},
+        )
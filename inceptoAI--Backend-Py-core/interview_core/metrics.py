@@ -0,0 +1,287 @@
+"""
+Prometheus metrics of the backend, served on /metrics.
+
+Metrics are prometheus_client collectors in a registry of their own.
+Values that other objects already keep (queue depths, sessions, pools)
+are not updated on the hot path: CallbackGauge reads them on each scrape.
+Labels never carry session IDs, so the number of series stays bounded
+however many interviews a node serves.
+"""
+import logging
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, ProcessCollector, generate_latest
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REGISTRY = CollectorRegistry()
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    return generate_latest(REGISTRY)
+
+
+def counter(name, documentation, labelnames=()):
+    return Counter(name, documentation, labelnames, registry=REGISTRY)
+
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    return Histogram(name, documentation, labelnames, buckets=buckets, registry=REGISTRY)
+
+
+class CallbackGauge:
+    """
+    Gauge computed on every scrape.
+
+    `callback` returns a number, or a dict of {label values tuple: number}
+    for labelled gauges. Nothing is paid on the hot path, and a failing
+    callback only leaves its gauge out of the scrape.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        REGISTRY.register(self)
+
+    def describe(self):
+        return [GaugeMetricFamily(self.name, self.documentation, labels=self.labelnames)]
+
+    def collect(self):
+        family = GaugeMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        try:
+            values = self.callback()
+        except Exception as e:
+            logger.warning(f"Metric {self.name} unavailable: {str(e)}")
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in values.items():
+            if not isinstance(key, tuple):
+                key = (key,)
+            family.add_metric([str(label) for label in key], value)
+        yield family
+
+
+# ========== Process ==========
+
+# process_resident_memory_bytes, CPU time and open file descriptors (Linux)
+ProcessCollector(registry=REGISTRY)
+
+
+# ========== Sessions and frames ==========
+
+# Session ID -> data store mapping of the backend, see track_sessions()
+_session_stores = dict
+
+
+def track_sessions(session_stores):
+    """
+    Count the backend's sessions and frame queues in the session gauges.
+
+    Args:
+        session_stores: Callable returning the session ID -> data store mapping
+    """
+    global _session_stores
+    _session_stores = session_stores
+
+
+def _frame_queue_depths():
+    return [store.frame_queue.qsize() for store in list(_session_stores().values())]
+
+
+CallbackGauge('interview_active_sessions', "Sessions with a data store on this node.",
+              callback=lambda: len(_session_stores()))
+CallbackGauge('interview_frame_queue_depth', "Frames waiting for analysis, over all sessions.",
+              callback=lambda: sum(_frame_queue_depths()))
+CallbackGauge('interview_frame_queue_depth_max', "Frames waiting for analysis in the longest session queue.",
+              callback=lambda: max(_frame_queue_depths(), default=0))
+
+FRAME_QUEUE_DEPTH = histogram(
+    'interview_frame_queue_depth_observed', "Frame queue depth seen by each incoming frame.",
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+FRAMES_RECEIVED = counter('interview_frames_received_total', "Frames received from clients.")
+FRAMES_PROCESSED = counter('interview_frames_processed_total', "Frames that completed analysis, with or without a face.")
+FRAMES_DROPPED = counter('interview_frames_dropped_total', "Frames dropped before analysis.", ('reason',))
+FRAMES_NO_FACE = counter('interview_frames_no_face_total', "Analysed frames without a detected face.")
+FRAMES_FAILED = counter('interview_frames_failed_total', "Frames whose analysis raised an error.")
+FRAME_STAGE_SECONDS = histogram(
+    'interview_frame_stage_seconds', "Time spent in each frame analysis stage.", ('stage',)
+)
+ANALYSIS_SLOT_WAIT_SECONDS = histogram(
+    'interview_analysis_slot_wait_seconds', "Time frames waited for a free CPU analysis slot."
+)
+OFFLOADED_CALL_SECONDS = histogram(
+    'interview_offloaded_call_seconds', "Blocking calls run off the eventlet hub, by call.", ('call',)
+)
+
+
+def _analysis_slots_busy():
+    from interview_core.offload import cpu_slots
+    return cpu_slots.busy
+
+
+CallbackGauge('interview_analysis_slots_busy', "Frame analyses running on OS threads.",
+              callback=_analysis_slots_busy)
+FACE_DETECTION_PASSES = counter(
+    'interview_face_detection_passes_total', "Face detection passes run, by escalation level.", ('level',)
+)
+FACE_DETECTION_RESULTS = counter(
+    'interview_face_detection_results_total',
+    "Frames by the escalation level that found the face ('none' if no level did).", ('level',)
+)
+FACE_DETECTION_SKIPPED = counter(
+    'interview_face_detection_escalations_skipped_total',
+    "Escalations to a level not run because its budget was used up.", ('level',)
+)
+
+
+# ========== External calls ==========
+
+LLM_REQUEST_SECONDS = histogram(
+    'interview_llm_request_seconds', "LLM call latency.", ('provider', 'purpose')
+)
+LLM_ERRORS = counter('interview_llm_errors_total', "Failed LLM calls.", ('provider', 'purpose'))
+LLM_QUEUE_SECONDS = histogram(
+    'interview_llm_queue_seconds', "Time LLM calls waited for a slot, by provider and priority class.",
+    ('provider', 'priority')
+)
+LLM_QUEUE_TIMEOUTS = counter(
+    'interview_llm_queue_timeouts_total', "LLM calls given up after waiting too long for a slot.",
+    ('provider', 'priority')
+)
+LLM_RATE_LIMITED = counter(
+    'interview_llm_rate_limited_total', "Rate limit (429) answers from LLM providers.", ('provider',)
+)
+LLM_RETRIES = counter(
+    'interview_llm_retries_total', "Retried LLM calls, by provider and status (or exception).", ('provider', 'reason')
+)
+
+
+def _llm_queue_depths():
+    from interview_core.llm_scheduler import llm_scheduler
+    return llm_scheduler.queue_depths()
+
+
+CallbackGauge('interview_llm_queue_depth', "LLM calls waiting for a slot, by provider and priority class.",
+              ('provider', 'priority'), callback=_llm_queue_depths)
+LLM_COALESCED = counter(
+    'interview_llm_coalesced_total', "LLM requests that shared an identical call already in flight.", ('purpose',)
+)
+
+
+def _llm_calls_in_flight():
+    from interview_core.single_flight import llm_single_flight
+    return len(llm_single_flight)
+
+
+CallbackGauge('interview_llm_calls_in_flight', "Distinct LLM calls in flight (identical requests count once).",
+              callback=_llm_calls_in_flight)
+EVALUATION_STAGE_SECONDS = histogram(
+    'interview_evaluation_stage_seconds', "Duration of interview evaluation stages, by stage and status.",
+    ('stage', 'status')
+)
+ANSWER_EVALUATIONS_QUEUED = counter(
+    'interview_answer_evaluations_queued_total', "Answers queued for evaluation in the background."
+)
+ANSWER_EVALUATIONS = counter(
+    'interview_answer_evaluations_total',
+    "Answer evaluations in interview reports, by source ('background' = done before completion, "
+    "'awaited' = waited for at completion, 'inline' = evaluated at completion).",
+    ('source',)
+)
+ANSWER_EVALUATION_WAIT_SECONDS = histogram(
+    'interview_answer_evaluation_wait_seconds', "Time complete_interview waited for a background answer evaluation."
+)
+
+# Bound to the backend's AnswerEvaluations instance where it is created
+ANSWER_EVALUATIONS_PENDING = CallbackGauge(
+    'interview_answer_evaluations_pending', "Answer evaluations queued or running in the background.",
+    callback=lambda: 0
+)
+HTTP_REQUEST_SECONDS = histogram(
+    'interview_http_request_seconds', "Outbound HTTP request latency, by host, method and status (or exception).",
+    ('host', 'method', 'status')
+)
+
+
+def _http_connections_opened():
+    from interview_core.http_client import http_client
+    return http_client.connections_opened()
+
+
+CallbackGauge('interview_http_connections_opened', "Connections opened by the pooled blocking HTTP client.",
+              callback=_http_connections_opened)
+EXPRESS_UPLOAD_SECONDS = histogram(
+    'interview_express_upload_seconds', "Latency of interview uploads to the Express backend."
+)
+EXPRESS_UPLOAD_FAILURES = counter(
+    'interview_express_upload_failures_total', "Failed interview uploads to the Express backend.", ('reason',)
+)
+
+OUTBOX_ENQUEUED = counter('interview_outbox_enqueued_total', "Interview reports queued for upload.")
+OUTBOX_DELIVERED = counter(
+    'interview_outbox_delivered_total', "Interview reports delivered, by request mode ('single' or 'batch').", ('mode',)
+)
+OUTBOX_RETRIES = counter('interview_outbox_retries_total', "Failed report deliveries scheduled for retry.")
+OUTBOX_DEAD = counter('interview_outbox_dead_total', "Interview reports set aside after a permanent failure.")
+OUTBOX_DELIVERY_SECONDS = histogram(
+    'interview_outbox_delivery_seconds', "Time from queueing an interview report to its delivery.",
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+)
+OUTBOX_BATCH_SIZE = histogram(
+    'interview_outbox_batch_size', "Reports per batch upload request.", buckets=(2, 5, 10, 20, 50, 100)
+)
+
+UPLOAD_PAYLOAD_BYTES = histogram(
+    'interview_upload_payload_bytes', "Size of upload request bodies, by content coding ('identity' = uncompressed).",
+    ('encoding',), buckets=(1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 5e7)
+)
+UPLOAD_ENCODE_SECONDS = histogram(
+    'interview_upload_encode_seconds', "Time to prepare upload bodies, by step ('shape', 'serialize', 'compress').",
+    ('step',)
+)
+
+def _outbox_pending():
+    from interview_core.outbox import result_outbox
+    return len(result_outbox)
+
+
+CallbackGauge('interview_outbox_pending', "Interview reports waiting for upload.", callback=_outbox_pending)
+
+
+class observe_llm_call:
+    """
+    Time one LLM call and count it as an error if it raises.
+
+    Usage:
+        with observe_llm_call('groq', 'question'):
+            response = client.chat.completions.create(...)
+    """
+    __slots__ = ('_latency', '_errors', '_start')
+
+    def __init__(self, provider, purpose):
+        self._latency = LLM_REQUEST_SECONDS.labels(provider=provider, purpose=purpose)
+        self._errors = LLM_ERRORS.labels(provider=provider, purpose=purpose)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._latency.observe(time.perf_counter() - self._start)
+        if exc_type is not None:
+            self._errors.inc()
+        return False
@@ -0,0 +1,101 @@
+"""
+Runs CPU-bound analysis on real OS threads, whatever the server's concurrency model.
+
+The servers run Socket.IO on eventlet. Once the process is monkey patched
+(gunicorn's eventlet worker, or eventlet.monkey_patch()), threading.Thread,
+queue.Queue and locks are green: a frame analysis would then run on the hub
+and stall every socket and HTTP request until it finished. Frame workers
+therefore use the original, unpatched primitives of this module, and
+handlers hand their CPU-bound calls to run_blocking(), which runs them on
+eventlet's OS thread pool and resumes the calling green thread with the
+result once it is ready.
+
+CpuSlots bounds how many frame analyses run at once across all sessions, so
+twenty streaming sessions do not keep twenty threads (and the hub) fighting
+for the GIL and the cores.
+"""
+import os
+import queue
+import threading
+import time
+
+from interview_core import settings
+from interview_core.metrics import ANALYSIS_SLOT_WAIT_SECONDS, OFFLOADED_CALL_SECONDS
+
+try:
+    from eventlet import patcher
+except ImportError:  # Outside the servers (benchmarks, scripts) eventlet is optional
+    patcher = None
+
+if patcher is not None and patcher.is_monkey_patched('thread'):
+    os_threading = patcher.original('threading')
+    os_queue = patcher.original('queue')
+else:
+    os_threading = threading
+    os_queue = queue
+
+
+def in_green_thread():
+    """Whether the caller runs in an eventlet green thread, i.e. on the hub."""
+    if patcher is None:
+        return False
+    import greenlet
+    return greenlet.getcurrent().parent is not None
+
+
+def run_blocking(fn, *args, name=None, **kwargs):
+    """
+    Call `fn(*args, **kwargs)` without blocking the eventlet hub.
+
+    From a green thread the call runs on eventlet's OS thread pool (tpool)
+    and only the calling green thread waits for it; elsewhere (worker
+    threads, scripts) it is called directly.
+
+    Args:
+        fn: Blocking or CPU-bound callable
+        name: Label of the call in the offloaded call latency metric (default: fn's name)
+
+    Returns:
+        What `fn` returns; its exceptions are raised to the caller
+    """
+    if not in_green_thread():
+        return fn(*args, **kwargs)
+
+    from eventlet import tpool
+
+    with OFFLOADED_CALL_SECONDS.labels(call=name or getattr(fn, '__name__', 'call')).time():
+        return tpool.execute(fn, *args, **kwargs)
+
+
+class CpuSlots:
+    """
+    Bounds the number of CPU-bound analyses running at once.
+
+    Usage:
+        with cpu_slots:
+            analysis = analyzer.analyze_frame(frame)
+    """
+
+    def __init__(self, slots=None):
+        self.slots = slots or settings.ANALYSIS_CONCURRENCY or os.cpu_count() or 1
+        self.busy = 0
+        self._semaphore = os_threading.BoundedSemaphore(self.slots)
+        self._lock = os_threading.Lock()
+
+    def __enter__(self):
+        start = time.perf_counter()
+        self._semaphore.acquire()
+        ANALYSIS_SLOT_WAIT_SECONDS.observe(time.perf_counter() - start)
+        with self._lock:
+            self.busy += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._lock:
+            self.busy -= 1
+        self._semaphore.release()
+        return False
+
+
+# Shared by the frame workers of all sessions
+cpu_slots = CpuSlots()
@@ -0,0 +1,434 @@
+"""
+Durable outbox for the interview reports uploaded to the Express backend.
+
+complete_interview used to post the evaluated report itself and give up on
+the first failure, leaving the report only in memory. Reports are now
+written to a local directory (one JSON file per report) and the HTTP
+response returns at once; a background sender delivers them:
+
+- Every report carries an idempotency key (the session ID), sent as the
+  Idempotency-Key header, so retries and re-completed sessions are saved
+  once by the Express backend.
+- Failed deliveries (network errors, 408/425/429, 5xx) are retried with
+  exponential backoff and jitter, honouring Retry-After. Other 4xx answers
+  are permanent: the report is moved to the `dead` subdirectory and logged.
+- When several reports are due at once, which happens when the Express
+  backend is slow or down, they are posted together to its batch endpoint
+  (`<url>/batch`). Against a backend without one (404/405), reports are
+  sent one by one. A batch over the endpoint's body size limit (413) is
+  split in halves until it fits, and any other refusal of a whole batch
+  falls back to one-by-one sends: only a report's own answer sets it aside.
+- Reports left in the directory by a previous run are delivered at startup.
+- Request bodies are compressed once the endpoint advertises a supported
+  content coding (interview_core.report_payload).
+
+The sender runs on a real OS thread (interview_core.offload), so uploads never hold
+the eventlet hub or the ASGI event loop.
+"""
+import json
+import logging
+import os
+import random
+import time
+import uuid
+
+from interview_core import json_encoder, metrics, settings
+from interview_core.http_client import http_client, retry_after_seconds
+from interview_core.offload import os_threading
+from interview_core.report_payload import choose_encoding, encode_body, parse_accept_encoding
+
+logger = logging.getLogger(__name__)
+
+# Answers worth retrying; any other non-2xx answer is a permanent failure
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# Answers meaning the report is already saved
+DELIVERED_STATUSES = {409}
+
+
+class ResultOutbox:
+    """
+    Persists interview reports and delivers them from a background thread.
+
+    Usage:
+        result_outbox.start()
+        upload = result_outbox.enqueue(url, session_data, session_id)
+    """
+
+    def __init__(self, directory=None, batch_size=None, backoff=None, backoff_max=None,
+                 max_attempts=None, timeout=None):
+        self.directory = directory or settings.OUTBOX_DIR
+        self.dead_directory = os.path.join(self.directory, 'dead')
+        self.batch_size = max(1, batch_size or settings.OUTBOX_BATCH_SIZE)
+        self.backoff = backoff if backoff is not None else settings.OUTBOX_BACKOFF_SECONDS
+        self.backoff_max = backoff_max if backoff_max is not None else settings.OUTBOX_BACKOFF_MAX_SECONDS
+        self.max_attempts = max_attempts if max_attempts is not None else settings.OUTBOX_MAX_ATTEMPTS
+        self.timeout = timeout or settings.OUTBOX_TIMEOUT_SECONDS
+
+        # Metadata of the pending reports by idempotency key; payloads stay on disk
+        self._entries = {}
+        self._loaded = False
+        # Batch URLs answering 404/405: their reports are sent one by one
+        self._no_batch_urls = set()
+        # Content codings advertised by each endpoint (interview_core.report_payload)
+        self._accepted_encodings = {}
+        self._condition = os_threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def __len__(self):
+        with self._condition:
+            return len(self._entries)
+
+    # ========== Producer side ==========
+
+    def enqueue(self, url, payload, key):
+        """
+        Persist a report and wake the sender.
+
+        A pending report with the same key is replaced by the new one.
+
+        Args:
+            url: Express endpoint to post the report to
+            payload: JSON-serializable report
+            key: Idempotency key of the report
+
+        Returns:
+            dict: The idempotency key and 'queued' status of the upload
+        """
+        now = time.time()
+        entry = {
+            'idempotency_key': key,
+            'url': url,
+            'created_at': now,
+            'attempts': 0,
+            'next_attempt_at': now,
+            'last_error': None,
+        }
+
+        with self._condition:
+            self._load()
+            self._write(entry, payload)
+            self._entries[key] = entry
+            self._condition.notify_all()
+
+        metrics.OUTBOX_ENQUEUED.inc()
+        return {'idempotency_key': key, 'status': 'queued'}
+
+    # ========== Sender ==========
+
+    def start(self):
+        """Start the sender thread (once); reports left by a previous run are picked up."""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._load()
+            self._stopping = False
+            self._thread = os_threading.Thread(target=self._run, name='result-outbox', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the sender; undelivered reports stay on disk for the next start."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                due = self._next_due()
+                while not due and not self._stopping:
+                    self._condition.wait(self._seconds_to_next())
+                    due = self._next_due()
+                if self._stopping:
+                    return
+
+            try:
+                self._deliver(due)
+            except Exception as e:
+                # Never let one bad report stop the sender; it is retried with backoff
+                logger.exception(f"Outbox delivery failed: {e}")
+                for entry in due:
+                    self._retry(entry, type(e).__name__)
+
+    def _next_due(self):
+        """The oldest due reports, up to one batch (called with the condition held)."""
+        now = time.time()
+        due = [entry for entry in self._entries.values() if entry['next_attempt_at'] <= now]
+        due.sort(key=lambda entry: entry['created_at'])
+        return due[:self.batch_size]
+
+    def _seconds_to_next(self):
+        if not self._entries:
+            return None
+        return max(0.0, min(entry['next_attempt_at'] for entry in self._entries.values()) - time.time())
+
+    def _deliver(self, due):
+        by_url = {}
+        for entry in due:
+            by_url.setdefault(entry['url'], []).append(entry)
+
+        for url, entries in by_url.items():
+            self._deliver_to(url, entries)
+
+    def _deliver_to(self, url, entries):
+        """Deliver reports to one endpoint, in a batch request if there are several."""
+        if len(entries) > 1 and self._batch_url(url) not in self._no_batch_urls:
+            if self._deliver_batch(url, entries):
+                return
+        for entry in entries:
+            self._deliver_one(entry)
+
+    def _deliver_one(self, entry):
+        payload = self._read_payload(entry)
+        if payload is None:
+            return
+
+        started = time.perf_counter()
+        try:
+            response = self._post(entry['url'], payload, {'Idempotency-Key': entry['idempotency_key']})
+        except Exception as e:
+            metrics.EXPRESS_UPLOAD_SECONDS.observe(time.perf_counter() - started)
+            metrics.EXPRESS_UPLOAD_FAILURES.labels(reason=type(e).__name__).inc()
+            self._retry(entry, f"{type(e).__name__}: {e}")
+            return
+        metrics.EXPRESS_UPLOAD_SECONDS.observe(time.perf_counter() - started)
+
+        self._settle(entry, response.status_code, response.text[:500],
+                     retry_after_seconds(response.headers.get('Retry-After')), mode='single')
+
+    def _deliver_batch(self, url, entries):
+        """
+        Post several reports in one request to the batch endpoint.
+
+        Returns:
+            bool: False if the endpoint does not exist or refused the batch as
+            a whole, so the reports should be sent one by one
+        """
+        items = []
+        for entry in entries:
+            payload = self._read_payload(entry)
+            if payload is not None:
+                items.append((entry, payload))
+        if not items:
+            return True
+
+        batch_url = self._batch_url(url)
+        body = {'results': [{'idempotency_key': entry['idempotency_key'], 'result': payload}
+                            for entry, payload in items]}
+
+        started = time.perf_counter()
+        try:
+            response = self._post(batch_url, body)
+        except Exception as e:
+            metrics.EXPRESS_UPLOAD_SECONDS.observe(time.perf_counter() - started)
+            metrics.EXPRESS_UPLOAD_FAILURES.labels(reason=type(e).__name__).inc()
+            for entry, _ in items:
+                self._retry(entry, f"{type(e).__name__}: {e}")
+            return True
+        metrics.EXPRESS_UPLOAD_SECONDS.observe(time.perf_counter() - started)
+
+        if response.status_code in (404, 405):
+            logger.info(f"No batch endpoint at {batch_url}, sending reports one by one")
+            self._no_batch_urls.add(batch_url)
+            return False
+
+        if response.status_code >= 300:
+            metrics.EXPRESS_UPLOAD_FAILURES.labels(reason=f"http_{response.status_code}").inc()
+
+        retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+        if response.status_code == 413:
+            # Over the endpoint's body size limit: send each half on its own, down to single reports
+            logger.info(f"Batch of {len(items)} reports too large for {batch_url}, splitting it")
+            entries = [entry for entry, _ in items]
+            self._deliver_to(url, entries[:len(entries) // 2])
+            self._deliver_to(url, entries[len(entries) // 2:])
+            return True
+        if response.status_code in RETRYABLE_STATUSES:
+            for entry, _ in items:
+                self._retry(entry, f"HTTP {response.status_code}: {response.text[:500]}", retry_after)
+            return True
+        if response.status_code >= 300:
+            # Says nothing about each report: let each one get its own answer
+            logger.warning(f"{batch_url} refused a batch of {len(items)} reports "
+                           f"(HTTP {response.status_code}), sending them one by one")
+            return False
+        metrics.OUTBOX_BATCH_SIZE.observe(len(items))
+
+        try:
+            statuses = {item.get('idempotency_key'): item for item in response.json().get('results', [])}
+        except (ValueError, AttributeError):
+            statuses = {}
+
+        for entry, _ in items:
+            item = statuses.get(entry['idempotency_key'])
+            if item is None:
+                self._retry(entry, "missing from the batch response")
+            else:
+                self._settle(entry, int(item.get('status', 500)), item.get('message'), retry_after, mode='batch')
+        return True
+
+    def _settle(self, entry, status, detail, retry_after, mode):
+        """Remove, retry or dead-letter a report after the Express backend answered `status`."""
+        if 200 <= status < 300 or status in DELIVERED_STATUSES:
+            self._delivered(entry, mode)
+            return
+
+        if mode == 'single':
+            metrics.EXPRESS_UPLOAD_FAILURES.labels(reason=f"http_{status}").inc()
+        if status in RETRYABLE_STATUSES:
+            self._retry(entry, f"HTTP {status}: {detail}", retry_after)
+        else:
+            self._dead(entry, f"HTTP {status}: {detail}")
+
+    def _post(self, url, payload, headers=None):
+        """Post a payload, compressed if the endpoint advertised a content coding we support."""
+        encoding = choose_encoding(self._accepted_encodings.get(url))
+        response = self._send(url, payload, encoding, headers)
+
+        if response.status_code == 415 and encoding is not None:
+            # The endpoint no longer accepts the coding: send uncompressed until it advertises one again
+            logger.info(f"{url} rejected {encoding}-encoded uploads, sending them uncompressed")
+            self._accepted_encodings[url] = set()
+            response = self._send(url, payload, None, headers)
+        return response
+
+    def _send(self, url, payload, encoding, headers):
+        headers = {'Content-Type': 'application/json', **(headers or {})}
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+
+        response = http_client.post(url, data=encode_body(payload, encoding), headers=headers, timeout=self.timeout)
+
+        # RFC 7694: the codings the endpoint accepts in requests
+        advertised = response.headers.get('Accept-Encoding')
+        if advertised is not None:
+            self._accepted_encodings[url] = parse_accept_encoding(advertised)
+        return response
+
+    @staticmethod
+    def _batch_url(url):
+        return url.rstrip('/') + '/batch'
+
+    # ========== Outcomes ==========
+
+    def _delivered(self, entry, mode):
+        with self._condition:
+            # A report replaced meanwhile is still pending under the same key
+            if self._discard(entry):
+                self._remove_file(self._path(entry))
+        metrics.OUTBOX_DELIVERED.labels(mode=mode).inc()
+        metrics.OUTBOX_DELIVERY_SECONDS.observe(time.time() - entry['created_at'])
+        logger.info(f"Delivered interview report {entry['idempotency_key']} "
+                    f"after {entry['attempts'] + 1} attempt(s)")
+
+    def _retry(self, entry, error, retry_after=None):
+        entry['attempts'] += 1
+        entry['last_error'] = error
+
+        if self.max_attempts and entry['attempts'] >= self.max_attempts:
+            self._dead(entry, error)
+            return
+
+        # Full jitter keeps reports queued during an outage from retrying in lockstep
+        delay = min(self.backoff_max, self.backoff * 2 ** (entry['attempts'] - 1)) * random.uniform(0.5, 1.0)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        entry['next_attempt_at'] = time.time() + delay
+
+        metrics.OUTBOX_RETRIES.inc()
+        logger.warning(f"Upload of interview report {entry['idempotency_key']} failed "
+                       f"(attempt {entry['attempts']}): {error}; retrying in {delay:.1f}s")
+
+        with self._condition:
+            # Skip the update if the report was replaced or settled meanwhile
+            if self._entries.get(entry['idempotency_key']) is entry:
+                self._write_meta(entry)
+
+    def _dead(self, entry, error):
+        with self._condition:
+            if not self._discard(entry):
+                return
+            path = self._path(entry)
+            try:
+                os.makedirs(self.dead_directory, exist_ok=True)
+                os.replace(path, os.path.join(self.dead_directory, os.path.basename(path)))
+            except OSError as e:
+                logger.error(f"Failed to move interview report {entry['idempotency_key']} to {self.dead_directory}: {e}")
+        metrics.OUTBOX_DEAD.inc()
+        logger.error(f"Giving up on interview report {entry['idempotency_key']} "
+                     f"after {entry['attempts']} attempt(s): {error}")
+
+    def _discard(self, entry):
+        """Forget a pending report (called with the condition held); False if it was replaced or settled."""
+        if self._entries.get(entry['idempotency_key']) is not entry:
+            return False
+        del self._entries[entry['idempotency_key']]
+        return True
+
+    # ========== Storage ==========
+
+    def _path(self, entry):
+        # Keys are session IDs; keep the file name safe whatever they contain
+        name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in entry['idempotency_key'])
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _load(self):
+        """Read the reports left by a previous run (once, with the condition held)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self.directory, exist_ok=True)
+
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding='utf-8') as file:
+                    entry = json.load(file)['entry']
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Skipping unreadable outbox file {name}: {e}")
+                continue
+            entry['next_attempt_at'] = min(entry.get('next_attempt_at', 0), time.time())
+            self._entries[entry['idempotency_key']] = entry
+
+        if self._entries:
+            logger.info(f"Outbox has {len(self._entries)} undelivered interview report(s)")
+
+    def _write(self, entry, payload):
+        """Atomically write a report file, so a crash never leaves a partial one."""
+        path = self._path(entry)
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(json_encoder.dumps({'entry': entry, 'payload': payload}))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+
+    def _write_meta(self, entry):
+        payload = self._read_payload(entry)
+        if payload is not None:
+            self._write(entry, payload)
+
+    def _read_payload(self, entry):
+        try:
+            with open(self._path(entry), encoding='utf-8') as file:
+                return json.load(file)['payload']
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Dropping unreadable interview report {entry['idempotency_key']}: {e}")
+            with self._condition:
+                self._discard(entry)
+            return None
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# Shared by the interview flow of all sessions
+result_outbox = ResultOutbox()
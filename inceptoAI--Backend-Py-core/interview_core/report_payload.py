@@ -0,0 +1,207 @@
+"""
+Shapes and encodes the interview reports uploaded to the Express backend.
+
+The full session_data carries every recorded frame (one entry per emotion,
+confidence signal and timestamp) and a second copy of the speech analyses,
+which are also in their responses: several megabytes of JSON for a long
+interview, of which the Express backend and the result pages read only the
+responses, the evaluation and the averages.
+
+shape_report() keeps those and replaces the per-frame lists with the frame
+count and a timeline of about UPLOAD_TIMELINE_POINTS points (per-window
+averages, split at question changes). UPLOAD_PAYLOAD=full sends the
+session_data as before.
+
+encode_body() serializes a report and compresses it with gzip, or zstd if
+the `zstandard` package is installed (interview-core's `zstd` extra). The
+outbox only compresses for an endpoint that advertised the coding in an
+Accept-Encoding response header (RFC 7694), so an Express backend opts in
+by sending that header; UPLOAD_CONTENT_ENCODING forces a coding instead.
+"""
+import gzip
+import time
+
+from interview_core import json_encoder, metrics, settings
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+PAYLOAD_FORMAT = 'compact-v1'
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Content codings in order of preference
+CONTENT_ENCODINGS = ('zstd', 'gzip') if zstandard is not None else ('gzip',)
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0
+
+
+def emotion_timeline(emotion_analysis, points):
+    """
+    Downsample the per-frame emotion lists to about `points` windows.
+
+    Windows hold the same number of frames and are split where the question
+    changes, so a window never mixes two answers.
+
+    Args:
+        emotion_analysis: The session's emotion analysis (session_data shape)
+        points: Target number of windows
+
+    Returns:
+        list: One dict per window with its first frame's timestamp and frame
+        ID, question, frame count, and mean confidence and emotion values
+    """
+    timestamps = emotion_analysis.get('timestamps', [])
+    if not timestamps or points <= 0:
+        return []
+
+    detailed = emotion_analysis.get('detailed_emotions', {})
+    confidence = emotion_analysis.get('confidence_signals', [])
+    window = -(-len(timestamps) // points)
+
+    timeline = []
+    start = 0
+    while start < len(timestamps):
+        question = timestamps[start].get('question')
+        end = start + 1
+        while end < len(timestamps) and end - start < window and timestamps[end].get('question') == question:
+            end += 1
+
+        timeline.append({
+            'timestamp': timestamps[start].get('timestamp'),
+            'frame_id': timestamps[start].get('frame_id'),
+            'question': question,
+            'frames': end - start,
+            'confidence': _mean([entry['value'] for entry in confidence[start:end]]),
+            'emotions': {emotion: _mean([entry['value'] for entry in values[start:end]])
+                         for emotion, values in detailed.items()},
+        })
+        start = end
+
+    return timeline
+
+
+def shape_report(session_data, timeline_points=None):
+    """
+    The compact upload form of an evaluated session.
+
+    Args:
+        session_data: Session in the session_data shape, with 'evaluation', 'user_id' and 'role'
+        timeline_points: Points of the emotion timeline (default: UPLOAD_TIMELINE_POINTS; 0 drops it)
+
+    Returns:
+        dict: The report; session_data is not modified
+    """
+    if timeline_points is None:
+        timeline_points = settings.UPLOAD_TIMELINE_POINTS
+
+    responses = session_data.get('responses', {})
+    emotion_analysis = session_data.get('emotion_analysis', {})
+
+    # The answers' background evaluations are in evaluation.detail_evaluations
+    responses = {key: {field: value for field, value in response.items()
+                       if field not in ('evaluation', 'evaluation_fingerprint')}
+                 for key, response in responses.items()}
+
+    # Speech analyses saved for a question are already in its response
+    answered = [response.get('speech_analysis') for response in responses.values()]
+    speech_analyses = [analysis for analysis in session_data.get('speech_analyses', []) if analysis not in answered]
+
+    report = {key: value for key, value in session_data.items()
+              if key not in ('responses', 'speech_analyses', 'emotion_analysis')}
+    report.update({
+        'payload_format': PAYLOAD_FORMAT,
+        'responses': responses,
+        'speech_analyses': speech_analyses,
+        'emotion_analysis': {
+            'average_emotions': emotion_analysis.get('average_emotions', {}),
+            'average_confidence': emotion_analysis.get('average_confidence', 0),
+            'frames': len(emotion_analysis.get('timestamps', [])),
+        },
+    })
+    if timeline_points:
+        report['emotion_analysis']['timeline'] = emotion_timeline(emotion_analysis, timeline_points)
+
+    return report
+
+
+def build_report(session_data):
+    """The report to upload for an evaluated session, in the configured UPLOAD_PAYLOAD form."""
+    if settings.UPLOAD_PAYLOAD == 'full':
+        return session_data
+
+    with metrics.UPLOAD_ENCODE_SECONDS.labels(step='shape').time():
+        return shape_report(session_data)
+
+
+def parse_accept_encoding(value):
+    """Content codings accepted by a server from its Accept-Encoding header (q=0 excluded)."""
+    accepted = set()
+    for part in (value or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding)
+    return accepted
+
+
+def choose_encoding(accepted):
+    """
+    The content coding to send a report with.
+
+    Args:
+        accepted: Codings the endpoint advertised, or None if it did not answer yet
+
+    Returns:
+        str or None: 'zstd', 'gzip', or None to send it uncompressed
+    """
+    forced = settings.UPLOAD_CONTENT_ENCODING
+    if forced == 'identity':
+        return None
+    if forced in CONTENT_ENCODINGS:
+        return forced
+
+    for coding in CONTENT_ENCODINGS:
+        if coding in (accepted or ()) or '*' in (accepted or ()):
+            return coding
+    return None
+
+
+def encode_body(payload, encoding=None):
+    """
+    Serialize a payload to JSON and compress it.
+
+    Sizes and timings are recorded in the upload payload metrics.
+
+    Args:
+        payload: JSON-serializable payload
+        encoding: 'zstd', 'gzip', or None for no compression
+
+    Returns:
+        bytes: The request body
+    """
+    started = time.perf_counter()
+    body = json_encoder.dumps(payload, separators=(',', ':')).encode('utf-8')
+    metrics.UPLOAD_ENCODE_SECONDS.labels(step='serialize').observe(time.perf_counter() - started)
+    metrics.UPLOAD_PAYLOAD_BYTES.labels(encoding='identity').observe(len(body))
+
+    if encoding is None:
+        return body
+
+    started = time.perf_counter()
+    if encoding == 'zstd':
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    else:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    metrics.UPLOAD_ENCODE_SECONDS.labels(step='compress').observe(time.perf_counter() - started)
+    metrics.UPLOAD_PAYLOAD_BYTES.labels(encoding=encoding).observe(len(body))
+
+    return body
@@ -0,0 +1,89 @@
+# Per-frame series of session_data['emotion_analysis'], besides detailed_emotions
+EMOTION_SERIES = ('confidence_signals', 'eye_contact', 'timestamps')
+
+
+class EmotionAnalysisSnapshot:
+    """
+    The emotion analysis of a session at one version.
+
+    The per-frame lists are append-only and their entries are never changed
+    once appended, so the snapshot keeps a reference to each list and its
+    length at publication, and slices them when read.
+    """
+
+    __slots__ = ('detailed', 'series', 'average_emotions', 'average_confidence', 'frames')
+
+    def __init__(self, emotion_analysis):
+        self.detailed = tuple(
+            (emotion, values, len(values)) for emotion, values in emotion_analysis['detailed_emotions'].items()
+        )
+        self.series = tuple(
+            (name, emotion_analysis[name], len(emotion_analysis[name]))
+            for name in EMOTION_SERIES if name in emotion_analysis
+        )
+        self.average_emotions = emotion_analysis.get('average_emotions', {})
+        self.average_confidence = emotion_analysis.get('average_confidence', 0)
+        # Number of recorded frames
+        self.frames = len(emotion_analysis.get('timestamps', ()))
+
+    def to_dict(self):
+        """The emotion analysis in the session_data shape."""
+        result = {
+            'average_emotions': self.average_emotions,
+            'average_confidence': self.average_confidence,
+            'detailed_emotions': {emotion: values[:length] for emotion, values, length in self.detailed},
+        }
+        for name, values, length in self.series:
+            result[name] = values[:length]
+        return result
+
+
+class SessionSnapshot:
+    """
+    Immutable, versioned view of one session's data, for readers.
+
+    Obtaining the latest snapshot is a single attribute read, and readers
+    never take the store's lock. Writers change session_data under the
+    store's write lock and then publish a new snapshot, which shares
+    structure with the previous one:
+    - responses and speech_analyses are small and replaced on every change
+      (copy-on-write), never mutated in place
+    - the per-frame emotion lists are append-only (EmotionAnalysisSnapshot)
+
+    The dicts returned by the accessors are shared with other readers and
+    must not be modified, except for the top level of to_dict().
+    """
+
+    __slots__ = ('version', 'session_id', 'created_at', 'updated_at', 'responses', 'speech_analyses', 'emotion',
+                 '_emotion_analysis')
+
+    def __init__(self, session_data, version=0):
+        self.version = version
+        self.session_id = session_data['session_id']
+        self.created_at = session_data.get('created_at')
+        self.updated_at = session_data.get('updated_at')
+        self.responses = session_data['responses']
+        self.speech_analyses = session_data['speech_analyses']
+        self.emotion = EmotionAnalysisSnapshot(session_data['emotion_analysis'])
+        self._emotion_analysis = None
+
+    def emotion_analysis(self):
+        """The emotion analysis dict, built once per snapshot."""
+        if self._emotion_analysis is None:
+            self._emotion_analysis = self.emotion.to_dict()
+        return self._emotion_analysis
+
+    def responses_list(self):
+        """Responses sorted by question number."""
+        return sorted(self.responses.values(), key=lambda x: int(x.get('question_number', 0)))
+
+    def to_dict(self):
+        """The session in the session_data shape; the top-level dict is the caller's own."""
+        return {
+            'session_id': self.session_id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'responses': self.responses,
+            'speech_analyses': self.speech_analyses,
+            'emotion_analysis': self.emotion_analysis(),
+        }
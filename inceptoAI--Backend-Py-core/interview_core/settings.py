@@ -0,0 +1,136 @@
+"""
+Settings of the shared modules, read from the environment.
+
+The shared modules read their settings from here, never from a backend's
+config module. Each backend's config.py imports these, so that its own code
+can read them too, and passes the settings it sets itself (frame analyzer,
+data directories, ...) to configure().
+"""
+import os
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Set by each backend with configure(): frame analyzer used by the session
+# stores ('haar', 'deepface' or 'onnx', see interview_core/analyzers), the
+# exported model of the 'onnx' analyzer, and the directory of the outbox of
+# interview reports waiting for upload
+EMOTION_ANALYZER = os.environ.get('EMOTION_ANALYZER', 'haar')
+ONNX_EMOTION_MODEL = os.environ.get('ONNX_EMOTION_MODEL', os.path.join('data', 'models', 'emotion.onnx'))
+OUTBOX_DIR = os.environ.get('OUTBOX_DIR', os.path.join('data', 'outbox'))
+
+# Frame analyses running at once across all sessions, on OS threads (0 = one per core)
+ANALYSIS_CONCURRENCY = int(os.environ.get('ANALYSIS_CONCURRENCY', 0))
+
+# Frames waiting for analysis per session; frames arriving at a full queue
+# are dropped rather than delaying the socket handler (0 = unbounded)
+FRAME_QUEUE_MAXSIZE = int(os.environ.get('FRAME_QUEUE_MAXSIZE', 30))
+
+# Role keyword dictionaries used for relevance scoring
+ROLE_KEYWORDS_FILE = os.environ.get('ROLE_KEYWORDS_FILE', os.path.join(_PACKAGE_DIR, 'data', 'role_keywords.json'))
+KEYWORD_STEMMING = os.environ.get('KEYWORD_STEMMING', 'false').lower() in ('1', 'true', 'yes')
+
+# Logging: level, 'text' or 'json' output, size of the queue in front of the
+# console writer, and the window of rate-limited hot path messages
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+LOG_RATE_LIMIT_SECONDS = float(os.environ.get('LOG_RATE_LIMIT_SECONDS', 10))
+
+# 'deepface' analyzer: detect and track faces in our pipeline and pass DeepFace
+# only the face crop ('pipeline'), or let DeepFace.analyze detect ('deepface')
+DEEPFACE_DETECTION = os.environ.get('DEEPFACE_DETECTION', 'pipeline')
+
+# 'onnx' analyzer: whether to use the int8 quantized copy of the model, and
+# ONNX Runtime intra-op threads per inference (0 = one per core; 1 avoids
+# oversubscription with many sessions)
+ONNX_INT8 = os.environ.get('ONNX_INT8', 'false').lower() in ('1', 'true', 'yes')
+ONNX_INTRA_OP_THREADS = int(os.environ.get('ONNX_INTRA_OP_THREADS', 1))
+
+# Load the analyzer model and run a dummy inference in the background at startup
+MODEL_WARMUP = os.environ.get('MODEL_WARMUP', 'true').lower() in ('1', 'true', 'yes')
+
+# Per-frame tracing: fraction of frames traced (0 disables), exported to a
+# JSON-lines file or to an OTLP/HTTP collector
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0))
+TRACE_EXPORTER = os.environ.get('TRACE_EXPORTER', 'file')
+TRACE_FILE = os.environ.get('TRACE_FILE', 'frame_traces.jsonl')
+TRACE_OTLP_ENDPOINT = os.environ.get('TRACE_OTLP_ENDPOINT', 'http://127.0.0.1:4318/v1/traces')
+
+# Outbound HTTP (see interview_core/http_client.py): idle keep-alive connections kept
+# per host, hard per-host connection limits as 'host[:port]=n,...', and the
+# default connect and read timeouts in seconds
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))
+HTTP_HOST_LIMITS = os.environ.get('HTTP_HOST_LIMITS', '')
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('HTTP_CONNECT_TIMEOUT_SECONDS', 5))
+HTTP_READ_TIMEOUT_SECONDS = float(os.environ.get('HTTP_READ_TIMEOUT_SECONDS', 30))
+
+# Outbox of interview reports uploaded to the Express backend (see interview_core/outbox.py):
+# reports per batch request, exponential backoff base and cap in seconds,
+# attempts before a report is set aside (0 = retry forever), and the
+# per-request timeout
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 20))
+OUTBOX_BACKOFF_SECONDS = float(os.environ.get('OUTBOX_BACKOFF_SECONDS', 2))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.environ.get('OUTBOX_BACKOFF_MAX_SECONDS', 300))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 0))
+OUTBOX_TIMEOUT_SECONDS = float(os.environ.get('OUTBOX_TIMEOUT_SECONDS', 10))
+
+# Uploaded report (see interview_core/report_payload.py): 'compact' (summaries and a
+# downsampled emotion timeline) or 'full' (the whole session_data), points of
+# the timeline (0 = none), and the content coding of the request body ('auto'
+# = the best one the Express backend advertises, or 'identity', 'gzip', 'zstd')
+UPLOAD_PAYLOAD = os.environ.get('UPLOAD_PAYLOAD', 'compact')
+UPLOAD_TIMELINE_POINTS = int(os.environ.get('UPLOAD_TIMELINE_POINTS', 120))
+UPLOAD_CONTENT_ENCODING = os.environ.get('UPLOAD_CONTENT_ENCODING', 'auto')
+
+# Evaluate each answer with the LLM in the background as soon as it is saved
+# (see interview_core/answer_evaluations.py), and how long complete_interview waits
+# for an evaluation still running before evaluating the answer itself
+INCREMENTAL_EVALUATION = os.environ.get('INCREMENTAL_EVALUATION', 'true').lower() in ('1', 'true', 'yes')
+EVALUATION_WAIT_SECONDS = float(os.environ.get('EVALUATION_WAIT_SECONDS', 30))
+
+# LLM call scheduling (see interview_core/llm_scheduler.py): requests per minute per
+# 'provider[:model]=n,...' (none = unlimited), calls let through at once,
+# calls in flight at once per provider:model (0 = unlimited), seconds between
+# the calls let through after a rate limit pause, seconds a call may wait for
+# a slot per priority class, retries of rate limited and failed calls, and
+# the base of their exponential backoff
+LLM_RATE_LIMITS = os.environ.get('LLM_RATE_LIMITS', '')
+LLM_RATE_BURST = int(os.environ.get('LLM_RATE_BURST', 5))
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 8))
+LLM_RESUME_INTERVAL_SECONDS = float(os.environ.get('LLM_RESUME_INTERVAL_SECONDS', 1))
+LLM_QUEUE_TIMEOUTS = os.environ.get('LLM_QUEUE_TIMEOUTS', 'interactive=15,evaluation=60,batch=300')
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 2))
+LLM_RETRY_BACKOFF_SECONDS = float(os.environ.get('LLM_RETRY_BACKOFF_SECONDS', 1))
+
+# Identical concurrent LLM prompts share one call (see interview_core/single_flight.py);
+# with more than one variant, sessions are spread over that many calls of
+# each prompt so that a burst of interviews does not all get the same question
+LLM_COALESCE = os.environ.get('LLM_COALESCE', 'true').lower() in ('1', 'true', 'yes')
+LLM_COALESCE_VARIANTS = max(1, int(os.environ.get('LLM_COALESCE_VARIANTS', 1)))
+
+# Interview evaluation stages (see models/interview_evaluator.py): seconds
+# before a CPU stage or an answer's LLM evaluation is given up and replaced
+# by its fallback
+EVALUATION_CPU_TIMEOUT_SECONDS = float(os.environ.get('EVALUATION_CPU_TIMEOUT_SECONDS', 30))
+EVALUATION_LLM_TIMEOUT_SECONDS = float(os.environ.get('EVALUATION_LLM_TIMEOUT_SECONDS', 90))
+
+
+def configure(**values):
+    """
+    Set shared settings to the backend's values instead of their defaults.
+
+    Each backend calls this from its config.py, before importing the shared
+    modules: their process-wide objects (LLM scheduler, outbox, tracer, ...)
+    read their settings when they are created.
+
+    Args:
+        **values: Values by setting name, e.g. EMOTION_ANALYZER='deepface'
+
+    Raises:
+        TypeError: If a name is not a setting of this module
+    """
+    module = globals()
+    for name, value in values.items():
+        if not name.isupper() or name not in module:
+            raise TypeError(f"Unknown interview_core setting: {name}")
+        module[name] = value
@@ -0,0 +1,123 @@
+"""
+Shares one in-flight LLM call among concurrent identical requests.
+
+When many candidates start an interview for the same role and company at
+once (a campus hiring drive), every session sends the same first-question
+prompt at the same moment. llm_single_flight.run() lets the first caller
+of a key make the call and has the others wait for its result, so the
+provider sees one request instead of dozens and nobody queues behind the
+others' rate limits.
+
+Keys come from prompt_key(): the prompt with its whitespace normalized and
+the call parameters. Callers that pass a session ID are spread over
+LLM_COALESCE_VARIANTS variant slots, so a burst gets up to that many
+different answers (e.g. different first questions) instead of one.
+
+Calls are shared across event loops (in eventlet mode each request runs
+its own), and a caller that is cancelled while leading a call hands it
+over to the waiting callers instead of failing them. LLM_COALESCE=false
+turns the sharing off.
+"""
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import zlib
+
+from interview_core import settings
+from interview_core.metrics import LLM_COALESCED
+from interview_core.offload import os_threading
+
+# Result of a call whose leader was cancelled: a waiting caller makes it again
+_RETRY = object()
+
+
+def prompt_key(prompt, *params, session_id=None, variants=None):
+    """
+    Key of an LLM call for single-flight sharing.
+
+    Args:
+        prompt: The prompt; runs of whitespace are treated as one space
+        *params: Provider, model and other parameters that change the result
+        session_id: Session the call is for; spreads sessions over `variants` slots
+        variants: Variant slots (default: LLM_COALESCE_VARIANTS; 1 = all sessions share)
+
+    Returns:
+        str: Hex digest
+    """
+    variants = settings.LLM_COALESCE_VARIANTS if variants is None else variants
+    slot = zlib.crc32(str(session_id).encode('utf-8')) % variants if session_id is not None and variants > 1 else 0
+    key = json.dumps([' '.join(prompt.split()), params, slot], default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """
+    Shares in-flight calls among concurrent callers with the same key.
+
+    Usage:
+        response = await llm_single_flight.run(key, lambda: llm.ainvoke(prompt), purpose='question')
+    """
+
+    def __init__(self, enabled=None):
+        self.enabled = settings.LLM_COALESCE if enabled is None else enabled
+        self._calls = {}
+        self._lock = os_threading.Lock()
+
+    def __len__(self):
+        """Calls in flight."""
+        with self._lock:
+            return len(self._calls)
+
+    async def run(self, key, call, purpose='other'):
+        """
+        Await `call()`, or the identical call already in flight.
+
+        Args:
+            key: Key of the call (see prompt_key)
+            call: Function returning an awaitable of the result
+            purpose: Label of the call in the coalesced calls metric
+
+        Returns:
+            The call's result; its exception is raised to every caller sharing it
+        """
+        if not self.enabled:
+            return await call()
+
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = concurrent.futures.Future()
+
+            if leader:
+                return await self._lead(key, future, call)
+
+            LLM_COALESCED.labels(purpose=purpose).inc()
+            # Shielded: a waiting caller being cancelled must not cancel the shared call
+            result = await asyncio.shield(asyncio.wrap_future(future))
+            if result is not _RETRY:
+                return result
+
+    async def _lead(self, key, future, call):
+        try:
+            result = await call()
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            if isinstance(e, Exception):
+                future.set_exception(e)
+            else:
+                # Cancelled: one of the waiting callers makes the call instead
+                future.set_result(_RETRY)
+            raise
+
+        with self._lock:
+            self._calls.pop(key, None)
+        future.set_result(result)
+        return result
+
+
+# Shared by all LLM calls of the process
+llm_single_flight = SingleFlight()
@@ -0,0 +1,130 @@
+"""
+Runs a computation as a small dependency graph of stages.
+
+Each stage starts as soon as the stages it requires have finished, so
+independent stages overlap: 'thread' stages (CPU-bound numpy and text
+work) run on the event loop's thread pool, 'async' stages (LLM calls) run
+concurrently as coroutines on the loop, and 'inline' stages (cheap
+aggregations) are called directly.
+
+A stage that raises or exceeds its timeout does not fail the graph: its
+fallback is used as its result (None if there is none or it raises too)
+and the stages that require it go on with that. Every stage is timed into
+interview_evaluation_stage_seconds, and run_stage_graph() returns the
+timings so callers can report them.
+
+A 'thread' stage that times out cannot be interrupted: the graph goes on
+with its fallback, but its thread runs to the end in the background and
+holds a worker of the loop's thread pool until then. Such stages should
+have no side effects beyond their result, and timeouts well above their
+usual duration.
+"""
+import asyncio
+import logging
+import time
+
+from interview_core.metrics import EVALUATION_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+STAGE_KINDS = ('thread', 'async', 'inline')
+
+
+class Stage:
+    """
+    One stage of a graph.
+
+    Args:
+        name: Unique name; a ':suffix' (e.g. 'answer:3') is left out of the metric label
+        fn: Called with the results of `requires`, in order; a coroutine function for 'async' stages
+        requires: Names of the stages whose results fn takes, declared earlier in the graph
+        kind: 'thread', 'async' or 'inline'
+        timeout: Seconds before the stage is given up (None = no limit); a
+            'thread' stage keeps running in its thread after that
+        fallback: Callable returning the result to use if the stage fails; only called then
+    """
+    __slots__ = ('name', 'fn', 'requires', 'kind', 'timeout', 'fallback')
+
+    def __init__(self, name, fn, requires=(), kind='thread', timeout=None, fallback=None):
+        if kind not in STAGE_KINDS:
+            raise ValueError(f"Unknown stage kind {kind!r}")
+        self.name = name
+        self.fn = fn
+        self.requires = tuple(requires)
+        self.kind = kind
+        self.timeout = timeout
+        self.fallback = fallback
+
+
+async def _run_stage(stage, args):
+    if stage.kind == 'thread':
+        call = asyncio.to_thread(stage.fn, *args)
+    elif stage.kind == 'async':
+        call = stage.fn(*args)
+    else:
+        return stage.fn(*args)
+
+    if stage.timeout is None:
+        return await call
+    return await asyncio.wait_for(call, stage.timeout)
+
+
+async def run_stage_graph(stages):
+    """
+    Run stages as soon as their requirements are met.
+
+    Args:
+        stages: Stages in an order where each one comes after those it requires
+
+    Returns:
+        tuple: (results by stage name, timings by stage name), where each
+        timing has the stage's 'status' ('ok', 'failed' or 'timeout'), its
+        'start' offset from the start of the graph and its duration
+        'seconds', both excluding the wait for its requirements
+    """
+    started = time.perf_counter()
+    tasks = {}
+    timings = {}
+
+    async def run(stage):
+        args = [await tasks[name] for name in stage.requires]
+        stage_started = time.perf_counter()
+        status = 'ok'
+        try:
+            result = await _run_stage(stage, args)
+        except asyncio.TimeoutError:
+            status = 'timeout'
+            logger.warning(f"Stage {stage.name} timed out after {stage.timeout}s")
+        except Exception as e:
+            status = 'failed'
+            logger.error(f"Stage {stage.name} failed: {str(e)}")
+
+        seconds = time.perf_counter() - stage_started
+        timings[stage.name] = {
+            'status': status, 'start': round(stage_started - started, 4), 'seconds': round(seconds, 4)
+        }
+        EVALUATION_STAGE_SECONDS.labels(stage=stage.name.split(':')[0], status=status).observe(seconds)
+
+        if status != 'ok':
+            result = None
+            if stage.fallback is not None:
+                try:
+                    result = stage.fallback()
+                except Exception as e:
+                    logger.error(f"Fallback of stage {stage.name} failed: {str(e)}")
+        return result
+
+    declared = set()
+    for stage in stages:
+        if stage.name in declared:
+            raise ValueError(f"Duplicate stage {stage.name!r}")
+        unknown = [name for name in stage.requires if name not in declared]
+        if unknown:
+            raise ValueError(f"Stage {stage.name!r} requires undeclared stages {unknown}")
+        declared.add(stage.name)
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(run(stage))
+
+    await asyncio.gather(*tasks.values())
+    return {name: task.result() for name, task in tasks.items()}, timings
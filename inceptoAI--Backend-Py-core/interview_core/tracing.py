@@ -0,0 +1,268 @@
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+from interview_core import settings
+
+logger = logging.getLogger(__name__)
+
+# Name reported as service.name on exported spans
+SERVICE_NAME = 'inceptoai-analysis'
+
+
+class _NoopSpan:
+    """Stand-in used for frames that are not sampled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('_trace', '_name', '_start')
+
+    def __init__(self, trace, name):
+        self._trace = trace
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._trace.add_span(self._name, self._start, time.time_ns(), error=exc_type is not None)
+        return False
+
+
+class FrameTrace:
+    """
+    Spans of one sampled frame, from the `frame` event to the recorded result.
+
+    The trace is created by the socket handler, travels with the frame through
+    the analysis queue and is exported once the worker finishes the frame.
+    Stage spans are children of a root `frame` span covering the whole trip.
+    """
+
+    def __init__(self, tracer, session_id, frame_id, question_number):
+        self.tracer = tracer
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.root_span_id = f"{random.getrandbits(64):016x}"
+        self.start_ns = time.time_ns()
+        self.enqueued_ns = None
+        self.attributes = {
+            'session.id': str(session_id),
+            'frame.id': str(frame_id),
+            'question.number': question_number,
+        }
+        self.spans = []
+        self._finished = False
+
+    def span(self, name):
+        """Context manager recording one stage span."""
+        return _Span(self, name)
+
+    def add_span(self, name, start_ns, end_ns, error=False):
+        self.spans.append((name, start_ns, end_ns, error))
+
+    def mark_enqueued(self):
+        self.enqueued_ns = time.time_ns()
+
+    def mark_dequeued(self):
+        if self.enqueued_ns is not None:
+            self.add_span('queue_wait', self.enqueued_ns, time.time_ns())
+
+    def finish(self, outcome):
+        """End the root span with an outcome (face, no_face, failed, dropped) and export."""
+        if self._finished:
+            return
+        self._finished = True
+        self.attributes['frame.outcome'] = outcome
+        self.tracer.export(self, time.time_ns())
+
+
+class StageTimer:
+    """
+    Times one frame stage into a latency histogram and, when the frame is
+    sampled, into its trace as a span.
+    """
+    __slots__ = ('_histogram', '_trace', '_name', '_start', '_start_ns')
+
+    def __init__(self, histogram, trace, name):
+        self._histogram = histogram
+        self._trace = trace
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        if self._trace is not None:
+            self._start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.perf_counter() - self._start)
+        if self._trace is not None:
+            self._trace.add_span(self._name, self._start_ns, time.time_ns(), error=exc_type is not None)
+        return False
+
+
+def span(trace, name):
+    """Stage span of `trace`, or a no-op when the frame is not sampled."""
+    if trace is None:
+        return NOOP_SPAN
+    return trace.span(name)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp(traces):
+    """Encode finished (trace, end_ns) pairs as an OTLP/HTTP JSON export request."""
+    spans = []
+    for trace, end_ns in traces:
+        spans.append({
+            'traceId': trace.trace_id,
+            'spanId': trace.root_span_id,
+            'name': 'frame',
+            'kind': 2,  # SERVER
+            'startTimeUnixNano': str(trace.start_ns),
+            'endTimeUnixNano': str(end_ns),
+            'attributes': _otlp_attributes(trace.attributes),
+            'status': {'code': 2 if trace.attributes.get('frame.outcome') == 'failed' else 1},
+        })
+        for name, start_ns, stage_end_ns, error in trace.spans:
+            spans.append({
+                'traceId': trace.trace_id,
+                'spanId': f"{random.getrandbits(64):016x}",
+                'parentSpanId': trace.root_span_id,
+                'name': name,
+                'kind': 1,  # INTERNAL
+                'startTimeUnixNano': str(start_ns),
+                'endTimeUnixNano': str(stage_end_ns),
+                'attributes': _otlp_attributes({'session.id': trace.attributes['session.id']}),
+                'status': {'code': 2 if error else 1},
+            })
+
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': SERVICE_NAME, 'process.pid': os.getpid()})},
+            'scopeSpans': [{'scope': {'name': 'inceptoai.frames'}, 'spans': spans}],
+        }]
+    }
+
+
+class FileExporter:
+    """Appends one OTLP JSON export request per line to a local file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def export(self, payload):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(payload) + '\n')
+
+
+class OTLPExporter:
+    """Posts OTLP JSON export requests to a collector's /v1/traces endpoint."""
+
+    def __init__(self, endpoint, timeout=5):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, payload):
+        from interview_core.http_client import http_client
+        response = http_client.post(self.endpoint, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class Tracer:
+    """
+    Head-sampled frame tracer with a background batch exporter.
+
+    The sampling decision is made once per frame, when the trace is started;
+    unsampled frames cost one random() call. Finished traces are handed to a
+    bounded queue and exported in batches by a daemon thread, so exporting
+    never blocks frame analysis. Traces are dropped if the queue is full.
+    """
+
+    def __init__(self, sample_rate=None, exporter=None, batch_size=64, flush_interval=1.0, max_queue=10000):
+        self.sample_rate = settings.TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 and self.exporter is not None
+
+    def start_trace(self, session_id, frame_id, question_number=0):
+        """Start a trace for one frame, or return None if the frame is not sampled."""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        return FrameTrace(self, session_id, frame_id, question_number)
+
+    def export(self, trace, end_ns):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((trace, end_ns))
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self.exporter.export(to_otlp(batch))
+            except Exception as e:
+                logger.warning(f"Failed to export {len(batch)} frame traces: {str(e)}")
+
+
+def create_exporter():
+    """Exporter configured by TRACE_EXPORTER ('file' or 'otlp')."""
+    if settings.TRACE_EXPORTER == 'otlp':
+        return OTLPExporter(settings.TRACE_OTLP_ENDPOINT)
+    return FileExporter(settings.TRACE_FILE)
+
+
+# Process-wide tracer used by the socket handlers and the analysis workers
+tracer = Tracer(exporter=create_exporter())
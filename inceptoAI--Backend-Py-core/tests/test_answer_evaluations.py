@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+import types
+
+import pytest
+
+from interview_core.answer_evaluations import AnswerEvaluations, answer_fingerprint
+
+
+class Store:
+    def __init__(self, responses):
+        self.responses = responses
+
+    def snapshot(self):
+        return types.SimpleNamespace(responses=dict(self.responses), emotion_analysis=lambda: {})
+
+    def set_answer_evaluation(self, question_key, evaluation, fingerprint):
+        self.responses[question_key] = {
+            **self.responses[question_key], 'evaluation': evaluation, 'evaluation_fingerprint': fingerprint
+        }
+
+
+class Evaluator:
+    delay = 0.05
+    calls = []
+    release = None
+
+    @staticmethod
+    def session_role(responses):
+        return 'developer'
+
+    async def evaluate_answer(self, response, emotion_data, role, raise_errors=False):
+        Evaluator.calls.append(response['answer'])
+        if Evaluator.release is not None:
+            await asyncio.get_running_loop().run_in_executor(None, Evaluator.release.wait)
+        await asyncio.sleep(Evaluator.delay)
+        return {'score': len(response['answer'])}
+
+
+def response(answer):
+    return {'question_number': 1, 'question_text': 'Why?', 'answer': answer}
+
+
+@pytest.fixture
+def store():
+    Evaluator.calls = []
+    Evaluator.release = None
+    return Store({'1': response('because')})
+
+
+def stores(store):
+    """Session store lookup of a single session 's'."""
+    return {'s': store}.get
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_evaluates_in_background_and_forgets_finished(store):
+    evaluations = AnswerEvaluations(Evaluator, stores(store), enabled=True, wait_seconds=5)
+    stale = store.snapshot().responses['1']
+
+    assert evaluations.submit('s') == 1
+    # Unchanged answers are not queued again
+    assert evaluations.submit('s') == 0
+    wait_until(lambda: 'evaluation' in store.responses['1'])
+    wait_until(lambda: not evaluations._pending)
+
+    # Read from the session's current response, not from the stale one passed in
+    assert asyncio.run(evaluations.result('s', stale, 'developer')) == {'score': 7}
+    assert evaluations.submit('s') == 0
+    assert Evaluator.calls == ['because']
+
+
+def test_result_waits_for_a_running_evaluation(store):
+    Evaluator.release = threading.Event()
+    evaluations = AnswerEvaluations(Evaluator, stores(store), enabled=True, wait_seconds=5)
+    evaluations.submit('s')
+    assert len(evaluations) == 1
+
+    threading.Timer(0.05, Evaluator.release.set).start()
+    assert asyncio.run(evaluations.result('s', store.snapshot().responses['1'], 'developer')) == {'score': 7}
+
+
+def test_result_times_out(store):
+    Evaluator.release = threading.Event()
+    evaluations = AnswerEvaluations(Evaluator, stores(store), enabled=True, wait_seconds=0.05)
+    evaluations.submit('s')
+
+    assert asyncio.run(evaluations.result('s', store.snapshot().responses['1'], 'developer')) is None
+    Evaluator.release.set()
+
+
+def test_changed_answer_is_evaluated_again(store):
+    evaluations = AnswerEvaluations(Evaluator, stores(store), enabled=True, wait_seconds=5)
+    evaluations.submit('s')
+    wait_until(lambda: 'evaluation' in store.responses['1'])
+
+    store.responses['1'] = {**store.responses['1'], 'answer': 'it depends'}
+    changed = store.snapshot().responses['1']
+    assert changed['evaluation_fingerprint'] != answer_fingerprint(changed, 'developer')
+    # The evaluation of the previous answer is not reused
+    assert asyncio.run(evaluations.result('s', changed, 'developer')) is None
+
+    assert evaluations.submit('s') == 1
+    wait_until(lambda: store.responses['1']['evaluation'] == {'score': 10})
+
+
+def test_discard_cancels_a_session(store):
+    Evaluator.release = threading.Event()
+    evaluations = AnswerEvaluations(Evaluator, stores(store), enabled=True, wait_seconds=5)
+    evaluations.submit('s')
+
+    evaluations.discard('s')
+    assert len(evaluations) == 0
+    Evaluator.release.set()
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from interview_core.http_client import AsyncHttpClient, parse_host_limits, retry_after_seconds
+
+
+def test_parse_host_limits():
+    assert parse_host_limits('API.groq.com=4, localhost:3000=2,bad') == {'api.groq.com': 4, 'localhost:3000': 2}
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds('2.5') == 2.5
+    assert retry_after_seconds('-1') == 0.0
+    assert 50 < retry_after_seconds(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert retry_after_seconds('soon') is None
+    assert retry_after_seconds(None) is None
+
+
+def test_async_client_runs_calls_on_one_loop_thread():
+    pytest.importorskip('httpx')
+    client = AsyncHttpClient()
+    threads = set()
+
+    async def call():
+        threads.add(threading.current_thread().name)
+        await asyncio.sleep(0.01)
+        return client.client
+
+    # Callers from different event loops share the client and its loop
+    first = asyncio.run(client.run(call))
+    second = asyncio.run(client.run(call))
+    assert first is second
+    assert threads == {'async-http-client'}
+
+    thread = client._thread
+    client.close()
+    assert not thread.is_alive()
+    assert first.is_closed
+
+
+def test_cancelling_the_caller_cancels_the_call():
+    pytest.importorskip('httpx')
+    client = AsyncHttpClient()
+    cancelled = threading.Event()
+
+    async def call():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.run(call), 0.05)
+
+    asyncio.run(main())
+    assert cancelled.wait(1)
+    client.close()
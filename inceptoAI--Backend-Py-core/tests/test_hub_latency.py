@@ -0,0 +1,59 @@
+"""
+/status latency while sessions stream frames, with the server and clients
+of benchmarks/bench_hub_latency.py. Needs the lightweight backend's
+dependencies and a Socket.IO client.
+"""
+import base64
+import importlib
+import os
+import sys
+import time
+import types
+
+import pytest
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              'benchmarks')
+
+SESSIONS = 20
+FPS = 10.0
+MAX_STATUS_P95_MS = 100.0
+
+
+@pytest.fixture(scope='module')
+def bench():
+    for module in ('cv2', 'requests', 'flask_socketio', 'eventlet', 'socketio', 'websocket'):
+        pytest.importorskip(module)
+    sys.path.insert(0, BENCHMARKS_DIR)
+    try:
+        yield importlib.import_module('bench_hub_latency')
+    finally:
+        sys.path.remove(BENCHMARKS_DIR)
+
+
+@pytest.mark.slow
+def test_status_stays_fast_while_sessions_stream(bench):
+    process, url = bench.start_server(types.SimpleNamespace(backend='lightweight', startup_timeout=120.0))
+    sessions = []
+    try:
+        payloads = [
+            'data:image/jpeg;base64,' + base64.b64encode(fixture['data']).decode('ascii')
+            for fixture in bench.load_fixtures()
+        ]
+        for i in range(SESSIONS):
+            session = bench.StreamingSession(url, payloads, FPS, i)
+            session.start()
+            sessions.append(session)
+        # Let the sessions reach a steady state before measuring
+        time.sleep(3)
+
+        status = bench.StatusPoller(url, 0.1).measure(10)
+    finally:
+        for session in sessions:
+            session.stop()
+        process.terminate()
+        process.wait(timeout=10)
+
+    assert status['errors'] == 0
+    assert sum(len(session.ack_latencies) for session in sessions) > 0
+    assert status['latency_ms']['p95'] <= MAX_STATUS_P95_MS, status
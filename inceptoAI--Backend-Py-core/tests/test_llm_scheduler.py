@@ -0,0 +1,253 @@
+import asyncio
+import time
+
+import pytest
+
+from interview_core.llm_scheduler import LLMQueueTimeout, LLMScheduler, TokenBucket, parse_settings
+
+TIMEOUTS = {'interactive': 5, 'evaluation': 5, 'batch': 5}
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__('rate limited')
+        self.response = type('Response', (), {'status_code': 429, 'headers': {'retry-after': str(retry_after)}})()
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+def scheduler(**kwargs):
+    settings = dict(rate_limits={}, burst=5, queue_timeouts=TIMEOUTS, max_retries=2, backoff=0.01,
+                    max_concurrency=0, resume_interval=0.1)
+    settings.update(kwargs)
+    return LLMScheduler(**settings)
+
+
+def test_parse_settings():
+    assert parse_settings(' Groq=30, gemini:flash=10,bad,=3') == {'groq': 30.0, 'gemini:flash': 10.0}
+    assert parse_settings('') == {}
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(per_minute=60, burst=2)
+    now = bucket.updated
+    assert bucket.take(now) and bucket.take(now)
+    assert not bucket.take(now)
+    assert bucket.wait_time(now) == pytest.approx(1.0)
+    assert bucket.take(now + 1.0)
+
+
+def test_token_bucket_paces_resume_without_rate():
+    bucket = TokenBucket(per_minute=None, burst=5, resume_interval=0.5)
+    now = bucket.updated
+    bucket.pause(2, now)
+
+    assert bucket.wait_time(now) == pytest.approx(2)
+    assert not bucket.take(now + 1.9)
+    # Once the pause ends, one call per resume interval for as long as the pause lasted
+    assert bucket.take(now + 2)
+    assert not bucket.take(now + 2.1)
+    assert bucket.take(now + 2.5)
+    assert bucket.wait_time(now + 2.5) == pytest.approx(0.5)
+    # Then no limit again
+    assert bucket.take(now + 4.1) and bucket.take(now + 4.1)
+
+
+def test_priority_order_within_concurrency_limit():
+    async def main():
+        s = scheduler(max_concurrency=2)
+        started = []
+        release = asyncio.Event()
+
+        async def call(tag):
+            started.append(tag)
+            await release.wait()
+            return tag
+
+        running = [asyncio.ensure_future(s.run('p', 'm', 'other', lambda i=i: call(f'busy{i}'))) for i in range(2)]
+        await asyncio.sleep(0.05)
+        waiting = [asyncio.ensure_future(s.run('p', 'm', purpose, lambda tag=tag: call(tag)))
+                   for purpose, tag in (('other', 'batch'), ('evaluation', 'evaluation'), ('question', 'question'))]
+        await asyncio.sleep(0.05)
+        assert started == ['busy0', 'busy1']
+
+        release.set()
+        await asyncio.gather(*running, *waiting)
+        return started
+
+    assert asyncio.run(main()) == ['busy0', 'busy1', 'question', 'evaluation', 'batch']
+
+
+def test_concurrency_limit_counts_calls_in_flight():
+    async def main():
+        s = scheduler(max_concurrency=3)
+        in_flight = peak = 0
+
+        async def call():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+
+        await asyncio.gather(*[s.run('p', 'm', 'evaluation', call) for _ in range(10)])
+        return peak
+
+    assert asyncio.run(main()) == 3
+
+
+def test_queue_timeout():
+    async def main():
+        s = scheduler(max_concurrency=1, queue_timeouts={**TIMEOUTS, 'batch': 0.1})
+        release = asyncio.Event()
+
+        busy = asyncio.ensure_future(s.run('p', 'm', 'question', release.wait))
+        await asyncio.sleep(0.02)
+        started = time.monotonic()
+        with pytest.raises(LLMQueueTimeout):
+            await s.run('p', 'm', 'other', release.wait)
+        waited = time.monotonic() - started
+
+        release.set()
+        await busy
+        return waited, s.queue_depths()
+
+    waited, depths = asyncio.run(main())
+    assert 0.1 <= waited < 1
+    assert depths == {}
+
+
+def test_cancelled_waiter_frees_its_place():
+    async def main():
+        s = scheduler(max_concurrency=1)
+        release = asyncio.Event()
+
+        busy = asyncio.ensure_future(s.run('p', 'm', 'question', release.wait))
+        await asyncio.sleep(0.02)
+        waiting = asyncio.ensure_future(s.run('p', 'm', 'question', release.wait))
+        await asyncio.sleep(0.02)
+        waiting.cancel()
+        release.set()
+        await busy
+        # The slot of the cancelled call is free again
+        return await asyncio.wait_for(s.run('p', 'm', 'question', lambda: asyncio.sleep(0, 'ok')), 1)
+
+    assert asyncio.run(main()) == 'ok'
+
+
+def test_rate_limit_pauses_then_resumes_in_priority_order():
+    async def main():
+        s = scheduler(resume_interval=0.1)
+        started = time.monotonic()
+        calls = []
+
+        async def call(tag):
+            calls.append((tag, time.monotonic() - started))
+            if tag == 'first' and len(calls) == 1:
+                raise RateLimited(retry_after=0.3)
+            return tag
+
+        async def later(purpose, tag):
+            await asyncio.sleep(0.05)
+            return await s.run('p', 'm', purpose, lambda: call(tag))
+
+        results = await asyncio.gather(
+            s.run('p', 'm', 'evaluation', lambda: call('first')),
+            later('other', 'batch'), later('evaluation', 'evaluation'), later('question', 'question'),
+        )
+        return results, calls
+
+    results, calls = asyncio.run(main())
+    assert results == ['first', 'batch', 'evaluation', 'question']
+    resumed = calls[1:]
+    # By priority, one per resume interval; the retried evaluation queued before the other one
+    assert [tag for tag, _ in resumed] == ['question', 'first', 'evaluation', 'batch']
+    assert resumed[0][1] >= 0.3
+    gaps = [b - a for (_, a), (_, b) in zip(resumed, resumed[1:])]
+    assert all(gap >= 0.09 for gap in gaps)
+
+
+def test_retries_server_errors():
+    async def main():
+        s = scheduler(max_retries=2)
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ServerError()
+            return 'ok'
+
+        return await s.run('p', 'm', 'question', call), len(attempts)
+
+    assert asyncio.run(main()) == ('ok', 3)
+
+
+def test_does_not_retry_client_errors():
+    async def main():
+        s = scheduler()
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            raise ValueError('bad request')
+
+        with pytest.raises(ValueError):
+            await s.run('p', 'm', 'question', call)
+        return len(attempts)
+
+    assert asyncio.run(main()) == 1
+
+
+def test_retry_not_past_the_queue_timeout():
+    async def main():
+        s = scheduler(queue_timeouts={**TIMEOUTS, 'interactive': 0.5})
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            raise RateLimited(retry_after=1)
+
+        started = time.monotonic()
+        with pytest.raises(RateLimited):
+            await s.run('p', 'm', 'question', call)
+        return len(attempts), time.monotonic() - started
+
+    attempts, waited = asyncio.run(main())
+    # The deadline counts from the first attempt: a retry after 1 s is not worth making
+    assert attempts == 1
+    assert waited < 0.5
+
+
+def test_sdk_rate_limit_reaches_the_scheduler_once_per_attempt():
+    groq = pytest.importorskip('groq')
+    httpx = pytest.importorskip('httpx')
+    requests = []
+
+    def answer(request):
+        requests.append(request)
+        return httpx.Response(429, headers={'retry-after': '0'}, json={'error': {'message': 'rate limited'}})
+
+    async def main():
+        # Created like the lightweight backend's client (utils/ext_api.py)
+        client = groq.AsyncGroq(api_key='test', max_retries=0,
+                                http_client=httpx.AsyncClient(transport=httpx.MockTransport(answer)))
+        s = scheduler(max_retries=2, resume_interval=0.01)
+        attempts = []
+
+        async def call():
+            attempts.append(len(requests))
+            return await client.chat.completions.create(model='m', messages=[{'role': 'user', 'content': 'q'}])
+
+        with pytest.raises(groq.RateLimitError):
+            await s.run('groq', 'm', 'question', call)
+        await client.close()
+        return attempts
+
+    # One request per scheduler attempt: the SDK does not retry the 429 itself
+    assert asyncio.run(main()) == [0, 1, 2]
+    assert len(requests) == 3
@@ -0,0 +1,68 @@
+import logging
+import logging.handlers
+import time
+
+import pytest
+
+from interview_core.logging_setup import RateLimitedLog, flush_rate_limited_logs
+
+
+@pytest.fixture
+def records():
+    logger = logging.getLogger('test_rate_limited_log')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    handler = logging.handlers.BufferingHandler(1000)
+    logger.addHandler(handler)
+    yield logger, handler.buffer
+    logger.removeHandler(handler)
+
+
+def test_log_reports_suppressed_records(records):
+    logger, buffer = records
+    log = RateLimitedLog(logger, interval=0.1, session_id='s')
+
+    for frame_id in range(5):
+        log.log(logging.WARNING, 'invalid', "Invalid frame %s", frame_id)
+    assert [record.getMessage() for record in buffer] == ['Invalid frame 0']
+
+    time.sleep(0.1)
+    log.log(logging.WARNING, 'invalid', "Invalid frame %s", 5)
+    assert buffer[-1].getMessage() == 'Invalid frame 5'
+    assert buffer[-1].suppressed == 4
+    assert buffer[-1].session_id == 's'
+
+
+def test_pending_records_are_flushed_once_the_interval_is_over(records):
+    logger, buffer = records
+    log = RateLimitedLog(logger, interval=0.1)
+
+    for frame_id in range(4):
+        log.log(logging.WARNING, 'invalid', "Invalid frame %s", frame_id)
+    for _ in range(7):
+        log.count('no_face', "{count} frames with no face in the last {interval} s")
+
+    flush_rate_limited_logs(expired_only=True)
+    assert len(buffer) == 1
+
+    time.sleep(0.1)
+    flush_rate_limited_logs(expired_only=True)
+    messages = [record.getMessage() for record in buffer]
+    # The last suppressed record, with the number of the others
+    assert messages[1:] == ['7 frames with no face in the last 0 s', 'Invalid frame 3']
+    assert buffer[2].suppressed == 2
+
+    # Nothing left to report
+    log.flush()
+    assert len(buffer) == 3
+
+
+def test_background_flusher(records):
+    logger, buffer = records
+    log = RateLimitedLog(logger, interval=0.05)
+
+    log.count('no_face', "{count} frames with no face")
+    deadline = time.monotonic() + 3
+    while not buffer and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert [record.getMessage() for record in buffer] == ['1 frames with no face']
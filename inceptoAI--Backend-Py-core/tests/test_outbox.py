@@ -0,0 +1,163 @@
+import json
+import os
+
+import pytest
+
+from interview_core import outbox as outbox_module
+from interview_core.outbox import ResultOutbox
+
+URL = 'http://express.test/api/complete'
+
+
+class Response:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body
+        self.text = json.dumps(body) if body is not None else ''
+
+    def json(self):
+        return self._body
+
+
+class Express:
+    """Fake Express backend: answers batches with `batch` and single reports with `single`."""
+
+    def __init__(self, batch=None, single=None):
+        self.batch = batch
+        self.single = single or (lambda key: 201)
+        self.requests = []
+
+    def post(self, url, data, headers, timeout):
+        body = json.loads(data)
+        if url.endswith('/batch'):
+            keys = [item['idempotency_key'] for item in body['results']]
+            self.requests.append(('batch', keys))
+            return self.batch(keys)
+        key = headers['Idempotency-Key']
+        self.requests.append(('single', key))
+        return Response(self.single(key))
+
+
+def batch_statuses(statuses):
+    def answer(keys):
+        return Response(200, {'results': [{'idempotency_key': key, 'status': statuses.get(key, 201)}
+                                          for key in keys]})
+    return answer
+
+
+@pytest.fixture
+def express(monkeypatch):
+    def install(**kwargs):
+        server = Express(**kwargs)
+        monkeypatch.setattr(outbox_module, 'http_client', server)
+        return server
+    return install
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return ResultOutbox(directory=str(tmp_path), batch_size=10, backoff=60, backoff_max=60)
+
+
+def deliver_due(outbox):
+    with outbox._condition:
+        due = outbox._next_due()
+    outbox._deliver(due)
+
+
+def enqueue(outbox, count):
+    for i in range(count):
+        outbox.enqueue(URL, {'report': i}, f's{i}')
+
+
+def test_delivers_due_reports_in_one_batch(outbox, express):
+    server = express(batch=batch_statuses({}))
+    enqueue(outbox, 3)
+
+    deliver_due(outbox)
+
+    assert server.requests == [('batch', ['s0', 's1', 's2'])]
+    assert len(outbox) == 0
+    assert not [name for name in os.listdir(outbox.directory) if name.endswith('.json')]
+
+
+def test_settles_each_report_of_a_batch_by_its_own_status(outbox, express):
+    express(batch=batch_statuses({'s1': 503, 's2': 400}))
+    enqueue(outbox, 3)
+
+    deliver_due(outbox)
+
+    assert set(outbox._entries) == {'s1'}
+    assert outbox._entries['s1']['attempts'] == 1
+    assert os.listdir(outbox.dead_directory) == ['s2.json']
+
+
+def test_splits_a_batch_that_is_too_large(outbox, express):
+    def answer(keys):
+        return Response(413) if len(keys) > 2 else batch_statuses({})(keys)
+
+    server = express(batch=answer)
+    enqueue(outbox, 5)
+
+    deliver_due(outbox)
+
+    assert server.requests == [
+        ('batch', ['s0', 's1', 's2', 's3', 's4']),
+        ('batch', ['s0', 's1']),
+        ('batch', ['s2', 's3', 's4']),
+        ('single', 's2'),
+        ('batch', ['s3', 's4']),
+    ]
+    assert len(outbox) == 0
+
+
+def test_sends_one_by_one_without_batch_endpoint(outbox, express):
+    server = express(batch=lambda keys: Response(404), single=lambda key: 400 if key == 's1' else 201)
+    enqueue(outbox, 3)
+
+    deliver_due(outbox)
+    enqueue(outbox, 2)
+    deliver_due(outbox)
+
+    # The batch endpoint is only tried once
+    assert [kind for kind, _ in server.requests] == ['batch', 'single', 'single', 'single', 'single', 'single']
+    assert len(outbox) == 0
+    assert os.listdir(outbox.dead_directory) == ['s1.json']
+
+
+def test_other_batch_refusal_falls_back_to_single_sends(outbox, express):
+    server = express(batch=lambda keys: Response(400), single=lambda key: 201)
+    enqueue(outbox, 2)
+
+    deliver_due(outbox)
+
+    assert server.requests == [('batch', ['s0', 's1']), ('single', 's0'), ('single', 's1')]
+    assert len(outbox) == 0
+    assert not os.path.exists(outbox.dead_directory) or not os.listdir(outbox.dead_directory)
+
+
+def test_retries_a_whole_batch_on_retryable_status(outbox, express):
+    express(batch=lambda keys: Response(503, headers={'Retry-After': '120'}))
+    enqueue(outbox, 2)
+
+    deliver_due(outbox)
+
+    assert {key: entry['attempts'] for key, entry in outbox._entries.items()} == {'s0': 1, 's1': 1}
+    # Not due again before Retry-After
+    with outbox._condition:
+        assert outbox._next_due() == []
+
+
+def test_pending_reports_survive_a_restart(tmp_path, express):
+    first = ResultOutbox(directory=str(tmp_path))
+    enqueue(first, 2)
+
+    server = express(batch=batch_statuses({}))
+    second = ResultOutbox(directory=str(tmp_path))
+    with second._condition:
+        second._load()
+    deliver_due(second)
+
+    assert server.requests == [('batch', ['s0', 's1'])]
+    assert len(second) == 0
@@ -0,0 +1,18 @@
+import pytest
+
+from interview_core import settings
+
+
+def test_configure_sets_the_backend_values(monkeypatch):
+    monkeypatch.setattr(settings, 'EMOTION_ANALYZER', settings.EMOTION_ANALYZER)
+
+    settings.configure(EMOTION_ANALYZER='deepface')
+
+    assert settings.EMOTION_ANALYZER == 'deepface'
+
+
+def test_configure_rejects_unknown_settings():
+    with pytest.raises(TypeError):
+        settings.configure(EMOTION_ANALYSER='deepface')
+    with pytest.raises(TypeError):
+        settings.configure(configure=None)
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import pytest
+
+from interview_core.single_flight import SingleFlight, prompt_key
+
+
+def test_prompt_key():
+    assert prompt_key('Ask  a\n question', 'groq', 'm') == prompt_key(' Ask a question ', 'groq', 'm')
+    assert prompt_key('Ask a question', 'groq', 'm') != prompt_key('Ask a question', 'groq', 'other')
+    # One variant: every session shares the call
+    assert len({prompt_key('q', session_id=f's{i}', variants=1) for i in range(20)}) == 1
+    assert len({prompt_key('q', session_id=f's{i}', variants=4) for i in range(50)}) == 4
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'question'
+
+    async def main():
+        flight = SingleFlight(enabled=True)
+        results = await asyncio.gather(*[flight.run('key', call) for _ in range(20)])
+        return results, len(flight)
+
+    results, in_flight = asyncio.run(main())
+    assert results == ['question'] * 20
+    assert len(calls) == 1
+    assert in_flight == 0
+
+
+def test_shared_across_event_loops():
+    flight = SingleFlight(enabled=True)
+    calls = []
+    results = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return 'question'
+
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(flight.run('key', call))))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['question'] * 5
+    assert len(calls) == 1
+
+
+def test_error_reaches_every_caller():
+    async def call():
+        await asyncio.sleep(0.02)
+        raise ValueError('failed')
+
+    async def main():
+        flight = SingleFlight(enabled=True)
+        return await asyncio.gather(*[flight.run('key', call) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_leader_hands_the_call_over():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'question'
+
+    async def main():
+        flight = SingleFlight(enabled=True)
+        leader = asyncio.ensure_future(flight.run('key', call))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.run('key', call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == 'question'
+    assert len(calls) == 2
+
+
+def test_disabled():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def main():
+        flight = SingleFlight(enabled=False)
+        await asyncio.gather(*[flight.run('key', call) for _ in range(3)])
+
+    asyncio.run(main())
+    assert len(calls) == 3
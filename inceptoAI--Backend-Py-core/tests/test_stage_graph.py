@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from interview_core.stage_graph import Stage, run_stage_graph
+
+
+def test_results_flow_to_dependent_stages():
+    async def double(x):
+        return x * 2
+
+    stages = [
+        Stage('a', lambda: 2, kind='inline'),
+        Stage('b', lambda a: a + 1, requires=['a'], kind='thread'),
+        Stage('c', double, requires=['a'], kind='async'),
+        Stage('sum', lambda b, c: b + c, requires=['b', 'c'], kind='inline'),
+    ]
+    results, timings = asyncio.run(run_stage_graph(stages))
+
+    assert results == {'a': 2, 'b': 3, 'c': 4, 'sum': 7}
+    assert {name: timing['status'] for name, timing in timings.items()} == dict.fromkeys(results, 'ok')
+
+
+def test_independent_stages_overlap():
+    stages = [Stage(f'answer:{i}', lambda: time.sleep(0.2), kind='thread') for i in range(4)]
+
+    started = time.perf_counter()
+    asyncio.run(run_stage_graph(stages))
+    assert time.perf_counter() - started < 0.6
+
+
+def test_failed_stage_uses_its_fallback():
+    def fail():
+        raise RuntimeError('boom')
+
+    stages = [
+        Stage('a', fail, kind='inline', fallback=lambda: 'fallback'),
+        Stage('b', lambda a: f'{a}+b', requires=['a'], kind='inline'),
+    ]
+    results, timings = asyncio.run(run_stage_graph(stages))
+
+    assert results == {'a': 'fallback', 'b': 'fallback+b'}
+    assert timings['a']['status'] == 'failed'
+
+
+def test_timed_out_stage_uses_its_fallback():
+    async def slow():
+        await asyncio.sleep(5)
+
+    stages = [Stage('slow', slow, kind='async', timeout=0.05, fallback=lambda: 'fallback')]
+
+    started = time.perf_counter()
+    results, timings = asyncio.run(run_stage_graph(stages))
+    assert time.perf_counter() - started < 1
+    assert results == {'slow': 'fallback'}
+    assert timings['slow']['status'] == 'timeout'
+
+
+def test_failing_fallback_gives_none():
+    def fail():
+        raise RuntimeError('boom')
+
+    stages = [
+        Stage('a', fail, kind='inline', fallback=fail),
+        Stage('b', lambda a: a, requires=['a'], kind='inline'),
+    ]
+    results, _ = asyncio.run(run_stage_graph(stages))
+
+    assert results == {'a': None, 'b': None}
+
+
+def test_rejects_invalid_graphs():
+    with pytest.raises(ValueError):
+        Stage('a', lambda: None, kind='process')
+    with pytest.raises(ValueError):
+        asyncio.run(run_stage_graph([Stage('a', lambda: 1, kind='inline'), Stage('a', lambda: 2, kind='inline')]))
+    with pytest.raises(ValueError):
+        asyncio.run(run_stage_graph([Stage('b', lambda a: a, requires=['a'], kind='inline')]))
@@ -1,7 +1,6 @@
 # models/question_generator.py
 import json
 import os
-from tenacity import retry, stop_after_attempt, wait_exponential
 import logging
 
 from utils.ext_api import Ext_Api
@@ -13,9 +12,15 @@ class QuestionGenerator:
         self.logger = logging.getLogger(__name__)
              
    
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    async def generate_questions(self, role: str, company: str, question_number: int = 1, questions:dict={}) -> str:
-        """Generate role-specific interview questions using Groq."""
+    async def generate_questions(self, role: str, company: str, question_number: int = 1, questions:dict={}, session_id: str = None) -> str:
+        """
+        Generate role-specific interview questions using Groq.
+        
+        Sessions asking for the same question at the same time share one
+        call, spread over LLM_COALESCE_VARIANTS calls by session_id. Rate
+        limits and transient errors are handled by the LLM scheduler, which
+        serves question generation before evaluations.
+        """
 
         interview_prompt = f"""
         You are an experienced technical interviewer at {company} conducting an interview for a {role} position.
@@ -29,7 +34,7 @@ class QuestionGenerator:
         
         try:
             # question= Ext_Api.groq_api(interview_prompt)
-            question = await self.ext_api.groq_api(interview_prompt)
+            question = await self.ext_api.groq_api(interview_prompt, purpose="question", session_id=session_id)
               
             return question
             
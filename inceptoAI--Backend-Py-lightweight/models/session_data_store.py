@@ -1,16 +1,26 @@
-import os
-import json
-import cv2
 import time
 import logging
-import threading
-import queue
-import numpy as np
 from datetime import datetime
-from datetime import datetime
-import gc  # For garbage collection
+from functools import partial
+
+from interview_core.analyzers import create_analyzer
+from interview_core.session_snapshot import SessionSnapshot
+from interview_core.analyzers.warmup import model_warmup
+from interview_core.metrics import (
+    FRAME_QUEUE_DEPTH, FRAME_STAGE_SECONDS, FRAMES_DROPPED, FRAMES_FAILED, FRAMES_NO_FACE, FRAMES_PROCESSED,
+    FRAMES_RECEIVED
+)
+from interview_core.tracing import StageTimer
+from interview_core.offload import cpu_slots, os_queue, os_threading
+from interview_core.logging_setup import RateLimitedLog
 
-from .emotional_analysis import LightweightEmotionDetector 
+# Per-stage latency histograms, bound once for the frame hot path
+STAGE_SECONDS = {
+    stage: FRAME_STAGE_SECONDS.labels(stage=stage) for stage in ('decode', 'detect', 'classify', 'record')
+}
+# Trace span names that differ from the stage name
+STAGE_SPANS = {'decode': 'jpeg_decode'}
+FRAMES_QUEUE_FULL = FRAMES_DROPPED.labels(reason='queue_full')
 
 def check_logging_config():
     """Print current logging configuration to diagnose issues."""
@@ -38,8 +48,11 @@ class SessionDataStore:
         
         self.session_id = session_id
         self.logger = logging.getLogger('session_data_store')
+        # Per-frame messages go through here so they cannot flood the console
+        self.frame_log = RateLimitedLog(self.logger, session_id=session_id)
         
-        self.emotion_detector = LightweightEmotionDetector()
+        # Frame analyzer selected by config.EMOTION_ANALYZER
+        self.analyzer = create_analyzer()
         
         # Initialize session data structure
         self.session_data = {
@@ -66,12 +79,31 @@ class SessionDataStore:
             }
         }
         
+        # Readers get the latest published snapshot and never lock; writers
+        # change session_data under _write_lock and publish (see SessionSnapshot)
+        self._write_lock = os_threading.Lock()
+        self._snapshot = SessionSnapshot(self.session_data)
+        
         # Initialize frame processing components for emotion analysis
         self.is_running = False
-        self.frame_queue = queue.Queue()
+        self.frame_queue = os_queue.Queue(maxsize=config.FRAME_QUEUE_MAXSIZE)
         self.analysis_thread = None
 
     
+    # ========== Snapshots ==========
+    
+    def snapshot(self):
+        """The latest published SessionSnapshot of this session."""
+        return self._snapshot
+    
+    def _publish(self):
+        """Publish the current session_data as a new snapshot. Callers hold _write_lock."""
+        self._snapshot = SessionSnapshot(self.session_data, self._snapshot.version + 1)
+    
+    def _set_response(self, question_key, response):
+        """Copy-on-write update of one response. Callers hold _write_lock."""
+        self.session_data['responses'] = {**self.session_data['responses'], question_key: response}
+    
     # ========== Question-Answer Methods ==========
     
     def save_response(self, data, client_id=None):
@@ -90,27 +122,31 @@ class SessionDataStore:
             timestamp = data.get('timestamp', datetime.now().isoformat())
             self.logger.info(f"Saving response for question {question_number}: {answer}")
             
-            # Check if we already have an entry for this question
             question_key = str(question_number)
-            existing_data = self.session_data['responses'].get(question_key, {})
-            
-            # Get video analysis data from the data parameter or existing data
-            video_analysis = data.get('videoAnalysis') or data.get('video_analysis') or existing_data.get('video_analysis', {})
+            posted_video_analysis = data.get('videoAnalysis') or data.get('video_analysis')
             
-            # Format the data, including any video_analysis we found
-            formatted_data = {
-                'question_number': question_number,
-                'question_text': question_text,
-                'answer': answer,
-                'timestamp': timestamp,
-                'server_received_at': datetime.now().isoformat(),
-                'speech_analysis': data.get('speechAnalysis') or data.get('speech_analysis', {}),
-                'video_analysis': video_analysis,
-            }
-            
-            # Add to session data
-            self.session_data['responses'][question_key] = formatted_data
-            self.session_data['updated_at'] = datetime.now().isoformat()
+            # Add to session data. The existing entry is read under the lock, so
+            # a concurrent update of this question's video analysis is not lost
+            with self._write_lock:
+                # Check if we already have an entry for this question
+                existing_data = self.session_data['responses'].get(question_key, {})
+                
+                # Get video analysis data from the data parameter or existing data
+                video_analysis = posted_video_analysis or existing_data.get('video_analysis') or {}
+                
+                # Format the data, including any video_analysis we found
+                formatted_data = {
+                    'question_number': question_number,
+                    'question_text': question_text,
+                    'answer': answer,
+                    'timestamp': timestamp,
+                    'server_received_at': datetime.now().isoformat(),
+                    'speech_analysis': data.get('speechAnalysis') or data.get('speech_analysis', {}),
+                    'video_analysis': video_analysis,
+                }
+                self._set_response(question_key, formatted_data)
+                self.session_data['updated_at'] = datetime.now().isoformat()
+                self._publish()
             
             return {
                 'status': 'success',
@@ -129,25 +165,28 @@ class SessionDataStore:
         """Update the video analysis data for a specific question."""
         try:
             question_key = str(question_number)
-            if question_key not in self.session_data['responses']:
-                self.logger.warning(f"Question {question_number} not found for video analysis update")
-                # Get question text from data if available
-                question_text = data.get('question_text') or data.get('questionText', f"Question {question_number}")
-                
-                # Create a placeholder entry if question doesn't exist yet
-                self.session_data['responses'][question_key] = {
-                    'question_number': question_number,
-                    'question_text': question_text,  # Use the provided question text
-                    'answer': '',
-                    'timestamp': datetime.now().isoformat(),
-                    'server_received_at': datetime.now().isoformat(),
-                    'speech_analysis': {},
-                    'video_analysis': {},
-                    "aisui":{}
-                }
+            with self._write_lock:
+                response = self.session_data['responses'].get(question_key)
+                if response is None:
+                    self.logger.warning(f"Question {question_number} not found for video analysis update")
+                    # Get question text from data if available
+                    question_text = data.get('question_text') or data.get('questionText', f"Question {question_number}")
                     
-            # Update the video analysis data
-            self.session_data['responses'][question_key]['video_analysis'] = video_analysis_data
+                    # Create a placeholder entry if question doesn't exist yet
+                    response = {
+                        'question_number': question_number,
+                        'question_text': question_text,  # Use the provided question text
+                        'answer': '',
+                        'timestamp': datetime.now().isoformat(),
+                        'server_received_at': datetime.now().isoformat(),
+                        'speech_analysis': {},
+                        'video_analysis': {},
+                        "aisui":{}
+                    }
+                        
+                # Update the video analysis data
+                self._set_response(question_key, {**response, 'video_analysis': video_analysis_data})
+                self._publish()
             self.logger.info(video_analysis_data)
             
             # Save to file if requested
@@ -170,23 +209,20 @@ class SessionDataStore:
     def get_responses(self):
         """Get all responses from this session."""
         try:
-            # Convert the responses dict to a sorted list
-            responses_list = []
-            for q_num, response in self.session_data['responses'].items():
-                responses_list.append(response)
-            
-            # Sort by question number
-            responses_list.sort(key=lambda x: int(x.get('question_number', 0)))
+            snapshot = self.snapshot()
+            # Responses as a list sorted by question number
+            responses_list = snapshot.responses_list()
             
             return {
                 'status': 'success',
                 'count': len(responses_list),
                 'responses': responses_list,
-                'emotion_analysis': self.session_data.get('emotion_analysis', {}),
-                'speech_analyses': self.session_data.get('speech_analyses', []),
+                'emotion_analysis': snapshot.emotion_analysis(),
+                'speech_analyses': snapshot.speech_analyses,
                 'session_id': self.session_id,
-                'created_at': self.session_data.get('created_at'),
-                'updated_at': self.session_data.get('updated_at')
+                'created_at': snapshot.created_at,
+                'updated_at': snapshot.updated_at,
+                'version': snapshot.version
             }
             
         except Exception as e:
@@ -200,16 +236,14 @@ class SessionDataStore:
     def get_all_questions(self):
         """Get all questions that have been asked in this session."""
         try:
-            questions = []
-            
-            for q_num, response in self.session_data['responses'].items():
-                questions.append({
+            # Sorted by question number
+            questions = [
+                {
                     'question_number': response.get('question_number'),
                     'question_text': response.get('question_text')
-                })
-            
-            # Sort by question number
-            questions.sort(key=lambda x: int(x.get('question_number', 0)))
+                }
+                for response in self.snapshot().responses_list()
+            ]
             
             return {
                 'status': 'success',
@@ -223,6 +257,26 @@ class SessionDataStore:
                 'status': 'error',
                 'message': error_msg
             }
+
+    def set_answer_evaluation(self, question_key, evaluation, fingerprint):
+        """
+        Store the background LLM evaluation of an answer on its response.
+        
+        Args:
+            question_key: Key of the response (its question number as a string)
+            evaluation: The evaluate_answer() result
+            fingerprint: answer_fingerprint() of the response it was computed from
+                (see interview_core/answer_evaluations.py)
+        """
+        with self._write_lock:
+            response = self.session_data['responses'].get(question_key)
+            if response is None:
+                return
+            self._set_response(question_key, {
+                **response, 'evaluation': evaluation, 'evaluation_fingerprint': fingerprint
+            })
+            self._publish()
+    
     # ========== Speech Analysis Methods ==========
     
     def save_speech_analysis(self, analysis_data, client_id=None):
@@ -239,30 +293,34 @@ class SessionDataStore:
             if client_id:
                 analysis_data['client_id'] = client_id
                 
-            # Add unique ID for this analysis
-            analysis_id = f"speech_{len(self.session_data['speech_analyses']) + 1}"
-            analysis_data['analysis_id'] = analysis_id
-            
-            # Add to session data
-            self.session_data['speech_analyses'].append(analysis_data)
-            
-            # If the speech analysis is for a specific question, also update that question's data
-            question_number = analysis_data.get('questionNumber') or analysis_data.get('question_number')
-            if question_number:
-                question_key = str(question_number)
-                if question_key in self.session_data['responses']:
-                    self.session_data['responses'][question_key]['speech_analysis'] = analysis_data
-                else:
-                    # Create a placeholder entry for this question
-                    self.session_data['responses'][question_key] = {
-                        'question_number': question_number,
-                        'question_text': f"Question {question_number}",
-                        'answer': '',
-                        'timestamp': datetime.now().isoformat(),
-                        'server_received_at': datetime.now().isoformat(),
-                        'speech_analysis': analysis_data,
-                        'video_analysis': {}
-                    }
+            with self._write_lock:
+                # Add unique ID for this analysis
+                analysis_id = f"speech_{len(self.session_data['speech_analyses']) + 1}"
+                analysis_data['analysis_id'] = analysis_id
+                
+                # Add to session data
+                self.session_data['speech_analyses'] = [*self.session_data['speech_analyses'], analysis_data]
+                
+                # If the speech analysis is for a specific question, also update that question's data
+                question_number = analysis_data.get('questionNumber') or analysis_data.get('question_number')
+                if question_number:
+                    question_key = str(question_number)
+                    response = self.session_data['responses'].get(question_key)
+                    if response is not None:
+                        response = {**response, 'speech_analysis': analysis_data}
+                    else:
+                        # Create a placeholder entry for this question
+                        response = {
+                            'question_number': question_number,
+                            'question_text': f"Question {question_number}",
+                            'answer': '',
+                            'timestamp': datetime.now().isoformat(),
+                            'server_received_at': datetime.now().isoformat(),
+                            'speech_analysis': analysis_data,
+                            'video_analysis': {}
+                        }
+                    self._set_response(question_key, response)
+                self._publish()
             
             self.logger.info(f"Saved speech analysis with ID {analysis_id}")
             
@@ -284,7 +342,8 @@ class SessionDataStore:
     
     def _analysis_worker(self):
         """
-        Worker function that runs in a background thread to process video frames.
+        Worker function that runs in a background OS thread to process video frames
+        (never on the eventlet hub, see interview_core.offload).
         This continuously pulls frames from the queue and processes them for emotion analysis.
         """
         self.logger.info("Analysis worker thread started")
@@ -294,10 +353,12 @@ class SessionDataStore:
             try:
                 # Attempt to get a frame from the queue with a timeout
                 try:
-                    frame_data, frame_id, question_number = self.frame_queue.get(timeout=1.0)
+                    frame_data, frame_id, question_number, trace = self.frame_queue.get(timeout=1.0)
                     
                     # Process the frame
-                    self._process_frame(frame_data, frame_id, question_number)
+                    if trace is not None:
+                        trace.mark_dequeued()
+                    self._process_frame(frame_data, frame_id, question_number, trace)
                     
                     # Mark the task as done
                     self.frame_queue.task_done()
@@ -306,7 +367,7 @@ class SessionDataStore:
                     if int(frame_id) % 100 == 0:
                         self.update_emotion_average_results()
                         
-                except queue.Empty:
+                except os_queue.Empty:
                     # No frames in the queue, just continue the loop
                     continue
                     
@@ -335,11 +396,11 @@ class SessionDataStore:
             try:
                 self.frame_queue.get_nowait()
                 self.frame_queue.task_done()
-            except queue.Empty:
+            except os_queue.Empty:
                 break
         
         # Create and start the thread
-        self.analysis_thread = threading.Thread(target=self._analysis_worker)
+        self.analysis_thread = os_threading.Thread(target=self._analysis_worker)
         self.analysis_thread.daemon = True
         self.analysis_thread.start()
         
@@ -365,6 +426,7 @@ class SessionDataStore:
         self.update_emotion_average_results()
         self.save_video_analysis_by_question()
         
+        self.frame_log.flush()
         self.logger.info("Emotion analysis stopped")
         
         return {
@@ -372,9 +434,24 @@ class SessionDataStore:
             "message": "Emotion analysis stopped and final results saved"
         }
     
-    def add_frame(self, frame_data, frame_id, question_number=0):
-        """Add a video frame to the processing queue."""
-        self.frame_queue.put((frame_data, frame_id, question_number))
+    def add_frame(self, frame_data, frame_id, question_number=0, trace=None):
+        """Add a video frame to the processing queue, with its trace if it is sampled."""
+        FRAMES_RECEIVED.inc()
+        FRAME_QUEUE_DEPTH.observe(self.frame_queue.qsize())
+        if trace is not None:
+            trace.mark_enqueued()
+        try:
+            self.frame_queue.put_nowait((frame_data, frame_id, question_number, trace))
+        except os_queue.Full:
+            # Never block the socket handler; drop the frame instead
+            FRAMES_QUEUE_FULL.inc()
+            if trace is not None:
+                trace.finish('dropped')
+            return {
+                "status": "error",
+                "message": "Frame dropped: analysis queue is full",
+                "frame_id": frame_id
+            }
         
         # Log periodically to avoid flooding
         if int(frame_id) % 100 == 0:
@@ -385,99 +462,60 @@ class SessionDataStore:
             "frame_id": frame_id
         }
     
-    def _process_frame(self, frame_data, frame_id, question_number):
+    def _process_frame(self, frame_data, frame_id, question_number, trace=None):
         """Memory-optimized frame processing"""
+        outcome = 'failed'
+        stage = partial(self._stage, trace=trace)
         try:
-            # Convert bytes to image
-            if isinstance(frame_data, bytes):
-                nparr = np.frombuffer(frame_data, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            else:
-                frame = frame_data
+            with cpu_slots:
+                analysis = self.analyzer.analyze_frame(frame_data, stage)
+            if not model_warmup.warm:
+                model_warmup.mark_warm()
                 
-            if frame is None or frame.size == 0:
-                self.logger.warning(f"Invalid frame: {frame_id}")
+            if analysis is None:
+                self.frame_log.log(logging.WARNING, 'invalid_frame', "Invalid frame: %s", frame_id)
+                FRAMES_FAILED.inc()
                 return
             
-            # Resize frame if too large
-            height, width = frame.shape[:2]
-            if width > 640:
-                scale = 640 / width
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                frame = cv2.resize(frame, (new_width, new_height))
-            
-            # Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Release original frame
-            del frame
-            
-            # Enhance contrast for better detection
-            gray = cv2.equalizeHist(gray)
-            
-            # RELAXED detection parameters
-            faces = self.emotion_detector.face_cascade.detectMultiScale(
-                gray, 
-                scaleFactor=1.05,     # Very sensitive
-                minNeighbors=2,       # Low threshold
-                minSize=(20, 20),     # Small faces OK
-                flags=cv2.CASCADE_SCALE_IMAGE
-            )
-            
-            if len(faces) == 0:
-                # Try even more relaxed parameters as fallback
-                faces = self.emotion_detector.face_cascade.detectMultiScale(
-                    gray,
-                    scaleFactor=1.1,
-                    minNeighbors=1,
-                    minSize=(15, 15)
-                )
-            
-            if len(faces) == 0:
-                print(f"No faces detected in frame: {frame_id}")
-                del gray
-                gc.collect()
+            if analysis.emotions is None:
+                outcome = 'no_face'
+                FRAMES_NO_FACE.inc()
+                FRAMES_PROCESSED.inc()
+                self.frame_log.count('no_face', "{count} frames with no face in the last {interval} s")
                 return
             
-            print(f"Frame {frame_id}: Found {len(faces)} face(s)")
-            
-            # Process only the largest face
-            if len(faces) > 1:
-                faces = sorted(faces, key=lambda f: f[2] * f[3], reverse=True)
-            
-            (x, y, w, h) = faces[0]
-            face_region = gray[y:y+h, x:x+w]
-            
-            # ... rest of your code ...
-            
-            # Release gray image from memory
-            del gray
+            with stage('record'):
+                self._record_frame(frame_id, question_number, analysis.emotions, analysis.confidence)
+            FRAMES_PROCESSED.inc()
+            outcome = 'face'
             
-            # Analyze emotions
-            # ← FIX: Use self.emotion_detector
-            emotions_dict = self.emotion_detector.analyze_facial_features(face_region)
-            emotions = {emotion: float(score) for emotion, score in emotions_dict.items()}
-            
-            # Release face region from memory
-            del face_region
-            
-            # Calculate confidence
-            confidence = (
-                emotions.get('happy', 0) +
-                emotions.get('neutral', 0) * 0.5 -
-                emotions.get('fear', 0) -
-                emotions.get('sad', 0)
+            self.frame_log.log(
+                logging.DEBUG, 'frame_result', "Frame %s: Q%s, %d face(s), emotions %s, confidence %.2f",
+                frame_id, question_number, len(analysis.faces), analysis.emotions, analysis.confidence
             )
-            confidence_value = float(max(0, min(100, confidence)))
-            
-            # ← ADD: STORE THE RESULTS
-            timestamp = datetime.now().isoformat()
-            
-            # Add to detailed emotions (matching your data structure)
+                
+        except Exception as e:
+            self.frame_log.log(logging.ERROR, 'frame_error', "Error processing frame %s: %s", frame_id, e, exc_info=True)
+            FRAMES_FAILED.inc()
+        finally:
+            if trace is not None:
+                trace.finish(outcome)
+
+    def _stage(self, name, trace=None):
+        """Time one analysis stage into its latency histogram and the frame's trace."""
+        return StageTimer(STAGE_SECONDS[name], trace, STAGE_SPANS.get(name, name))
+
+    def _record_frame(self, frame_id, question_number, emotions, confidence_value):
+        """Store the analysis results of one frame in the session data."""
+        timestamp = datetime.now().isoformat()
+        emotion_analysis = self.session_data['emotion_analysis']
+        
+        # The lists are append-only, so published snapshots keep their length
+        with self._write_lock:
+            # Add to detailed emotions
             for emotion, value in emotions.items():
-                if emotion in self.session_data['emotion_analysis']['detailed_emotions']:
-                    self.session_data['emotion_analysis']['detailed_emotions'][emotion].append({
+                if emotion in emotion_analysis['detailed_emotions']:
+                    emotion_analysis['detailed_emotions'][emotion].append({
                         'value': value,
                         'question': question_number,
                         'frame_id': frame_id,
@@ -485,7 +523,7 @@ class SessionDataStore:
                     })
             
             # Add confidence signal
-            self.session_data['emotion_analysis']['confidence_signals'].append({
+            emotion_analysis['confidence_signals'].append({
                 'value': confidence_value,
                 'question': question_number,
                 'frame_id': frame_id,
@@ -493,48 +531,36 @@ class SessionDataStore:
             })
             
             # Add timestamp
-            self.session_data['emotion_analysis']['timestamps'].append({
+            emotion_analysis['timestamps'].append({
                 'frame_id': frame_id,
                 'question': question_number,
                 'timestamp': timestamp
             })
-            
-            # Debug output
-            print(f"[{frame_id}] Q{question_number} - Emotions: {emotions}, Confidence: {confidence_value:.2f}")
-            
-            # Force garbage collection every 10 frames
-            if int(frame_id) % 10 == 0:
-                gc.collect()
-                
-        except Exception as e:
-            self.logger.error(f"Error processing frame {frame_id}: {str(e)}")
-            gc.collect()
-            print(f"ERROR processing frame {frame_id}: {str(e)}")
+            self._publish()
 
     def update_emotion_analysis(self, analysis_results, save_file=True):
         """Update the emotion analysis data in the session file."""
         try:
             # Check if we're receiving average data or detailed data
             if "average_emotions" in analysis_results:
-                # Update averages directly
-                self.session_data['emotion_analysis']['average_emotions'] = analysis_results.get("average_emotions", {})
-                self.session_data['emotion_analysis']['average_confidence'] = analysis_results.get("average_confidence", 0)
-                
-                # Calculate and update average emotions
+                # Calculate average emotions
                 avg_emotions = {}
                 for emotion, values in analysis_results.get("emotions", {}).items():
                     if values:
                         avg_emotions[emotion] = sum(item["value"] for item in values) / len(values)
                     else:
                         avg_emotions[emotion] = 0
-                        
-                self.session_data['emotion_analysis']['average_emotions'] = avg_emotions
                 
-                # Calculate and update average confidence
+                # Calculate average confidence
+                avg_confidence = analysis_results.get("average_confidence", 0)
                 confidence_values = analysis_results.get("confidence_signals", [])
                 if confidence_values:
                     avg_confidence = sum(item["value"] for item in confidence_values) / len(confidence_values)
+                
+                with self._write_lock:
+                    self.session_data['emotion_analysis']['average_emotions'] = avg_emotions
                     self.session_data['emotion_analysis']['average_confidence'] = avg_confidence
+                    self._publish()
                             
             return {
                 'status': 'success',
@@ -550,34 +576,38 @@ class SessionDataStore:
             }
     
     def get_emotion_analysis(self):
-        """Get the current emotion analysis results."""
-        return self.session_data["emotion_analysis"]
+        """Get the current emotion analysis results (shared with other readers, do not modify)."""
+        return self.snapshot().emotion_analysis()
     
     def update_emotion_average_results(self):
         """Calculate and save average emotion values."""
         try:
+            emotion_analysis = self.snapshot().emotion_analysis()
+            
             # Calculate averages
             avg_emotions = {}
-            for emotion, values in self.session_data["emotion_analysis"]["detailed_emotions"].items():
+            for emotion, values in emotion_analysis["detailed_emotions"].items():
                 if values:
                     avg_emotions[emotion] = sum(item["value"] for item in values) / len(values)
                 else:
                     avg_emotions[emotion] = 0
             
             # Calculate average confidence
-            confidence_values = self.session_data["emotion_analysis"]["confidence_signals"]
+            confidence_values = emotion_analysis["confidence_signals"]
             avg_confidence = 0
             if confidence_values:
                 avg_confidence = sum(item["value"] for item in confidence_values) / len(confidence_values)
             
             # Update the session data with this average data
-            self.session_data["emotion_analysis"]["average_emotions"] = avg_emotions
-            self.session_data["emotion_analysis"]["average_confidence"] = avg_confidence
+            with self._write_lock:
+                self.session_data["emotion_analysis"]["average_emotions"] = avg_emotions
+                self.session_data["emotion_analysis"]["average_confidence"] = avg_confidence
+                self._publish()
                         
             return {
                 "emotions": avg_emotions,
                 "confidence": avg_confidence,
-                "total_frames": len(self.session_data["emotion_analysis"]["timestamps"]),
+                "total_frames": len(emotion_analysis["timestamps"]),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -588,11 +618,14 @@ class SessionDataStore:
     def save_video_analysis_by_question(self):
         """Summarize and save video analysis data by question number."""
         try:
+            snapshot = self.snapshot()
+            emotion_analysis = snapshot.emotion_analysis()
+            
             # Group frame analysis by question number
             question_analysis = {}
             
             # Process emotions
-            for emotion, frames in self.session_data["emotion_analysis"]["detailed_emotions"].items():
+            for emotion, frames in emotion_analysis["detailed_emotions"].items():
                 
                 for frame_data in frames:
                     question_num = str(frame_data["question"])
@@ -610,7 +643,7 @@ class SessionDataStore:
                     question_analysis[question_num]["frame_count"] += 1
             
             # Process confidence
-            for confidence_data in self.session_data["emotion_analysis"]["confidence_signals"]:
+            for confidence_data in emotion_analysis["confidence_signals"]:
                 question_num = str(confidence_data["question"])
                 if question_num in question_analysis:
                     if "confidence_values" not in question_analysis[question_num]:
@@ -640,7 +673,7 @@ class SessionDataStore:
                 if "confidence_values" in analysis_data and analysis_data["confidence_values"]:
                     video_analysis["average_confidence"] = sum(analysis_data["confidence_values"]) / len(analysis_data["confidence_values"])
                 
-                existing_response = self.session_data['responses'].get(question_num, {})
+                existing_response = snapshot.responses.get(question_num, {})
                 
                 data = {
                 'question_text': existing_response.get('question_text', f"Question {question_num}"),
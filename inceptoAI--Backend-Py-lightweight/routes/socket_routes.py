@@ -1,55 +1,80 @@
+import asyncio
 import base64
 import logging
 from datetime import datetime
+from functools import partial
 from flask import request
-from flask_socketio import emit
 
 import config
+from models.interview_evaluator import answer_evaluations
 from models.session_data_store import SessionDataStore
-from flask import jsonify, request, current_app
+from interview_core.metrics import FRAMES_DROPPED
+from interview_core.offload import run_blocking
+from interview_core.tracing import span, tracer
 
 logger = logging.getLogger(__name__)
 
-def register_socket_routes(socketio):
-    @socketio.on('connect')
-    def handle_connect():
-        client_id = request.sid
+# Events whose handlers start/stop a session's worker or scan its frames;
+# they run off the eventlet hub / event loop
+BLOCKING_EVENTS = {'connect', 'disconnect', 'stop_capture', 'question_answer_data'}
+
+
+class SocketHandlers:
+    """
+    Socket.IO event handlers, independent of the server they are registered on.
+
+    Every handler takes the caller's sid and the event data and returns the
+    acknowledgement. They are registered on Flask-SocketIO (eventlet mode,
+    register_socket_routes) or on python-socketio's AsyncServer (ASGI mode,
+    register_async_socket_routes).
+    """
+
+    def events(self):
+        return {
+            'connect': self.connect,
+            'disconnect': self.disconnect,
+            'frame': self.frame,
+            'stop_capture': self.stop_capture,
+            'save_speech_analysis': self.save_speech_analysis,
+            'question_answer_data': self.question_answer_data,
+        }
+
+    def connect(self, client_id, data=None):
+        # `data` is the auth payload (Flask-SocketIO) or the environ (AsyncServer), unused
         logger.info(f"Client connected: {client_id}")
-        
+
         # Create a session ID for this client
         session_id = f"{client_id}"
-        
+
         # Create a new SessionDataStore for this client
         config.session_data_stores[session_id] = SessionDataStore(client_id)
-        
+
         # Start emotion analysis
         config.session_data_stores[session_id].start_emotion_analysis()
-        
+
         # Return client_id to the client so they can use it in HTTP requests
-        # emit({'status': 'success', 
+        # emit({'status': 'success',
         #         'message': 'Connected and session data store created',
         #         'client_id': client_id
         #     },to=client_id)
 
-    @socketio.on('disconnect')
-    def handle_disconnect():
-        client_id = request.sid
+    def disconnect(self, client_id, data=None):
         logger.info(f"Client disconnected: {client_id}")
-        
+
         # Get session ID for this client
         session_id = f"{client_id}"
-        
+
         # Stop and cleanup the session data store for this client
         if session_id in config.session_data_stores:
             # Stop emotion analysis
             config.session_data_stores[session_id].stop_emotion_analysis()
             # Delete the reference to free memory
             del config.session_data_stores[session_id]
-            
+        answer_evaluations.discard(session_id)
+
         logger.info(f"Cleaned up resources for client {client_id}")
 
-    @socketio.on('frame')
-    def handle_frame(data):
+    def frame(self, client_id, data):
         """
         Handle incoming video frames.
         Expected data format: {frameId: number, frame: base64EncodedJpeg, questionNumber: number}
@@ -59,118 +84,159 @@ def register_socket_routes(socketio):
             frame_id = data.get('frameId')
             frame_data = data.get('frame')
             question_number = data.get('questionNumber', 0)  # Default to 0 if not provided
-            
+
             if not frame_data or frame_id is None:  # Allow frameId to be 0
                 logger.warning("Received frame with missing data")
+                FRAMES_DROPPED.labels(reason='missing_data').inc()
                 return {'status': 'error', 'message': 'Missing frame data'}
-            
-            client_id = request.sid
+
             session_id = f"{client_id}"
+            trace = tracer.start_trace(session_id, frame_id, question_number)
+
 
-            
             # Remove the base64 image prefix if present
             if ',' in frame_data:
                 frame_data = frame_data.split(',')[1]
-            
+
             try:
                 # Decode the base64 image
-                image_data = base64.b64decode(frame_data)
+                with span(trace, 'base64_decode'):
+                    image_data = base64.b64decode(frame_data)
             except Exception as e:
                 logger.error(f"Failed to decode base64 image: {str(e)}")
+                FRAMES_DROPPED.labels(reason='invalid_base64').inc()
+                if trace is not None:
+                    trace.finish('dropped')
                 return {'status': 'error', 'message': 'Invalid base64 image data'}
-            
+
             # Log periodically to avoid flooding the console
             if int(frame_id) % 10 == 0:
-                logger.info(f"Processing frame {frame_id} for client {client_id}")
-                
-            
-            
+                logger.debug(f"Processing frame {frame_id} for client {client_id}")
+
+
+
             # Send the frame for emotion analysis using the session data store
             if session_id in config.session_data_stores:
-                result = config.session_data_stores[session_id].add_frame(image_data, frame_id, question_number)
+                result = config.session_data_stores[session_id].add_frame(image_data, frame_id, question_number, trace)
                 return result
             else:
                 logger.warning(f"No session data store found for client {client_id}")
+                FRAMES_DROPPED.labels(reason='no_session').inc()
+                if trace is not None:
+                    trace.finish('dropped')
                 return {'status': 'error', 'message': 'Session data store not found'}
-        
+
         except Exception as e:
             logger.error(f"Error handling frame: {str(e)}")
             return {'status': 'error', 'message': str(e)}
 
-    @socketio.on('stop_capture')
-    def handle_stop_capture(data):
+    def stop_capture(self, client_id, data):
         """Handle stop capture event from client and save average results."""
-        client_id = request.sid
         session_id = f"{client_id}"
         logger.info(f"Stop capture event received from client {client_id}")
-        
+
         transcript = data.get('transcript')
-        
+
         # Save average analysis results
         emotion_results = None
         if session_id in config.session_data_stores:
+            store = config.session_data_stores[session_id]
             # Update emotion averages and save to file
-            emotion_results = config.session_data_stores[session_id].update_emotion_average_results()
+            emotion_results = store.update_emotion_average_results()
             # Update video analysis by question
-            config.session_data_stores[session_id].save_video_analysis_by_question(transcript)
-        
+            store.save_video_analysis_by_question(transcript)
+
         return {'status': 'success', 'average_results': emotion_results}
 
-    @socketio.on('save_speech_analysis')
-    def handle_save_speech_analysis(data):
+    def save_speech_analysis(self, client_id, data):
         """Handle saving speech analysis data."""
-        client_id = request.sid
         session_id = f"{client_id}"
         logger.info(f"Saving speech analysis for client {client_id}")
-        
+
         if not data:
             return {'status': 'error', 'message': 'No speech analysis data provided'}
-        
+
         # Save using the session data store
         if session_id in config.session_data_stores:
             # Include client_id in the data to maintain consistency
             if not data.get('client_id'):
                 data['client_id'] = client_id
-                
+
             result = config.session_data_stores[session_id].save_speech_analysis(data, client_id)
             return result
         else:
             return {'status': 'error', 'message': 'Session data store not found'}
-        
-    @socketio.on('question_answer_data')
-    def handle_question_answer_data(data):
+
+    def question_answer_data(self, client_id, data):
         """Handle question-answer data from client"""
         try:
-            # Get client info
-            client_id = request.sid  # Socket ID is the client ID
-            
             # Always use the socket ID for consistency with HTTP routes
             if not data.get('client_id'):
                 data['client_id'] = client_id
-                
+
             # Create session ID using the standard format
             session_id = f"{client_id}"
-            
+
             # Create or get session data store for this session
             if session_id not in config.session_data_stores:
                 config.session_data_stores[session_id] = SessionDataStore(session_id)
-            
+
             # Save the response
             store = config.session_data_stores[session_id]
             result = store.save_response(data)
-            
+            answer_evaluations.submit(session_id)
+
             # Update emotion analysis if available
             question_number = data.get('questionNumber') or data.get('question_number')
             if question_number:
                 # Update emotion averages for this question
                 store.update_emotion_average_results()
                 store.save_video_analysis_by_question(data)
-            
+
             return result
         except Exception as e:
             error_msg = f"Error processing question-answer data: {str(e)}"
-            current_app.logger.error(error_msg)
+            logger.error(error_msg)
             return {
                 'status': 'error',
                 'message': error_msg
-            }
\ No newline at end of file
+            }
+
+
+# ========== Flask-SocketIO (eventlet mode) ==========
+
+def register_socket_routes(socketio):
+    handlers = SocketHandlers()
+
+    for event, handler in handlers.events().items():
+        socketio.on_event(event, _flask_handler(handler, event in BLOCKING_EVENTS))
+
+
+def _flask_handler(handler, blocking):
+    def on_event(data=None, *args):
+        call = partial(handler, request.sid, data)
+        if blocking:
+            return run_blocking(call, name=handler.__name__)
+        return call()
+
+    on_event.__name__ = handler.__name__
+    return on_event
+
+
+# ========== python-socketio AsyncServer (ASGI mode) ==========
+
+def register_async_socket_routes(sio):
+    handlers = SocketHandlers()
+
+    for event, handler in handlers.events().items():
+        sio.on(event, _async_handler(handler, event in BLOCKING_EVENTS))
+
+
+def _async_handler(handler, blocking):
+    async def on_event(sid, data=None, *args):
+        if blocking:
+            return await asyncio.to_thread(handler, sid, data)
+        return handler(sid, data)
+
+    on_event.__name__ = handler.__name__
+    return on_event
@@ -1,3 +1,4 @@
+import atexit
 import os
 import sys
 from datetime import datetime
@@ -7,17 +8,21 @@ from flask_cors import CORS
 import logging
 
 import config
-from utils.logging_setup import setup_logging
-from utils.json_encoder import NumpyEncoder
-from utils import json_encoder
+from interview_core.logging_setup import setup_logging
+from interview_core.json_encoder import NumpyEncoder
+from interview_core import json_encoder, metrics
 from routes.http_routes import register_http_routes
 from routes.socket_routes import register_socket_routes
+from interview_core.analyzers.warmup import model_warmup
+from interview_core.http_client import close_http_clients
+from interview_core.outbox import result_outbox
 
 # Setup logging
 logger = setup_logging()
 
 
-def create_app():
+def create_flask_app():
+    """Flask app with the HTTP routes, shared by the eventlet and ASGI modes."""
     # Initialize Flask app
     app = Flask(__name__)
     CORS(app)  # Enable CORS for all routes
@@ -25,25 +30,40 @@ def create_app():
     # Set Flask to use the custom JSON encoder
     app.json_encoder = NumpyEncoder
     
-    # Initialize SocketIO with our custom JSON module
-    socketio = SocketIO(app, cors_allowed_origins="*", json=json_encoder, async_mode='eventlet')
-    app.socketio = socketio  # Store reference to socketio in app
-    
     # Create session stores
     config.session_data_stores = {}
+    metrics.track_sessions(lambda: config.session_data_stores)
     
     # Generate unique session ID based on timestamp if not already set
     if not hasattr(config, 'SESSION_ID'):
         config.SESSION_ID = datetime.now().strftime('%Y%m%d_%H%M%S')
     
+    # Load the analyzer model before the first candidate needs it
+    if config.MODEL_WARMUP:
+        model_warmup.start()
+    
+    # Deliver queued interview reports (including those left by a previous run)
+    result_outbox.start()
+    
+    # Close the pooled outbound connections when the server exits
+    atexit.register(close_http_clients)
+    
     # Register routes
     register_http_routes(app)
-    register_socket_routes(socketio)
     
-    # Add support for async routes
-    from asgiref.wsgi import WsgiToAsgi
-    asgi_app = WsgiToAsgi(app)
-    app.asgi_app = asgi_app  # Store reference to asgi_app in app
+    return app
+
+
+def create_app():
+    """Eventlet mode: Flask and Flask-SocketIO (see asgi.py for the ASGI mode)."""
+    app = create_flask_app()
+    
+    # Initialize SocketIO with our custom JSON module
+    socketio = SocketIO(app, cors_allowed_origins="*", json=json_encoder, async_mode='eventlet')
+    app.socketio = socketio  # Store reference to socketio in app
+    app.socket_server = socketio.server
+    
+    register_socket_routes(socketio)
     
     return app, socketio
 
@@ -1,15 +1,40 @@
 from decouple import config
-from groq import Groq
+
+from interview_core.http_client import async_http_client
+from interview_core.llm_scheduler import llm_scheduler
+from interview_core.metrics import observe_llm_call
+from interview_core.single_flight import llm_single_flight, prompt_key
 
 
 class Ext_Api():
     
     def __init__(self):
+        # Imported on first use so that server startup does not load the Groq SDK
+        from groq import AsyncGroq
+        
         api_key=config("API_KEY")
-        self.client = Groq(api_key=api_key)
+        # Keep-alive connections shared by all Groq calls (see async_http_client.run below).
+        # No SDK retries: the LLM scheduler retries, after pausing the model on a 429
+        self.client = AsyncGroq(api_key=api_key, http_client=async_http_client.client, max_retries=0)
         self.model = config("MODEL_NAME")
             
-    async def groq_api(self,prompt,json_mode=False):
+    async def groq_api(self,prompt,json_mode=False,purpose="other",session_id=None):
+        """
+        Call the Groq chat completions API, sharing the call with identical ones in flight.
+        
+        The call waits for its slot in the LLM scheduler (rate limits, priority
+        by purpose) and is retried there if it fails transiently.
+        
+        Args:
+            prompt: The prompt
+            json_mode: Force a JSON object response
+            purpose: Label of the call in the LLM metrics ('question', 'evaluation', ...)
+            session_id: Session the call is for, to spread identical prompts of
+                different sessions over LLM_COALESCE_VARIANTS calls
+        
+        Returns:
+            The response message content
+        """
         messages = [{"role": "user", "content": prompt}]
         
         params = {
@@ -23,17 +48,28 @@ class Ext_Api():
         if json_mode:
             params["response_format"] = {"type": "json_object"}
         
-        response = self.client.chat.completions.create(**params)
-        return response.choices[0].message.content
+        async def request():
+            with observe_llm_call("groq", purpose):
+                # On the loop the pooled connections belong to
+                response = await async_http_client.run(lambda: self.client.chat.completions.create(**params))
+            return response.choices[0].message.content
+        
+        def call():
+            return llm_scheduler.run("groq", params["model"], purpose, request)
+        
+        key = prompt_key(prompt, "groq", params["model"], params["temperature"], params["max_tokens"], json_mode,
+                         session_id=session_id)
+        return await llm_single_flight.run(key, call, purpose)
         
-    async def gemini_api(self,prompt):
+    async def gemini_api(self,prompt,purpose="other"):
         from langchain_google_genai import ChatGoogleGenerativeAI
         import asyncio
 
         self.llm = ChatGoogleGenerativeAI(model=self.model, google_api_key=api_key)
         
         loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: self.llm.invoke(prompt))
+        with observe_llm_call("gemini", purpose):
+            response = await loop.run_in_executor(None, lambda: self.llm.invoke(prompt))
         question = response.content
         
         # Cache the generated question
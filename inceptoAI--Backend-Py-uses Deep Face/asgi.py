@@ -0,0 +1,129 @@
+"""
+Native ASGI mode: one event loop serves Socket.IO and the interview flow.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+    python asgi.py
+
+- Socket.IO runs on python-socketio's AsyncServer with the handlers of
+  routes/socket_routes.py. Frames are queued on the loop; the handlers that
+  start or stop a session or scan its frames run on threads.
+- generate-question, next-question and complete_interview are coroutines on
+  the loop (routes/interview_flow.py), so the LLM calls and uploads of
+  concurrent interviews overlap instead of each holding a worker.
+- Every other route is served by the Flask app through asgiref's
+  WsgiToAsgi, off the loop.
+
+Frame analysis runs on the session workers' OS threads, as in eventlet mode
+(server.py).
+"""
+import json
+import logging
+import os
+import re
+
+import socketio
+from asgiref.wsgi import WsgiToAsgi
+
+import config
+from routes import interview_flow
+from routes.socket_routes import register_async_socket_routes
+from server import create_flask_app
+from interview_core import json_encoder
+from utils.live_metrics import LiveMetricsEmitter
+
+logger = logging.getLogger(__name__)
+
+
+class InterviewFlowApp:
+    """ASGI app serving the interview flow routes natively and everything else through `fallback`."""
+
+    # (method, path, handler); handlers take the request JSON as `data` and the path parameters
+    ROUTES = [
+        ('POST', re.compile(r'/api/generate-question'), interview_flow.generate_question),
+        ('POST', re.compile(r'/api/next-question'), interview_flow.next_question),
+        ('POST', re.compile(r'/api/complete_interview/(?P<session_id>[^/]+)'), interview_flow.complete_interview),
+    ]
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            for method, path, handler in self.ROUTES:
+                match = path.fullmatch(scope['path'])
+                if match is None:
+                    continue
+                if scope['method'] == 'OPTIONS':
+                    return await self._send(send, 204, b'', self._cors_headers(scope, preflight=True))
+                if scope['method'] != method:
+                    return await self._send_json(send, 405, {'status': 'error', 'message': 'Method not allowed'}, scope)
+
+                payload, status = await handler(data=await self._read_json(receive), **match.groupdict())
+                return await self._send_json(send, status, payload, scope)
+
+        await self.fallback(scope, receive, send)
+
+    @staticmethod
+    async def _read_json(receive):
+        """The request body as JSON, or None if it is empty or invalid (as Flask's request.json)."""
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        try:
+            return json.loads(body) if body else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _cors_headers(scope, preflight=False):
+        # Same policy as flask_cors' CORS(app): any origin
+        headers = [(b'access-control-allow-origin', b'*')]
+        if preflight:
+            headers.append((b'access-control-allow-methods', b'POST, OPTIONS'))
+            requested = dict(scope['headers']).get(b'access-control-request-headers')
+            if requested:
+                headers.append((b'access-control-allow-headers', requested))
+        return headers
+
+    async def _send_json(self, send, status, payload, scope):
+        body = json_encoder.dumps(payload).encode('utf-8')
+        headers = self._cors_headers(scope) + [(b'content-type', b'application/json')]
+        await self._send(send, status, body, headers)
+
+    @staticmethod
+    async def _send(send, status, body, headers):
+        headers = headers + [(b'content-length', str(len(body)).encode('ascii'))]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def create_asgi_app():
+    flask_app = create_flask_app()
+
+    sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*', json=json_encoder)
+    flask_app.socket_server = sio
+
+    # Push live metrics to subscribed clients instead of having them poll
+    live_metrics = LiveMetricsEmitter(sio, config.LIVE_METRICS_RATE_HZ)
+    flask_app.live_metrics = live_metrics
+
+    register_async_socket_routes(sio, live_metrics)
+
+    return socketio.ASGIApp(sio, other_asgi_app=InterviewFlowApp(WsgiToAsgi(flask_app)))
+
+
+app = create_asgi_app()
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', config.PORT if hasattr(config, 'PORT') else 5000))
+    host = config.HOST if hasattr(config, 'HOST') else '0.0.0.0'
+
+    logger.info(f"Starting combined analysis server (ASGI) on {host}:{port}")
+    logger.info(f"Session ID: {config.SESSION_ID}")
+
+    uvicorn.run(app, host=host, port=port)
@@ -1,6 +1,10 @@
 import os
 from datetime import datetime
 
+# Settings of the modules shared by both backends (interview_core/settings.py)
+from interview_core.settings import *  # noqa: F401,F403
+from interview_core import settings
+
 # Create a new session ID for this server instance
 SESSION_ID = datetime.now().strftime("%Y%m%d_%H%M%S")
 
@@ -8,6 +12,31 @@ SESSION_ID = datetime.now().strftime("%Y%m%d_%H%M%S")
 # Port for the server
 PORT = int(os.environ.get('PORT', 5000))
 
+# Live metrics pushed to subscribed socket rooms
+LIVE_METRICS_RATE_HZ = float(os.environ.get('LIVE_METRICS_RATE_HZ', 2))
+LIVE_METRICS_SMOOTHING = float(os.environ.get('LIVE_METRICS_SMOOTHING', 0.3))
+# Token letting an observer (e.g. a proctor dashboard) subscribe to the live
+# metrics of other sessions; without it clients only get their own session
+LIVE_METRICS_OBSERVER_TOKEN = os.environ.get('LIVE_METRICS_OBSERVER_TOKEN', '')
+
+# Frame analyzer used by the session stores ('haar', 'deepface' or 'onnx', see interview_core/analyzers)
+EMOTION_ANALYZER = os.environ.get('EMOTION_ANALYZER', 'deepface')
+
+# 'onnx' analyzer: exported emotion model (see interview_core/analyzers/export_onnx.py)
+ONNX_EMOTION_MODEL = os.environ.get(
+    'ONNX_EMOTION_MODEL',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'models', 'emotion.onnx')
+)
+
+# Directory of the outbox of interview reports waiting for upload
+OUTBOX_DIR = os.environ.get(
+    'OUTBOX_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'outbox')
+)
+
+# Give the shared modules this backend's values (before any of them is imported)
+settings.configure(EMOTION_ANALYZER=EMOTION_ANALYZER, ONNX_EMOTION_MODEL=ONNX_EMOTION_MODEL, OUTBOX_DIR=OUTBOX_DIR)
+
 # Dictionary to store session data stores for each client/session
 session_data_stores = {}
 
@@ -0,0 +1,217 @@
+import bisect
+from datetime import datetime
+
+import numpy as np
+
+# Emotion order used by session_data['emotion_analysis']['detailed_emotions']
+EMOTIONS = ("happy", "sad", "angry", "fear", "surprise", "neutral", "disgust")
+
+
+class EmotionFrameIndex:
+    """
+    Append-only columnar index over the frames recorded for one session.
+
+    Every recorded frame becomes one row. Rows are stored column by column
+    (frame id, time, question, confidence and one column per emotion) so
+    that range, delta and per-question queries can be answered with bisects
+    and slices instead of scanning the per-frame dicts kept in session_data.
+
+    There is a single writer (the analysis worker of the session). Columns
+    are appended first and `size` is bumped last, so readers that bound
+    themselves by `size` never see a half-written row.
+    """
+
+    def __init__(self, emotions=EMOTIONS):
+        self.emotions = tuple(emotions)
+
+        # Columns
+        self.frame_ids = []
+        self.times = []        # Epoch seconds, used for time range lookups
+        self.timestamps = []   # ISO strings, as stored in session_data
+        self.questions = []
+        self.confidence = []
+        self.values = {emotion: [] for emotion in self.emotions}
+
+        # Number of fully written rows
+        self.size = 0
+
+        # Secondary indexes
+        self._row_by_frame = {}       # frame_id -> latest row with that id
+        self._run_start = 0           # First row of the current increasing frame_id run
+        self._rows_by_question = {}   # question -> sorted list of rows
+        self._question_totals = {}    # question -> (count, confidence_sum, emotion_sums)
+
+    # ========== Writer ==========
+
+    def append(self, frame_id, question, emotions, confidence, recorded_at):
+        """Append one recorded frame. `recorded_at` is a datetime."""
+        row = self.size
+
+        if row and self._compare_frame_id(frame_id, self.frame_ids[row - 1]) < 0:
+            # Frame ids restart whenever the client starts a new capture
+            self._run_start = row
+
+        self.frame_ids.append(frame_id)
+        self.times.append(recorded_at.timestamp())
+        self.timestamps.append(recorded_at.isoformat())
+        self.questions.append(question)
+        self.confidence.append(confidence)
+        for emotion in self.emotions:
+            self.values[emotion].append(emotions.get(emotion, 0.0))
+
+        self._row_by_frame[frame_id] = row
+        self._rows_by_question.setdefault(question, []).append(row)
+
+        # Running totals are replaced, never mutated, so readers get a consistent tuple
+        count, confidence_sum, emotion_sums = self._question_totals.get(
+            question, (0, 0.0, (0.0,) * len(self.emotions))
+        )
+        self._question_totals[question] = (
+            count + 1,
+            confidence_sum + confidence,
+            tuple(total + emotions.get(emotion, 0.0) for total, emotion in zip(emotion_sums, self.emotions)),
+        )
+
+        # Publish the row
+        self.size = row + 1
+
+    # ========== Lookups ==========
+
+    @staticmethod
+    def _compare_frame_id(a, b):
+        try:
+            a, b = int(a), int(b)
+        except (TypeError, ValueError):
+            a, b = str(a), str(b)
+        return (a > b) - (a < b)
+
+    def _row_after_frame(self, frame_id, size):
+        """First row recorded after `frame_id`."""
+        row = self._row_by_frame.get(frame_id)
+        if row is None:
+            # Frames without a face are never recorded, so fall back to the
+            # position the id would have in the current run of frame ids
+            try:
+                frame_id = int(frame_id)
+            except (TypeError, ValueError):
+                return size
+            return bisect.bisect_right(self.frame_ids, frame_id, self._run_start, size)
+        return min(row + 1, size)
+
+    def rows(self, question=None, after_frame_id=None, start=None, end=None):
+        """
+        Return the rows matching all of the given filters.
+
+        Args:
+            question: Only rows recorded for this question number
+            after_frame_id: Only rows recorded after this frame id
+            start: Only rows recorded at or after this epoch time
+            end: Only rows recorded at or before this epoch time
+
+        Returns:
+            A range (no question filter) or a list of row numbers
+        """
+        size = self.size
+        lo, hi = 0, size
+
+        if after_frame_id is not None:
+            lo = max(lo, self._row_after_frame(after_frame_id, size))
+        if start is not None:
+            lo = max(lo, bisect.bisect_left(self.times, start, 0, size))
+        if end is not None:
+            hi = min(hi, bisect.bisect_right(self.times, end, 0, size))
+
+        if question is None:
+            return range(lo, max(lo, hi))
+
+        question_rows = self._rows_by_question.get(question, [])
+        first = bisect.bisect_left(question_rows, lo)
+        last = bisect.bisect_left(question_rows, hi)
+        return question_rows[first:last]
+
+    def emotion_arrays(self, size=None):
+        """Per-emotion float64 arrays over the first `size` rows (default all), for vectorized scoring."""
+        size = self.size if size is None else min(size, self.size)
+        if not size:
+            return {}
+        return {emotion: np.asarray(self.values[emotion][:size], dtype=np.float64) for emotion in self.emotions}
+
+    # ========== Output formats ==========
+
+    def _take(self, column, rows):
+        if isinstance(rows, range):
+            return column[rows.start:rows.stop]
+        return [column[row] for row in rows]
+
+    def columnar(self, rows):
+        """Return the given rows as one list per column."""
+        return {
+            'frame_id': self._take(self.frame_ids, rows),
+            'timestamp': self._take(self.timestamps, rows),
+            'question': self._take(self.questions, rows),
+            'confidence': self._take(self.confidence, rows),
+            'emotions': {emotion: self._take(self.values[emotion], rows) for emotion in self.emotions},
+        }
+
+    def detailed(self, rows):
+        """Return the given rows in the per-frame shape used by session_data."""
+        columns = self.columnar(rows)
+        keys = list(zip(columns['question'], columns['frame_id'], columns['timestamp']))
+
+        detailed_emotions = {}
+        for emotion, values in columns['emotions'].items():
+            detailed_emotions[emotion] = [
+                {'value': value, 'question': question, 'frame_id': frame_id, 'timestamp': timestamp}
+                for value, (question, frame_id, timestamp) in zip(values, keys)
+            ]
+
+        return {
+            'detailed_emotions': detailed_emotions,
+            'confidence_signals': [
+                {'value': value, 'question': question, 'frame_id': frame_id, 'timestamp': timestamp}
+                for value, (question, frame_id, timestamp) in zip(columns['confidence'], keys)
+            ],
+            'timestamps': [
+                {'frame_id': frame_id, 'question': question, 'timestamp': timestamp}
+                for question, frame_id, timestamp in keys
+            ],
+        }
+
+    def _summary(self, count, confidence_sum, emotion_sums):
+        return {
+            'frame_count': count,
+            'average_confidence': confidence_sum / count if count else 0,
+            'average_emotions': {
+                emotion: (total / count if count else 0)
+                for emotion, total in zip(self.emotions, emotion_sums)
+            },
+        }
+
+    def summaries(self, question=None):
+        """Per-question and overall averages, served from the running totals."""
+        totals = dict(self._question_totals)
+        if question is not None:
+            totals = {question: totals[question]} if question in totals else {}
+
+        count, confidence_sum = 0, 0.0
+        emotion_sums = [0.0] * len(self.emotions)
+        per_question = {}
+        for q, (q_count, q_confidence, q_emotions) in totals.items():
+            per_question[str(q)] = self._summary(q_count, q_confidence, q_emotions)
+            count += q_count
+            confidence_sum += q_confidence
+            emotion_sums = [a + b for a, b in zip(emotion_sums, q_emotions)]
+
+        overall = self._summary(count, confidence_sum, emotion_sums)
+        overall['questions'] = per_question
+        return overall
+
+
+def parse_time_param(value):
+    """Parse a time query parameter given as epoch seconds or an ISO timestamp."""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
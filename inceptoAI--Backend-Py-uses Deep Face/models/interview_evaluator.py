@@ -2,10 +2,18 @@
 import numpy as np
 from datetime import datetime
 from typing import Dict
-from langchain_google_genai import ChatGoogleGenerativeAI
-from decouple import config
 import json
 import logging
+import time
+from functools import partial
+
+import config
+
+from interview_core.answer_evaluations import AnswerEvaluations
+from interview_core.keyword_matcher import get_role_matcher
+from utils.gemini import create_gemini_llm, invoke_gemini
+from interview_core.metrics import ANSWER_EVALUATIONS, ANSWER_EVALUATIONS_PENDING
+from interview_core.stage_graph import Stage, run_stage_graph
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -15,9 +23,7 @@ class InterviewEvaluator:
     
     def __init__(self, llm=None):
         try:
-            api_key = config("GOOGLE_GEMINI_API_KEY")
-            model_name = config("GOOGLE_GEMINI_MODEL_NAME")
-            self.llm = llm or ChatGoogleGenerativeAI(model=model_name, google_api_key=api_key)
+            self.llm = llm or create_gemini_llm()
             logger.info("InterviewEvaluator initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing InterviewEvaluator: {str(e)}")
@@ -38,29 +44,34 @@ class InterviewEvaluator:
         return min(100, max(0, (positive * 0.6 + neutral * 0.4 - negative * 0.8) * 10))
 
     @staticmethod
-    def calculate_engagement_score(emotion_analysis):
+    def emotion_value_arrays(emotion_analysis):
+        """Extract the per-frame values of each emotion once, as float64 arrays"""
+        arrays = {}
+        for emotion, values in emotion_analysis.get('detailed_emotions', {}).items():
+            if values:
+                arrays[emotion] = np.fromiter(
+                    (v.get('value', 0) for v in values), dtype=np.float64, count=len(values)
+                )
+        return arrays
+
+    @classmethod
+    def calculate_engagement_score(cls, emotion_analysis, emotion_arrays=None):
         """Calculate engagement score based on emotion variations and face detection"""
         # Higher score means better engagement
         
         # Count frames with detected faces vs total frames
         timestamps = emotion_analysis.get('timestamps', [])
-        confidence_signals = emotion_analysis.get('confidence_signals', [])
         
         if not timestamps:
             return 0
         
         # Variation in emotions indicates engagement
-        emotion_values = []
-        for emotion, values in emotion_analysis.get('detailed_emotions', {}).items():
-            if values:
-                # Calculate standard deviation of each emotion
-                values_only = [v.get('value', 0) for v in values]
-                if values_only:
-                    emotion_values.extend(values_only)
+        if emotion_arrays is None:
+            emotion_arrays = cls.emotion_value_arrays(emotion_analysis)
         
         # If we have emotion values, calculate variation
-        if emotion_values:
-            variation = np.std(emotion_values) * 100
+        if emotion_arrays:
+            variation = np.std(np.concatenate(list(emotion_arrays.values()))) * 100
             return min(100, max(0, 50 + variation * 2))
         
         return 50  # Default engagement score
@@ -117,27 +128,9 @@ class InterviewEvaluator:
         if isinstance(responses, dict):
             responses = list(responses.values())
                 
-        total_length = 0
-        total_words = 0
-        total_sentences = 0
-        
-        for response in responses:
-            # Check if response is a dictionary before using .get()
-            if isinstance(response, dict):
-                answer = response.get('answer', '')
-            elif isinstance(response, str):
-                # If response is a string, use it directly as the answer
-                answer = response
-            else:
-                # For any other type, use empty string as fallback
-                answer = ''
-                
-            if answer:
-                total_length += len(answer)
-                words = answer.split()
-                total_words += len(words)
-                sentences = answer.count('.') + answer.count('!') + answer.count('?')
-                total_sentences += max(1, sentences)  # At least 1 sentence
+        # Per-answer counts, summed as integer arrays
+        stats = InterviewEvaluator._answer_stats(responses)
+        total_length, total_words, total_sentences = (int(total) for total in stats.sum(axis=0))
         
         avg_length = total_length / len(responses) if responses else 0
         avg_words = total_words / len(responses) if responses else 0
@@ -158,49 +151,166 @@ class InterviewEvaluator:
         }
 
     @staticmethod
-    def calculate_keywords_usage(responses, role):
-        """Calculate usage of role-relevant keywords"""
-        # If responses is a dictionary (with question numbers as keys), convert it to a list of values
-        if isinstance(responses, dict):
-            responses = list(responses.values())
+    def _answer_stats(responses):
+        """Characters, words and sentences of each answer as an (n, 3) int64 array"""
+        stats = np.zeros((len(responses), 3), dtype=np.int64)
+        
+        for i, response in enumerate(responses):
+            # Check if response is a dictionary before using .get()
+            if isinstance(response, dict):
+                answer = response.get('answer', '')
+            elif isinstance(response, str):
+                # If response is a string, use it directly as the answer
+                answer = response
+            else:
+                # For any other type, use empty string as fallback
+                answer = ''
+                
+            if answer:
+                sentences = answer.count('.') + answer.count('!') + answer.count('?')
+                stats[i] = (len(answer), len(answer.split()), max(1, sentences))  # At least 1 sentence
+        
+        return stats
+
+    @classmethod
+    def calculate_emotion_metrics(cls, emotion_analysis, emotion_arrays=None):
+        """Calculate all emotion metrics of one session in a single pass"""
+        return cls.calculate_emotion_metrics_batch([emotion_analysis], [emotion_arrays])[0]
+
+    @classmethod
+    def calculate_emotion_metrics_batch(cls, emotion_analyses, emotion_arrays=None):
+        """
+        Calculate the emotion metrics of many sessions at once.
+        
+        Balance and stress are computed column-wise over all sessions with the same
+        operation order as calculate_emotional_balance / calculate_stress_indicator,
+        so the results are identical to scoring each session on its own.
+        
+        Args:
+            emotion_analyses: List of session 'emotion_analysis' dicts
+            emotion_arrays: Optional list (aligned with emotion_analyses) of
+                emotion -> value array dicts, e.g. from the session frame index
             
-        # Define common keywords by role
-        role_keywords = {
-            "software engineer": ["algorithm", "code", "development", "programming", "software", "design", "solution", "testing", "debug", "optimize"],
-            "product manager": ["product", "market", "strategy", "user", "customer", "prioritize", "roadmap", "requirements", "stakeholder", "value"],
-            "data scientist": ["data", "analysis", "model", "algorithm", "statistics", "machine learning", "insight", "prediction", "visualization", "hypothesis"],
-            "designer": ["design", "user experience", "interface", "usability", "prototype", "visual", "feedback", "creative", "user-centered", "aesthetic"],
-            "marketing": ["marketing", "campaign", "brand", "customer", "audience", "strategy", "conversion", "engagement", "analytics", "content"]
-        }
+        Returns:
+            List of emotion_metrics dicts
+        """
+        if emotion_arrays is None:
+            emotion_arrays = [None] * len(emotion_analyses)
         
-        # Default keywords for any role
-        default_keywords = ["experience", "team", "project", "challenge", "success", "communicate", "learn", "improve", "goal", "collaborate"]
+        averages = [analysis.get('average_emotions', {}) for analysis in emotion_analyses]
+        columns = {
+            emotion: np.array([avg.get(emotion, 0) for avg in averages], dtype=np.float64)
+            for emotion in ('happy', 'surprise', 'sad', 'angry', 'fear', 'disgust', 'neutral')
+        }
         
-        # Get keywords for this role or use default
-        keywords = role_keywords.get(role.lower(), default_keywords)
+        positive = columns['happy'] + columns['surprise'] * 0.5
+        negative = columns['sad'] + columns['angry'] + columns['fear'] + columns['disgust']
+        balance = np.minimum(100, np.maximum(0, (positive * 0.6 + columns['neutral'] * 0.4 - negative * 0.8) * 10))
+        
+        stress = np.minimum(100, np.maximum(0, (
+            columns['fear'] * 0.4 +
+            columns['angry'] * 0.3 +
+            columns['sad'] * 0.2 +
+            columns['disgust'] * 0.1
+        ) * 100))
+        
+        return [
+            {
+                "confidence_score": analysis.get('average_confidence', 0),
+                "emotional_balance": float(balance[i]),
+                "engagement_score": cls.calculate_engagement_score(analysis, emotion_arrays[i]),
+                "stress_indicator": float(stress[i])
+            }
+            for i, analysis in enumerate(emotion_analyses)
+        ]
+
+    @classmethod
+    def score_sessions(cls, sessions, emotion_arrays=None):
+        """
+        Score the non-LLM metrics of many sessions at once.
         
-        # Count keyword occurrences
-        keyword_counts = {keyword: 0 for keyword in keywords}
-        total_words = 0
+        Args:
+            sessions: List of session_data dicts
+            emotion_arrays: Optional list of per-session emotion value arrays
+            
+        Returns:
+            List of dicts with emotion_metrics and answer_quality for each session
+        """
+        emotion_metrics = cls.calculate_emotion_metrics_batch(
+            [session.get('emotion_analysis', {}) for session in sessions], emotion_arrays
+        )
+        return [
+            {
+                "session_id": session.get('session_id'),
+                "emotion_metrics": metrics,
+                "answer_quality": cls.calculate_answer_quality(session.get('responses', {}))
+            }
+            for session, metrics in zip(sessions, emotion_metrics)
+        ]
+
+    @staticmethod
+    def calculate_keywords_usage(responses, role, stemming=None):
+        """Calculate usage of role-relevant keywords"""
+        return InterviewEvaluator.calculate_keywords_usage_batch([responses], [role], stemming)[0]
+
+    @staticmethod
+    def calculate_keywords_usage_batch(responses_list, roles, stemming=None):
+        """
+        Calculate keyword usage for many sessions at once.
         
-        for response in responses:
-            if isinstance(response, dict):
-                answer = response.get('answer', '').lower()
-                if answer:
-                    total_words += len(answer.split())
-                    for keyword in keywords:
-                        keyword_counts[keyword] += answer.count(keyword.lower())
+        Each role's keyword dictionary (from config.ROLE_KEYWORDS_FILE) is compiled
+        once into a single-pass matcher and reused for every answer of that role.
         
-        # Calculate keyword density
-        keyword_density = sum(keyword_counts.values()) / total_words if total_words else 0
+        Args:
+            responses_list: List of per-session responses (dict or list)
+            roles: List of roles, aligned with responses_list
+            stemming: Match stemmed word forms (defaults to config.KEYWORD_STEMMING)
+            
+        Returns:
+            List of keywords_usage dicts
+        """
+        results = []
+        for responses, role in zip(responses_list, roles):
+            # If responses is a dictionary (with question numbers as keys), convert it to a list of values
+            if isinstance(responses, dict):
+                responses = list(responses.values())
+            
+            matcher = get_role_matcher(role, stemming)
+            answers = [
+                response.get('answer', '') or ''
+                for response in responses if isinstance(response, dict)
+            ]
+            
+            # Count keyword occurrences
+            keyword_counts = dict.fromkeys(matcher.keywords, 0)
+            total_words = 0
+            for answer, counts in zip(answers, matcher.count_batch(answers)):
+                total_words += len(answer.split())
+                for keyword, count in counts.items():
+                    keyword_counts[keyword] += count
+            
+            # Calculate keyword density
+            keyword_density = sum(keyword_counts.values()) / total_words if total_words else 0
+            
+            results.append({
+                "keyword_counts": keyword_counts,
+                "keyword_density": keyword_density,
+                "relevance_score": min(100, keyword_density * 500)  # Scale up for readability
+            })
         
-        return {
-            "keyword_counts": keyword_counts,
-            "keyword_density": keyword_density,
-            "relevance_score": min(100, keyword_density * 500)  # Scale up for readability
-        }
+        return results
+
+    @staticmethod
+    def session_role(responses):
+        """The role a session is evaluated for: the first one found in its responses, or "candidate"."""
+        if isinstance(responses, dict):
+            responses = list(responses.values())
+        for response in responses or []:
+            if isinstance(response, dict) and 'role' in response:
+                return response.get('role') or "candidate"
+        return "candidate"
         
-    async def evaluate_answer(self, question_data, emotion_data=None, role="candidate") -> Dict:
+    async def evaluate_answer(self, question_data, emotion_data=None, role="candidate", raise_errors=False) -> Dict:
         """
         Evaluate a single interview answer using AI.
         
@@ -208,6 +318,7 @@ class InterviewEvaluator:
             question_data: Dictionary containing question and answer data
             emotion_data: Dictionary containing emotion analysis for this question (optional)
             role: The role the candidate is interviewing for
+            raise_errors: Raise if the evaluation fails instead of returning a zero-score placeholder
             
         Returns:
             Dictionary with evaluation metrics
@@ -265,7 +376,7 @@ class InterviewEvaluator:
             if not self.llm:
                 raise ValueError("LLM is not initialized")
                 
-            response = self.llm.invoke(prompt)
+            response = await invoke_gemini(self.llm, prompt, purpose="evaluation")
             
             # Log the response for debugging
             logger.debug(f"Raw LLM response: {response.content}")
@@ -295,82 +406,32 @@ class InterviewEvaluator:
             
         except Exception as e:
             logger.error(f"Error evaluating answer for question {question_number}: {str(e)}")
-            return {
-                "question_number": question_number,
-                "question_textr": question,
-                "answer": answer,
-                "answer_score": 0,
-                "completeness": 0, 
-                "relevance": 0,
-                "structure": 0,
-                "key_strengths": ["Unable to evaluate"],
-                "improvement_areas": ["Technical difficulties during evaluation"],
-                "emotional_assessment": "Unable to assess",
-                "ideal_keywords": [],
-                "missing_elements": "Evaluation unavailable",
-                "timestamp": datetime.now().isoformat()
-            }
+            if raise_errors:
+                raise
+            return self.fallback_answer_evaluation(question_data)
 
-    @classmethod
-    async def evaluate_interview_data(cls, interview_data, role="candidate"):
-        """Main function to evaluate interview data with AI-powered answer analysis"""
-        evaluator = cls()
-        
-        # Extract response data
-        responses = interview_data.get('responses', {})  # Use {} as default for dict
-        emotion_analysis = interview_data.get('emotion_analysis', {})
-        
-        # Get role and other metadata
-        role = None
-        if isinstance(responses, dict):
-            # Try to find role in any of the dictionary values
-            for response_value in responses.values():
-                if isinstance(response_value, dict) and 'role' in response_value:
-                    role = response_value.get('role')
-                    break
-        elif isinstance(responses, list):
-            # Original code for when responses is a list
-            for response in responses:
-                if isinstance(response, dict) and 'role' in response:
-                    role = response.get('role')
-                    break
-        
-        # Use default role if none found
-        role = role or "candidate"
-        
-        # Calculate traditional metrics
-        emotion_metrics = {
-            "confidence_score": emotion_analysis.get('average_confidence', 0),
-            "emotional_balance": evaluator.calculate_emotional_balance(emotion_analysis.get('average_emotions', {})),
-            "engagement_score": evaluator.calculate_engagement_score(emotion_analysis),
-            "stress_indicator": evaluator.calculate_stress_indicator(emotion_analysis.get('average_emotions', {}))
+    @staticmethod
+    def fallback_answer_evaluation(question_data):
+        """Zero-score placeholder for an answer that could not be evaluated"""
+        return {
+            "question_number": question_data.get('question_number', 0),
+            "question_textr": question_data.get('question_text', ''),
+            "answer": question_data.get('answer', ''),
+            "answer_score": 0,
+            "completeness": 0, 
+            "relevance": 0,
+            "structure": 0,
+            "key_strengths": ["Unable to evaluate"],
+            "improvement_areas": ["Technical difficulties during evaluation"],
+            "emotional_assessment": "Unable to assess",
+            "ideal_keywords": [],
+            "missing_elements": "Evaluation unavailable",
+            "timestamp": datetime.now().isoformat()
         }
-        
-        answer_quality = evaluator.calculate_answer_quality(responses)
-        keywords_usage = evaluator.calculate_keywords_usage(responses, role)
-        
-        # Perform AI-based evaluations for each response
-        response_evaluations = []
-        if isinstance(responses, dict):
-            response_list = list(responses.values())
-        else:
-            response_list = responses
-        
-        for question_data in response_list:
-            if isinstance(question_data, dict):
-                # Only evaluate if there's actually an answer
-                if question_data.get('answer'):
-                    try:
-                        evaluation = await evaluator.evaluate_answer(
-                            question_data=question_data,
-                            emotion_data=emotion_analysis,
-                            role=role
-                        )
-                        response_evaluations.append(evaluation)
-                    except Exception as e:
-                        logger.error(f"Error in individual question evaluation: {str(e)}")
-        
-        # Aggregate AI evaluation results
+
+    @staticmethod
+    def aggregate_answer_evaluations(response_evaluations):
+        """Aggregate the individual answer evaluations into the ai_evaluation metrics"""
         ai_evaluation_metrics = {
             "answer_scores": [],
             "average_completeness": 0,
@@ -416,8 +477,12 @@ class InterviewEvaluator:
             ai_evaluation_metrics["common_improvement_areas"] = list(set(ai_evaluation_metrics["common_improvement_areas"]))[:5]
             ai_evaluation_metrics["missing_keywords"] = list(set(ai_evaluation_metrics["missing_keywords"]))[:10]
         
-        # Calculate AI-enhanced overall score (incorporating AI evaluations)
-        if response_evaluations:
+        return ai_evaluation_metrics
+
+    @staticmethod
+    def calculate_overall_score(emotion_metrics, answer_quality, keywords_usage, ai_evaluation_metrics):
+        """Overall score: AI-enhanced if answers were evaluated, otherwise the traditional score alone"""
+        if ai_evaluation_metrics["answer_scores"]:
             ai_score_component = sum(ai_evaluation_metrics["answer_scores"]) / len(ai_evaluation_metrics["answer_scores"])
             ai_score_weight = 0.4  # Adjust weight as needed
             
@@ -431,28 +496,131 @@ class InterviewEvaluator:
             )
             
             traditional_weight = 1 - ai_score_weight
-            overall_score = (traditional_score_component * traditional_weight) + (ai_score_component * ai_score_weight)
+            return (traditional_score_component * traditional_weight) + (ai_score_component * ai_score_weight)
+        
+        # Fall back to traditional scoring if no AI evaluations
+        return (
+            emotion_metrics['confidence_score'] * 0.15 +
+            emotion_metrics['emotional_balance'] * 0.15 +
+            emotion_metrics['engagement_score'] * 0.1 -
+            emotion_metrics['stress_indicator'] * 0.05 +
+            answer_quality['overall_quality'] * 0.4 +
+            keywords_usage.get('relevance_score', 0) * 0.15
+        )
+
+    @classmethod
+    async def evaluate_interview_data(cls, interview_data, role="candidate", emotion_arrays=None,
+                                      answer_evaluations=None):
+        """
+        Main function to evaluate interview data with AI-powered answer analysis.
+        
+        The evaluation is a graph of stages (interview_core/stage_graph.py): the
+        emotion, answer quality, keyword and duration metrics run on the
+        thread pool while the answers are evaluated by the LLM concurrently,
+        then the results are aggregated and scored. A stage that fails or
+        times out is replaced by its fallback (zero metrics, or the
+        "Unable to evaluate" placeholder for an answer), and the stages'
+        status and timings are reported in the report's metadata.
+        
+        emotion_arrays optionally provides the per-emotion frame values as arrays,
+        so they don't have to be extracted from the per-frame dicts again.
+        
+        answer_evaluations optionally provides the answers' background
+        evaluations (interview_core/answer_evaluations.py); only the answers without
+        an up-to-date one are evaluated here.
+        """
+        started = time.perf_counter()
+        
+        # Extract response data
+        responses = interview_data.get('responses', {})  # Use {} as default for dict
+        emotion_analysis = interview_data.get('emotion_analysis', {})
+        
+        # Get role and other metadata
+        role = cls.session_role(responses)
+        
+        if isinstance(responses, dict):
+            response_list = list(responses.values())
         else:
-            # Fall back to traditional scoring if no AI evaluations
-            overall_score = (
-                emotion_metrics['confidence_score'] * 0.15 +
-                emotion_metrics['emotional_balance'] * 0.15 +
-                emotion_metrics['engagement_score'] * 0.1 -
-                emotion_metrics['stress_indicator'] * 0.05 +
-                answer_quality['overall_quality'] * 0.4 +
-                keywords_usage.get('relevance_score', 0) * 0.15
+            response_list = responses
+        
+        # Only evaluate if there's actually an answer
+        answered = [
+            question_data for question_data in response_list
+            if isinstance(question_data, dict) and question_data.get('answer')
+        ]
+        
+        # The LLM client is only created if an answer has to be evaluated here
+        evaluator = None
+        
+        async def evaluate(question_data):
+            nonlocal evaluator
+            if answer_evaluations is not None:
+                evaluation = await answer_evaluations.result(interview_data.get('session_id'), question_data, role)
+                if evaluation is not None:
+                    return evaluation
+                ANSWER_EVALUATIONS.labels(source='inline').inc()
+            if evaluator is None:
+                evaluator = cls()
+            return await evaluator.evaluate_answer(
+                question_data=question_data,
+                emotion_data=emotion_analysis,
+                role=role
             )
         
+        cpu_timeout = config.EVALUATION_CPU_TIMEOUT_SECONDS
+        # Keyed by position: question numbers may be missing or repeated
+        answer_stages = [
+            Stage(f"answer:{index}", partial(evaluate, question_data),
+                  kind='async', timeout=config.EVALUATION_LLM_TIMEOUT_SECONDS,
+                  fallback=partial(cls.fallback_answer_evaluation, question_data))
+            for index, question_data in enumerate(answered)
+        ]
+        results, timings = await run_stage_graph([
+            # Calculate traditional metrics
+            Stage('emotion_metrics', partial(cls.calculate_emotion_metrics, emotion_analysis, emotion_arrays),
+                  timeout=cpu_timeout, fallback=lambda: {
+                      "confidence_score": 0, "emotional_balance": 0, "engagement_score": 0, "stress_indicator": 0
+                  }),
+            Stage('answer_quality', partial(cls.calculate_answer_quality, responses),
+                  timeout=cpu_timeout, fallback=partial(cls.calculate_answer_quality, [])),
+            Stage('keywords_usage', partial(cls.calculate_keywords_usage, responses, role),
+                  timeout=cpu_timeout, fallback=lambda: {
+                      "keyword_counts": {}, "keyword_density": 0, "relevance_score": 0
+                  }),
+            Stage('interview_duration', partial(cls.calculate_interview_duration, responses),
+                  kind='inline', fallback=lambda: 0),
+            # AI-based evaluations of each response
+            *answer_stages,
+            Stage('ai_evaluation', lambda *evaluations: cls.aggregate_answer_evaluations(list(evaluations)),
+                  requires=[stage.name for stage in answer_stages], kind='inline',
+                  fallback=partial(cls.aggregate_answer_evaluations, [])),
+            Stage('overall_score', cls.calculate_overall_score,
+                  requires=('emotion_metrics', 'answer_quality', 'keywords_usage', 'ai_evaluation'),
+                  kind='inline', fallback=lambda: 0),
+        ])
+        
         # Comprehensive evaluation report
         comprehensive_report = {
-            "overall_score": min(100, max(0, overall_score)),
-            "emotion_metrics": emotion_metrics,
-            "answer_quality": answer_quality,
-            "keywords_usage": keywords_usage,
-            "interview_duration_seconds": evaluator.calculate_interview_duration(responses),
-            "ai_evaluation": ai_evaluation_metrics,
-            "detail_evaluations": response_evaluations,  # Include individual question evaluations
-            "timestamp": datetime.now().isoformat()
+            "overall_score": min(100, max(0, results['overall_score'])),
+            "emotion_metrics": results['emotion_metrics'],
+            "answer_quality": results['answer_quality'],
+            "keywords_usage": results['keywords_usage'],
+            "interview_duration_seconds": results['interview_duration'],
+            "ai_evaluation": results['ai_evaluation'],
+            "detail_evaluations": [results[stage.name] for stage in answer_stages],  # Include individual question evaluations
+            "timestamp": datetime.now().isoformat(),
+            "metadata": {
+                "seconds": round(time.perf_counter() - started, 4),
+                "degraded_stages": [name for name, timing in timings.items() if timing['status'] != 'ok'],
+                "stages": timings
+            }
         }
         
-        return comprehensive_report
\ No newline at end of file
+        return comprehensive_report
+
+
+# Background evaluations of the answers, shared by the interview flow and the
+# socket/HTTP handlers that save answers
+answer_evaluations = AnswerEvaluations(InterviewEvaluator,
+                                        lambda session_id: config.session_data_stores.get(session_id))
+ANSWER_EVALUATIONS_PENDING.callback = answer_evaluations.__len__
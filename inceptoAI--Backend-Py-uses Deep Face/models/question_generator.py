@@ -1,18 +1,15 @@
 # models/question_generator.py
 from typing import List, Dict
-from langchain_google_genai import ChatGoogleGenerativeAI
 from decouple import config
 import json
 import os
-from tenacity import retry, stop_after_attempt, wait_exponential
-import asyncio
+
+from utils.gemini import create_gemini_llm, invoke_gemini
 
 class QuestionGenerator:
     def __init__(self):
         """Initialize the Gemini-powered question generator."""
-        api_key = config("GOOGLE_GEMINI_API_KEY")
-        model_name = config("GOOGLE_GEMINI_MODEL_NAME")
-        self.llm = ChatGoogleGenerativeAI(model=model_name, google_api_key=api_key)
+        self.llm = create_gemini_llm()
         
         # Create and use cache directory consistently
         self.cache_dir = os.path.join(os.getcwd(), "question")
@@ -20,9 +17,15 @@ class QuestionGenerator:
             os.makedirs(self.cache_dir)
         self.questions_cache = os.path.join(self.cache_dir, "questions_cache.json")
         
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    async def generate_questions(self, role: str, company: str, question_number: int = 1) -> str:
-        """Generate role-specific interview questions using Gemini AI."""
+    async def generate_questions(self, role: str, company: str, question_number: int = 1, session_id: str = None) -> str:
+        """
+        Generate role-specific interview questions using Gemini AI.
+        
+        Sessions asking for the same question at the same time share one
+        call, spread over LLM_COALESCE_VARIANTS calls by session_id. Rate
+        limits and transient errors are handled by the LLM scheduler, which
+        serves question generation before evaluations.
+        """
         interview_prompt = f"""
         You are an experienced technical interviewer at {company} conducting an interview for a {role} position.
         This is question {question_number} out of 5.
@@ -33,9 +36,8 @@ class QuestionGenerator:
         """
         
         try:
-            # Since we're using async, we need to use an asyncio executor for non-async operations
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, lambda: self.llm.invoke(interview_prompt))
+            # Native async call, so the requests of concurrent interviews overlap
+            response = await invoke_gemini(self.llm, interview_prompt, purpose="question", session_id=session_id)
             question = response.content
             
             # Cache the generated question
@@ -50,7 +52,6 @@ class QuestionGenerator:
                 return cached
             raise e
             
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def evaluate_answer(self, question: str, answer: str, role: str) -> Dict:
         """Evaluate interview answer using Gemini AI."""
         prompt = f"""
@@ -74,9 +75,8 @@ class QuestionGenerator:
         """
         
         try:
-            # Since we're using async, we need to use an asyncio executor for non-async operations
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, lambda: self.llm.invoke(prompt))
+            # Native async call, so the requests of concurrent interviews overlap
+            response = await invoke_gemini(self.llm, prompt, purpose="evaluation")
             # Parse the response content as JSON
             return json.loads(response.content)
             
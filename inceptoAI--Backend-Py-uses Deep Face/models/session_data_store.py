@@ -1,17 +1,32 @@
-import os
-import json
 import time
 import logging
-import threading
-import queue
-import numpy as np
 from datetime import datetime
+from functools import partial
 
-from deepface import DeepFace
-from utils.json_encoder import NumpyEncoder
+from models.emotion_index import EmotionFrameIndex
+from interview_core.session_snapshot import SessionSnapshot
+from interview_core.analyzers import create_analyzer
+from interview_core.analyzers.warmup import model_warmup
+from interview_core.metrics import (
+    FRAME_QUEUE_DEPTH, FRAME_STAGE_SECONDS, FRAMES_DROPPED, FRAMES_FAILED, FRAMES_NO_FACE, FRAMES_PROCESSED,
+    FRAMES_RECEIVED
+)
+from interview_core.tracing import StageTimer
+from interview_core.offload import cpu_slots, os_queue, os_threading
+from interview_core.logging_setup import RateLimitedLog
 
 logger = logging.getLogger(__name__)
 
+# Per-stage latency histograms, bound once for the frame hot path. Analyzers
+# that detect faces inside their model (DEEPFACE_DETECTION=deepface) report no
+# 'detect' stage.
+STAGE_SECONDS = {
+    stage: FRAME_STAGE_SECONDS.labels(stage=stage) for stage in ('decode', 'detect', 'classify', 'record')
+}
+# Trace span names that differ from the stage name
+STAGE_SPANS = {'decode': 'jpeg_decode'}
+FRAMES_QUEUE_FULL = FRAMES_DROPPED.labels(reason='queue_full')
+
 def check_logging_config():
     """Print current logging configuration to diagnose issues."""
     root_logger = logging.getLogger()
@@ -38,6 +53,11 @@ class SessionDataStore:
         
         self.session_id = session_id
         self.logger = logging.getLogger('session_data_store')
+        # Per-frame messages go through here so they cannot flood the console
+        self.frame_log = RateLimitedLog(self.logger, session_id=session_id)
+        
+        # Frame analyzer selected by config.EMOTION_ANALYZER
+        self.analyzer = create_analyzer()
         
         # Initialize session data structure
         self.session_data = {
@@ -85,12 +105,47 @@ class SessionDataStore:
         #     }
         # }
         
+        # Columnar index over recorded frames, used to answer range/delta queries
+        self.frame_index = EmotionFrameIndex()
+        
+        # Readers get the latest published snapshot and never lock; writers
+        # change session_data under _write_lock and publish (see SessionSnapshot)
+        self._write_lock = os_threading.Lock()
+        self._snapshot = SessionSnapshot(self.session_data)
+        
         # Initialize frame processing components for emotion analysis
         self.is_running = False
-        self.frame_queue = queue.Queue()
+        self.frame_queue = os_queue.Queue(maxsize=config.FRAME_QUEUE_MAXSIZE)
         self.analysis_thread = None
+        
+        # Live metrics, read by the live metrics emitter without locking.
+        # Each counter has a single writer thread.
+        self.frames_received = 0     # Written by add_frame
+        self.frames_overflowed = 0   # Written by add_frame
+        self.frames_processed = 0    # Written by the analysis worker
+        self.frames_failed = 0       # Written by the analysis worker
+        self.smoothed_emotions = {}
+        self.smoothed_confidence = 0.0
+        self.last_frame_id = None
+        self.last_question = None
+        self.live_version = 0
+        self.smoothing = config.LIVE_METRICS_SMOOTHING
 
     
+    # ========== Snapshots ==========
+    
+    def snapshot(self):
+        """The latest published SessionSnapshot of this session."""
+        return self._snapshot
+    
+    def _publish(self):
+        """Publish the current session_data as a new snapshot. Callers hold _write_lock."""
+        self._snapshot = SessionSnapshot(self.session_data, self._snapshot.version + 1)
+    
+    def _set_response(self, question_key, response):
+        """Copy-on-write update of one response. Callers hold _write_lock."""
+        self.session_data['responses'] = {**self.session_data['responses'], question_key: response}
+    
     # ========== Question-Answer Methods ==========
     
     def save_response(self, data, client_id=None):
@@ -109,40 +164,46 @@ class SessionDataStore:
             timestamp = data.get('timestamp', datetime.now().isoformat())
             self.logger.info(f"Saving response for question {question_number}: {answer}")
             
-            # Check if we already have an entry for this question
             question_key = str(question_number)
-            existing_data = self.session_data['responses'].get(question_key, {})
-            
-            # Get video analysis data from the data parameter or existing data
-            video_analysis = data.get('videoAnalysis') or data.get('video_analysis') or existing_data.get('video_analysis', {})
+            posted_video_analysis = data.get('videoAnalysis') or data.get('video_analysis')
             
             # If video_analysis data is not provided in the data parameter,
             # check if it can be extracted from the video frames for this question
-            if not video_analysis:
+            # (before taking the lock: this can be slow)
+            frames_video_analysis = {}
+            if not posted_video_analysis:
                 # Attempt to get video analysis data for this question from frames
                 try:
                     # This assumes there's a method to get video analysis from frames
                     # that were already captured for this question
-                    video_analysis = self.get_video_analysis_for_question(question_number)
-                    if video_analysis:
+                    frames_video_analysis = self.get_video_analysis_for_question(question_number)
+                    if frames_video_analysis:
                         self.logger.info(f"Retrieved video analysis for question {question_number}")
                 except Exception as video_err:
                     self.logger.warning(f"Could not retrieve video analysis: {str(video_err)}")
             
-            # Format the data, including any video_analysis we found
-            formatted_data = {
-                'question_number': question_number,
-                'question_text': question_text,
-                'answer': answer,
-                'timestamp': timestamp,
-                'server_received_at': datetime.now().isoformat(),
-                'speech_analysis': data.get('speechAnalysis') or data.get('speech_analysis', {}),
-                'video_analysis': video_analysis,
-            }
-            
-            # Add to session data
-            self.session_data['responses'][question_key] = formatted_data
-            self.session_data['updated_at'] = datetime.now().isoformat()
+            # Add to session data. The existing entry is read under the lock, so
+            # a concurrent update of this question's video analysis is not lost
+            with self._write_lock:
+                # Check if we already have an entry for this question
+                existing_data = self.session_data['responses'].get(question_key, {})
+                
+                # Get video analysis data from the data parameter, existing data or frames
+                video_analysis = posted_video_analysis or existing_data.get('video_analysis') or frames_video_analysis
+                
+                # Format the data, including any video_analysis we found
+                formatted_data = {
+                    'question_number': question_number,
+                    'question_text': question_text,
+                    'answer': answer,
+                    'timestamp': timestamp,
+                    'server_received_at': datetime.now().isoformat(),
+                    'speech_analysis': data.get('speechAnalysis') or data.get('speech_analysis', {}),
+                    'video_analysis': video_analysis,
+                }
+                self._set_response(question_key, formatted_data)
+                self.session_data['updated_at'] = datetime.now().isoformat()
+                self._publish()
             
             return {
                 'status': 'success',
@@ -162,25 +223,28 @@ class SessionDataStore:
         """Update the video analysis data for a specific question."""
         try:
             question_key = str(question_number)
-            if question_key not in self.session_data['responses']:
-                self.logger.warning(f"Question {question_number} not found for video analysis update")
-                # Get question text from data if available
-                question_text = data.get('question_text') or data.get('questionText', f"Question {question_number}")
-                
-                # Create a placeholder entry if question doesn't exist yet
-                self.session_data['responses'][question_key] = {
-                    'question_number': question_number,
-                    'question_text': question_text,  # Use the provided question text
-                    'answer': '',
-                    'timestamp': datetime.now().isoformat(),
-                    'server_received_at': datetime.now().isoformat(),
-                    'speech_analysis': {},
-                    'video_analysis': {},
-                    "aisui":{}
-                }
+            with self._write_lock:
+                response = self.session_data['responses'].get(question_key)
+                if response is None:
+                    self.logger.warning(f"Question {question_number} not found for video analysis update")
+                    # Get question text from data if available
+                    question_text = data.get('question_text') or data.get('questionText', f"Question {question_number}")
                     
-            # Update the video analysis data
-            self.session_data['responses'][question_key]['video_analysis'] = video_analysis_data
+                    # Create a placeholder entry if question doesn't exist yet
+                    response = {
+                        'question_number': question_number,
+                        'question_text': question_text,  # Use the provided question text
+                        'answer': '',
+                        'timestamp': datetime.now().isoformat(),
+                        'server_received_at': datetime.now().isoformat(),
+                        'speech_analysis': {},
+                        'video_analysis': {},
+                        "aisui":{}
+                    }
+                        
+                # Update the video analysis data
+                self._set_response(question_key, {**response, 'video_analysis': video_analysis_data})
+                self._publish()
             self.logger.info(video_analysis_data)
             
             # Save to file if requested
@@ -203,23 +267,20 @@ class SessionDataStore:
     def get_responses(self):
         """Get all responses from this session."""
         try:
-            # Convert the responses dict to a sorted list
-            responses_list = []
-            for q_num, response in self.session_data['responses'].items():
-                responses_list.append(response)
-            
-            # Sort by question number
-            responses_list.sort(key=lambda x: int(x.get('question_number', 0)))
+            snapshot = self.snapshot()
+            # Responses as a list sorted by question number
+            responses_list = snapshot.responses_list()
             
             return {
                 'status': 'success',
                 'count': len(responses_list),
                 'responses': responses_list,
-                'emotion_analysis': self.session_data.get('emotion_analysis', {}),
-                'speech_analyses': self.session_data.get('speech_analyses', []),
+                'emotion_analysis': snapshot.emotion_analysis(),
+                'speech_analyses': snapshot.speech_analyses,
                 'session_id': self.session_id,
-                'created_at': self.session_data.get('created_at'),
-                'updated_at': self.session_data.get('updated_at')
+                'created_at': snapshot.created_at,
+                'updated_at': snapshot.updated_at,
+                'version': snapshot.version
             }
             
         except Exception as e:
@@ -230,6 +291,25 @@ class SessionDataStore:
                 'message': error_msg
             }
     
+    def set_answer_evaluation(self, question_key, evaluation, fingerprint):
+        """
+        Store the background LLM evaluation of an answer on its response.
+        
+        Args:
+            question_key: Key of the response (its question number as a string)
+            evaluation: The evaluate_answer() result
+            fingerprint: answer_fingerprint() of the response it was computed from
+                (see interview_core/answer_evaluations.py)
+        """
+        with self._write_lock:
+            response = self.session_data['responses'].get(question_key)
+            if response is None:
+                return
+            self._set_response(question_key, {
+                **response, 'evaluation': evaluation, 'evaluation_fingerprint': fingerprint
+            })
+            self._publish()
+    
     # ========== Speech Analysis Methods ==========
     
     def save_speech_analysis(self, analysis_data, client_id=None):
@@ -246,30 +326,34 @@ class SessionDataStore:
             if client_id:
                 analysis_data['client_id'] = client_id
                 
-            # Add unique ID for this analysis
-            analysis_id = f"speech_{len(self.session_data['speech_analyses']) + 1}"
-            analysis_data['analysis_id'] = analysis_id
-            
-            # Add to session data
-            self.session_data['speech_analyses'].append(analysis_data)
-            
-            # If the speech analysis is for a specific question, also update that question's data
-            question_number = analysis_data.get('questionNumber') or analysis_data.get('question_number')
-            if question_number:
-                question_key = str(question_number)
-                if question_key in self.session_data['responses']:
-                    self.session_data['responses'][question_key]['speech_analysis'] = analysis_data
-                else:
-                    # Create a placeholder entry for this question
-                    self.session_data['responses'][question_key] = {
-                        'question_number': question_number,
-                        'question_text': f"Question {question_number}",
-                        'answer': '',
-                        'timestamp': datetime.now().isoformat(),
-                        'server_received_at': datetime.now().isoformat(),
-                        'speech_analysis': analysis_data,
-                        'video_analysis': {}
-                    }
+            with self._write_lock:
+                # Add unique ID for this analysis
+                analysis_id = f"speech_{len(self.session_data['speech_analyses']) + 1}"
+                analysis_data['analysis_id'] = analysis_id
+                
+                # Add to session data
+                self.session_data['speech_analyses'] = [*self.session_data['speech_analyses'], analysis_data]
+                
+                # If the speech analysis is for a specific question, also update that question's data
+                question_number = analysis_data.get('questionNumber') or analysis_data.get('question_number')
+                if question_number:
+                    question_key = str(question_number)
+                    response = self.session_data['responses'].get(question_key)
+                    if response is not None:
+                        response = {**response, 'speech_analysis': analysis_data}
+                    else:
+                        # Create a placeholder entry for this question
+                        response = {
+                            'question_number': question_number,
+                            'question_text': f"Question {question_number}",
+                            'answer': '',
+                            'timestamp': datetime.now().isoformat(),
+                            'server_received_at': datetime.now().isoformat(),
+                            'speech_analysis': analysis_data,
+                            'video_analysis': {}
+                        }
+                    self._set_response(question_key, response)
+                self._publish()
             
             # Save to file
             # self._save_to_file()
@@ -294,7 +378,8 @@ class SessionDataStore:
     
     def _analysis_worker(self):
         """
-        Worker function that runs in a background thread to process video frames.
+        Worker function that runs in a background OS thread to process video frames
+        (never on the eventlet hub, see interview_core.offload).
         This continuously pulls frames from the queue and processes them for emotion analysis.
         """
         self.logger.info("Analysis worker thread started")
@@ -304,10 +389,12 @@ class SessionDataStore:
             try:
                 # Attempt to get a frame from the queue with a timeout
                 try:
-                    frame_data, frame_id, question_number = self.frame_queue.get(timeout=1.0)
+                    frame_data, frame_id, question_number, trace = self.frame_queue.get(timeout=1.0)
                     
                     # Process the frame
-                    self._process_frame(frame_data, frame_id, question_number)
+                    if trace is not None:
+                        trace.mark_dequeued()
+                    self._process_frame(frame_data, frame_id, question_number, trace)
                     
                     # Mark the task as done
                     self.frame_queue.task_done()
@@ -316,7 +403,7 @@ class SessionDataStore:
                     if int(frame_id) % 100 == 0:
                         self.update_emotion_average_results()
                         
-                except queue.Empty:
+                except os_queue.Empty:
                     # No frames in the queue, just continue the loop
                     continue
                     
@@ -345,11 +432,11 @@ class SessionDataStore:
             try:
                 self.frame_queue.get_nowait()
                 self.frame_queue.task_done()
-            except queue.Empty:
+            except os_queue.Empty:
                 break
         
         # Create and start the thread
-        self.analysis_thread = threading.Thread(target=self._analysis_worker)
+        self.analysis_thread = os_threading.Thread(target=self._analysis_worker)
         self.analysis_thread.daemon = True
         self.analysis_thread.start()
         
@@ -375,6 +462,7 @@ class SessionDataStore:
         self.update_emotion_average_results()
         self.save_video_analysis_by_question()
         
+        self.frame_log.flush()
         self.logger.info("Emotion analysis stopped")
         
         return {
@@ -382,9 +470,27 @@ class SessionDataStore:
             "message": "Emotion analysis stopped and final results saved"
         }
     
-    def add_frame(self, frame_data, frame_id, question_number=0):
-        """Add a video frame to the processing queue."""
-        self.frame_queue.put((frame_data, frame_id, question_number))
+    def add_frame(self, frame_data, frame_id, question_number=0, trace=None):
+        """Add a video frame to the processing queue, with its trace if it is sampled."""
+        self.frames_received += 1
+        FRAMES_RECEIVED.inc()
+        FRAME_QUEUE_DEPTH.observe(self.frame_queue.qsize())
+        if trace is not None:
+            trace.mark_enqueued()
+        try:
+            self.frame_queue.put_nowait((frame_data, frame_id, question_number, trace))
+        except os_queue.Full:
+            # Never block the socket handler; drop the frame instead
+            self.frames_overflowed += 1
+            FRAMES_QUEUE_FULL.inc()
+            self.live_version += 1
+            if trace is not None:
+                trace.finish('dropped')
+            return {
+                "status": "error",
+                "message": "Frame dropped: analysis queue is full",
+                "frame_id": frame_id
+            }
         
         # Log periodically to avoid flooding
         if int(frame_id) % 100 == 0:
@@ -395,103 +501,151 @@ class SessionDataStore:
             "frame_id": frame_id
         }
     
-    def _process_frame(self, frame_data, frame_id, question_number):
+    def _process_frame(self, frame_data, frame_id, question_number, trace=None):
         """Process a single frame for emotion analysis."""
+        outcome = 'failed'
+        stage = partial(self._stage, trace=trace)
         try:
+            with cpu_slots:
+                analysis = self.analyzer.analyze_frame(frame_data, stage)
+            if not model_warmup.warm:
+                model_warmup.mark_warm()
+            
+            if analysis is None:
+                self.frame_log.log(logging.WARNING, 'invalid_frame', "Could not decode frame: %s", frame_id)
+                self.frames_failed += 1
+                FRAMES_FAILED.inc()
+                return
             
-            # Convert numpy array if it's not already
-            if isinstance(frame_data, bytes):
-                import cv2
-                nparr = np.frombuffer(frame_data, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            else:
-                frame = frame_data
-                
-            if frame is None:
-                self.logger.warning(f"Could not decode frame: {frame_id}")
-                print(f"WARNING: Could not decode frame: {frame_id}")
+            if analysis.emotions is None:  # No faces detected
+                outcome = 'no_face'
+                self.frame_log.count('no_face', "{count} frames with no face in the last {interval} s")
+                self.frames_processed += 1
+                FRAMES_NO_FACE.inc()
+                FRAMES_PROCESSED.inc()
                 return
             
+            with stage('record'):
+                self._record_frame(frame_id, question_number, analysis.emotions, analysis.confidence)
+            FRAMES_PROCESSED.inc()
+            outcome = 'face'
             
-            # Perform emotion analysis
-            try:
-                result = DeepFace.analyze(
-                    frame, 
-                    actions=['emotion'], 
-                    enforce_detection=False,
-                    silent=True
-                )
-                
-                # DeepFace might return a list or a single result depending on faces found
-                if isinstance(result, list):
-                    if not result:  # Empty list (no faces detected)
-                        print(f"No faces detected in frame: {frame_id}")
-                        self.logger.debug(f"No faces detected in frame: {frame_id}")
-                        return
-                    result = result[0]  # Take the first face
-                
-                # Extract emotion data and convert NumPy types to Python native types
-                emotions = {}
-                for emotion, value in result.get('emotion', {}).items():
-                    # Convert NumPy types to Python native types
-                    emotions[emotion] = float(value)
-                
-                
-                # Record timestamp
-                timestamp = datetime.now().isoformat()
-                
-                # Simple confidence signal estimation (smile + neutral - fear - sad)
-                confidence = (
-                    emotions.get('happy', 0) + 
-                    emotions.get('neutral', 0) * 0.5 - 
-                    emotions.get('fear', 0) - 
-                    emotions.get('sad', 0)
-                )
-                confidence_value = float(max(0, min(100, confidence)))
-                
-                # Force stdout to flush
-                import sys
-                sys.stdout.flush()                
-                
-            except Exception as e:
-                self.logger.error(f"Error in DeepFace analysis: {str(e)}")
-                print(f"ERROR in DeepFace analysis: {str(e)}")
-                self.logger.error(f"Exception details: {type(e).__name__}")
-                import traceback
-                tb = traceback.format_exc()
-                self.logger.error(tb)
-                print(tb)
+            self.frame_log.log(
+                logging.DEBUG, 'frame_result', "Frame %s: Q%s, emotions %s, confidence %.2f",
+                frame_id, question_number, analysis.emotions, analysis.confidence
+            )
                 
         except Exception as e:
-            self.logger.error(f"Error processing frame {frame_id}: {str(e)}")
-            print(f"CRITICAL ERROR processing frame {frame_id}: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            self.frames_failed += 1
+            FRAMES_FAILED.inc()
+            self.frame_log.log(
+                logging.ERROR, 'frame_error', "Error in %s analysis of frame %s: %s", self.analyzer.name, frame_id, e,
+                exc_info=True
+            )
+        finally:
+            if outcome != 'face':
+                # Frames without a recorded result still move the live counters
+                self.live_version += 1
+            if trace is not None:
+                trace.finish(outcome)
+    
+    def _stage(self, name, trace=None):
+        """Time one analysis stage into its latency histogram and the frame's trace."""
+        return StageTimer(STAGE_SECONDS[name], trace, STAGE_SPANS.get(name, name))
+    
+    def _record_frame(self, frame_id, question_number, emotions, confidence_value):
+        """Store the analysis results of one frame in the session data and the frame index."""
+        recorded_at = datetime.now()
+        timestamp = recorded_at.isoformat()
+        emotion_analysis = self.session_data['emotion_analysis']
+        
+        # The lists are append-only, so published snapshots keep their length
+        with self._write_lock:
+            for emotion, value in emotions.items():
+                if emotion in emotion_analysis['detailed_emotions']:
+                    emotion_analysis['detailed_emotions'][emotion].append({
+                        'value': value,
+                        'question': question_number,
+                        'frame_id': frame_id,
+                        'timestamp': timestamp
+                    })
+            
+            emotion_analysis['confidence_signals'].append({
+                'value': confidence_value,
+                'question': question_number,
+                'frame_id': frame_id,
+                'timestamp': timestamp
+            })
+            
+            emotion_analysis['timestamps'].append({
+                'frame_id': frame_id,
+                'question': question_number,
+                'timestamp': timestamp
+            })
+            
+            self.frame_index.append(frame_id, question_number, emotions, confidence_value, recorded_at)
+            self._publish()
+        self._update_live_metrics(frame_id, question_number, emotions, confidence_value)
+    
+    def _update_live_metrics(self, frame_id, question_number, emotions, confidence_value):
+        """Fold one recorded frame into the exponentially smoothed live values."""
+        alpha = self.smoothing
+        previous = self.smoothed_emotions
+        if previous:
+            smoothed = {
+                emotion: previous.get(emotion, value) + alpha * (value - previous.get(emotion, value))
+                for emotion, value in emotions.items()
+            }
+            self.smoothed_confidence += alpha * (confidence_value - self.smoothed_confidence)
+        else:
+            smoothed = dict(emotions)
+            self.smoothed_confidence = confidence_value
+        
+        # Replace rather than mutate so readers always see a complete dict
+        self.smoothed_emotions = smoothed
+        self.last_frame_id = frame_id
+        self.last_question = question_number
+        self.frames_processed += 1
+        self.live_version += 1
+    
+    def get_live_metrics(self):
+        """Compact snapshot of the latest smoothed values, pushed to live metrics subscribers."""
+        return {
+            'session_id': self.session_id,
+            'emotions': {emotion: round(value, 2) for emotion, value in self.smoothed_emotions.items()},
+            'confidence': round(self.smoothed_confidence, 2),
+            'frames_received': self.frames_received,
+            'frames_processed': self.frames_processed,
+            'frames_dropped': self.frames_failed + self.frames_overflowed,
+            'queue_depth': self.frame_queue.qsize(),
+            'last_frame_id': self.last_frame_id,
+            'question': self.last_question,
+            'timestamp': datetime.now().isoformat()
+        }
     
     def update_emotion_analysis(self, analysis_results, save_file=True):
         """Update the emotion analysis data in the session file."""
         try:
             # Check if we're receiving average data or detailed data
             if "average_emotions" in analysis_results:
-                # Update averages directly
-                self.session_data['emotion_analysis']['average_emotions'] = analysis_results.get("average_emotions", {})
-                self.session_data['emotion_analysis']['average_confidence'] = analysis_results.get("average_confidence", 0)
-                
-                # Calculate and update average emotions
+                # Calculate average emotions
                 avg_emotions = {}
                 for emotion, values in analysis_results.get("emotions", {}).items():
                     if values:
                         avg_emotions[emotion] = sum(item["value"] for item in values) / len(values)
                     else:
                         avg_emotions[emotion] = 0
-                        
-                self.session_data['emotion_analysis']['average_emotions'] = avg_emotions
                 
-                # Calculate and update average confidence
+                # Calculate average confidence
+                avg_confidence = analysis_results.get("average_confidence", 0)
                 confidence_values = analysis_results.get("confidence_signals", [])
                 if confidence_values:
                     avg_confidence = sum(item["value"] for item in confidence_values) / len(confidence_values)
+                
+                with self._write_lock:
+                    self.session_data['emotion_analysis']['average_emotions'] = avg_emotions
                     self.session_data['emotion_analysis']['average_confidence'] = avg_confidence
+                    self._publish()
                     
             
             # Save to file if requested
@@ -512,29 +666,68 @@ class SessionDataStore:
             }
     
     def get_emotion_analysis(self):
-        """Get the current emotion analysis results."""
-        return self.session_data["emotion_analysis"]
+        """Get the current emotion analysis results (shared with other readers, do not modify)."""
+        return self.snapshot().emotion_analysis()
+    
+    def query_emotion_analysis(self, question=None, after_frame_id=None, start=None, end=None,
+                               summary_only=False, columnar=False):
+        """
+        Get part of the emotion analysis, served from the frame index.
+        
+        Args:
+            question: Only frames recorded for this question number
+            after_frame_id: Only frames recorded after this frame id
+            start: Only frames recorded at or after this epoch time
+            end: Only frames recorded at or before this epoch time
+            summary_only: Return per-question and overall averages without frames
+            columnar: Return frames as one list per field instead of per-frame dicts
+        """
+        index = self.frame_index
+        
+        if summary_only:
+            return index.summaries(question)
+        
+        snapshot = self.snapshot()
+        rows = index.rows(question=question, after_frame_id=after_frame_id, start=start, end=end)
+        result = {
+            'average_emotions': snapshot.emotion.average_emotions,
+            'average_confidence': snapshot.emotion.average_confidence,
+            'frame_count': len(rows),
+            'last_frame_id': index.frame_ids[rows[-1]] if len(rows) else after_frame_id,
+        }
+        
+        if columnar:
+            result['format'] = 'columnar'
+            result['frames'] = index.columnar(rows)
+        else:
+            result.update(index.detailed(rows))
+        
+        return result
     
     def update_emotion_average_results(self):
         """Calculate and save average emotion values."""
         try:
+            emotion_analysis = self.snapshot().emotion_analysis()
+            
             # Calculate averages
             avg_emotions = {}
-            for emotion, values in self.session_data["emotion_analysis"]["detailed_emotions"].items():
+            for emotion, values in emotion_analysis["detailed_emotions"].items():
                 if values:
                     avg_emotions[emotion] = sum(item["value"] for item in values) / len(values)
                 else:
                     avg_emotions[emotion] = 0
             
             # Calculate average confidence
-            confidence_values = self.session_data["emotion_analysis"]["confidence_signals"]
+            confidence_values = emotion_analysis["confidence_signals"]
             avg_confidence = 0
             if confidence_values:
                 avg_confidence = sum(item["value"] for item in confidence_values) / len(confidence_values)
             
             # Update the session data with this average data
-            self.session_data["emotion_analysis"]["average_emotions"] = avg_emotions
-            self.session_data["emotion_analysis"]["average_confidence"] = avg_confidence
+            with self._write_lock:
+                self.session_data["emotion_analysis"]["average_emotions"] = avg_emotions
+                self.session_data["emotion_analysis"]["average_confidence"] = avg_confidence
+                self._publish()
             
             # Save to file
             # self._save_to_file()
@@ -542,7 +735,7 @@ class SessionDataStore:
             return {
                 "emotions": avg_emotions,
                 "confidence": avg_confidence,
-                "total_frames": len(self.session_data["emotion_analysis"]["timestamps"]),
+                "total_frames": len(emotion_analysis["timestamps"]),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -553,13 +746,14 @@ class SessionDataStore:
     def save_video_analysis_by_question(self):
         """Summarize and save video analysis data by question number."""
         try:
+            emotion_analysis = self.snapshot().emotion_analysis()
+            
             # Group frame analysis by question number
             question_analysis = {}
             
             # Process emotions
-            for emotion, frames in self.session_data["emotion_analysis"]["detailed_emotions"].items():
+            for emotion, frames in emotion_analysis["detailed_emotions"].items():
                 
-                logger.info(frames)
                 for frame_data in frames:
                     question_num = str(frame_data["question"])
                     if question_num not in question_analysis:
@@ -576,7 +770,7 @@ class SessionDataStore:
                     question_analysis[question_num]["frame_count"] += 1
             
             # Process confidence
-            for confidence_data in self.session_data["emotion_analysis"]["confidence_signals"]:
+            for confidence_data in emotion_analysis["confidence_signals"]:
                 question_num = str(confidence_data["question"])
                 if question_num in question_analysis:
                     if "confidence_values" not in question_analysis[question_num]:
@@ -4,10 +4,52 @@ from flask import jsonify, request
 import asyncio
 
 import config
+from models.interview_evaluator import answer_evaluations
 from models.session_data_store import SessionDataStore
+from models.emotion_index import parse_time_param
 from utils.questions import load_questions
-from models.question_generator import QuestionGenerator
-from flask import jsonify, request, current_app
+from routes import interview_flow
+from flask import jsonify, request, current_app, Response
+
+from interview_core import metrics
+from interview_core.offload import run_blocking
+from interview_core.analyzers.warmup import model_warmup
+
+
+EMOTION_QUERY_PARAMS = ('question', 'after_frame_id', 'start', 'end', 'summary', 'format')
+
+
+def parse_emotion_query(args):
+    """
+    Build query_emotion_analysis() arguments from request query parameters.
+    
+    Supported parameters:
+    - after_frame_id: Only frames recorded after this frame id
+    - start / end: Time range, as epoch seconds or ISO timestamps
+    - question: Only frames for this question number
+    - summary: If true, return summaries only
+    - format: 'rows' (default) or 'columnar'
+    
+    Returns None when no query parameter is given. Raises ValueError on invalid values.
+    """
+    if not any(name in args for name in EMOTION_QUERY_PARAMS):
+        return None
+    
+    output_format = args.get('format', 'rows')
+    if output_format not in ('rows', 'columnar'):
+        raise ValueError(f"Unsupported format: {output_format}")
+    
+    question = args.get('question')
+    after_frame_id = args.get('after_frame_id')
+    
+    return {
+        'question': int(question) if question not in (None, '') else None,
+        'after_frame_id': int(after_frame_id) if after_frame_id not in (None, '') else None,
+        'start': parse_time_param(args.get('start')),
+        'end': parse_time_param(args.get('end')),
+        'summary_only': args.get('summary', '').lower() in ('1', 'true', 'yes'),
+        'columnar': output_format == 'columnar'
+    }
 
 
 def register_http_routes(app):
@@ -17,19 +59,48 @@ def register_http_routes(app):
         return jsonify({
             'status': 'online',
             'session_id': config.SESSION_ID,
-            'clients': list(app.socketio.server.sockets.keys()),
+            'clients': list(app.socket_server.eio.sockets.keys()),
             'active_data_stores': list(config.session_data_stores.keys()),
             'timestamp': datetime.now().isoformat()
         })
 
+    @app.route('/ready')
+    def ready():
+        """Readiness check: whether the analyzer model is loaded (warm) or still cold"""
+        warmup = model_warmup.snapshot()
+        # Without a startup warm-up the first frame loads the model, so a cold model is not a reason to wait
+        is_ready = model_warmup.warm or (not config.MODEL_WARMUP and warmup['state'] == 'cold')
+        return jsonify({
+            'status': 'ready' if is_ready else 'not_ready',
+            'model': warmup,
+            'timestamp': datetime.now().isoformat()
+        }), 200 if is_ready else 503
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Operational metrics in the Prometheus text exposition format"""
+        return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
+
     @app.route('/analysis/<client_id>')
     def get_analysis(client_id):
-        """Endpoint to get the current emotion analysis results for a client"""
+        """
+        Endpoint to get the current emotion analysis results for a client.
+        
+        Accepts the query parameters of parse_emotion_query() to return only part of the data.
+        """
         session_id = f"{client_id}"
-        if session_id in config.session_data_stores:
-            return jsonify(config.session_data_stores[session_id].get_emotion_analysis())
-        else:
+        if session_id not in config.session_data_stores:
             return jsonify({'error': 'Client not found'}), 404
+        
+        try:
+            query = parse_emotion_query(request.args)
+        except ValueError as e:
+            return jsonify({'error': f"Invalid query: {str(e)}"}), 400
+        
+        store = config.session_data_stores[session_id]
+        if query is None:
+            return jsonify(store.get_emotion_analysis())
+        return jsonify(store.query_emotion_analysis(**query))
 
     @app.route('/api/save-audio-analysis', methods=['POST'])
     def save_audio_analysis():
@@ -249,14 +320,16 @@ def register_http_routes(app):
             # Save the response
             store = config.session_data_stores[session_id]
             result = store.save_response(data)
+            answer_evaluations.submit(session_id)
             
             # Update emotion analysis averages if available
             question_number = data.get('questionNumber') or data.get('question_number')
             if question_number:
-                store.update_emotion_average_results()
+                # Both scan every frame of the session: off the hub
+                run_blocking(store.update_emotion_average_results)
                 # Pass the entire data object to have access to question_text
                 # store.save_video_analysis_by_question(data)
-                store.save_video_analysis_by_question()
+                run_blocking(store.save_video_analysis_by_question)
             
             if result['status'] == 'success':
                 return jsonify(result)
@@ -297,8 +370,20 @@ def register_http_routes(app):
     # Add new endpoint for emotion analysis for a specific client/session
     @app.route('/api/emotion-analysis/<session_id>', methods=['GET'])
     def get_emotion_analysis(session_id):
-        """Get emotion analysis data for a session"""
+        """
+        Get emotion analysis data for a session.
+        
+        Accepts the query parameters of parse_emotion_query() to return only part of the data.
+        """
         try:
+            try:
+                query = parse_emotion_query(request.args)
+            except ValueError as e:
+                return jsonify({
+                    "status": "error",
+                    "message": f"Invalid query: {str(e)}"
+                }), 400
+            
             # Check if we have a store for this session
             if session_id not in config.session_data_stores:
                 # Try to create one (it will load data from disk if it exists)
@@ -306,7 +391,10 @@ def register_http_routes(app):
             
             # Get emotion analysis
             store = config.session_data_stores[session_id]
-            result = store.get_emotion_analysis()
+            if query is None:
+                result = store.get_emotion_analysis()
+            else:
+                result = store.query_emotion_analysis(**query)
             
             return jsonify({
                 "status": "success",
@@ -359,7 +447,7 @@ def register_http_routes(app):
             
             # Stop emotion analysis
             store = config.session_data_stores[session_id]
-            result = store.stop_emotion_analysis()
+            result = run_blocking(store.stop_emotion_analysis)
             
             return jsonify(result)
             
@@ -375,243 +463,21 @@ def register_http_routes(app):
     @app.route('/api/generate-question', methods=['POST'])
     async def generate_question():
         """Generate an interview question based on company and role"""
-        try:
-            data = request.json
-            
-            if not data:
-                return jsonify({
-                    "status": "error", 
-                    "message": "No data provided"
-                }), 400
-                
-            company = data.get('company')
-            role = data.get('role')
-            question_number = data.get('questionNumber', 1)
-            client_id = data.get('client_id')
-            
-            
-            if not company or not role:
-                return jsonify({
-                    "status": "error", 
-                    "message": "Company and role are required"
-                }), 400
-                
-            if not client_id:
-                return jsonify({
-                    "status": "error", 
-                    "message": "client_id is required"
-                }), 400
-            
-            # Create question generator
-            question_generator = QuestionGenerator()
-            
-            # Generate question
-            question = await question_generator.generate_questions(role, company, question_number)
-            
-            # Save the question in the session data store (if we want to)
-            session_id = f"{client_id}"
-            if session_id not in config.session_data_stores:
-                config.session_data_stores[session_id] = SessionDataStore(session_id)
-                
-            # Format the question data to match expected format
-            question_data = {
-                "question_number": question_number,
-                "question_text": question,
-                "company": company,
-                "role": role,
-                "client_id": client_id,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            # Store the question (without answer for now)
-            store = config.session_data_stores[session_id]
-            store.save_response(question_data)
-            
-            return jsonify({
-                "status": "success",
-                "question": question,
-                "questionNumber": question_number,
-                "company": company,
-                "role": role
-            })
-            
-        except Exception as e:
-            error_msg = f"Error generating question: {str(e)}"
-            app.logger.error(error_msg)
-            return jsonify({
-                "status": "error",
-                "message": error_msg
-            }), 500
+        payload, status = await interview_flow.generate_question(request.json)
+        return jsonify(payload), status
     
     # New endpoint to generate the next question and save the current answer
     @app.route('/api/next-question', methods=['POST'])
     async def next_question():
         """Generate the next question and save the current answer"""
-        try:
-            data = request.json
-            
-            if not data:
-                return jsonify({
-                    "status": "error", 
-                    "message": "No data provided"
-                }), 400
-                
-            company = data.get('company')
-            role = data.get('role')
-            current_question_number = data.get('questionNumber')
-            next_question_number = current_question_number + 1
-            answer = data.get('answer', '')
-            client_id = data.get('client_id')
-            analysis = data.get('analysis')
-            
-            if not company or not role:
-                return jsonify({
-                    "status": "error", 
-                    "message": "Company and role are required"
-                }), 400
-                
-            if not client_id:
-                return jsonify({
-                    "status": "error", 
-                    "message": "client_id is required"
-                }), 400
-            
-            # Create session ID consistent with WebSocket format
-            session_id = f"{client_id}"
-            
-            # Save the current question and answer
-            if session_id not in config.session_data_stores:
-                config.session_data_stores[session_id] = SessionDataStore(session_id)
-                
-            # Create the question-answer data to save
-            question_answer_data = {
-                "questionNumber": current_question_number,
-                "question_text": data.get('question_text', f"Question {current_question_number}"),
-                "answer": answer,
-                "client_id": client_id,
-                "company": company,
-                "role": role,
-                "timestamp": datetime.now().isoformat(),
-                "speechAnalysis":analysis
-            }
-            
-            # Save the response
-            store = config.session_data_stores[session_id]
-            store.save_response(question_answer_data)
-            
-            # Update emotion analysis if available
-            store.update_emotion_average_results()
-            # store.save_video_analysis_by_question(question_answer_data)
-            store.save_video_analysis_by_question()
-            
-            # Check if we should generate a new question (limit to 5 questions)
-            if next_question_number <= 5:
-                # Generate the next question
-                question_generator = QuestionGenerator()
-                next_question = await question_generator.generate_questions(role, company, next_question_number)
-                
-                # Return both the saved answer confirmation and the next question
-                return jsonify({
-                    "status": "success",
-                    "message": "Answer saved and next question generated",
-                    "nextQuestion": next_question,
-                    "nextQuestionNumber": next_question_number,
-                    "company": company,
-                    "role": role
-                })
-            else:
-                # No more questions
-                return jsonify({
-                    "status": "success",
-                    "message": "Final answer saved",
-                    "complete": True,
-                })
-                
-        except Exception as e:
-            error_msg = f"Error processing next question: {str(e)}"
-            app.logger.error(error_msg)
-            return jsonify({
-                "status": "error",
-                "message": error_msg
-            }), 500
+        payload, status = await interview_flow.next_question(request.json)
+        return jsonify(payload), status
             
     @app.route("/api/complete_interview/<session_id>", methods=['POST'])
     def complete_interview(session_id):
         """Retrieve session data, evaluate the interview, send to another backend, and delete existing files"""
-        try:
-            # Check if we have a store for this session
-            if session_id not in config.session_data_stores:
-                return jsonify({
-                    "status": "error",
-                    "message": f"Session {session_id} not found"
-                }), 404
-                
-            data = request.json
-                
-            store = config.session_data_stores[session_id]
-            
-            # Since the data is already combined, just get the current session data
-            session_data = store.session_data
-            
-            # Step 1: Evaluate the interview data
-            from models.interview_evaluator import InterviewEvaluator
-            evaluation_results = asyncio.run(InterviewEvaluator.evaluate_interview_data(session_data))
-            
-            # Add evaluation results to the session data
-            session_data['evaluation'] = evaluation_results
-            
-            # Step 2: Send the evaluated data to the other endpoint
-            
-                        
-            target_api_url = "http://localhost:3000/api/users/interview/complete/"
-            api_response = None
-            api_success = False
-            
-            session_data["user_id"]=data.get("user_id")
-            session_data["role"]=data.get("role")
-            
-            try:
-                import requests
-                response = requests.post(
-                    target_api_url,
-                    json=session_data,
-                    headers={"Content-Type": "application/json"},
-                    timeout=10  # 10 second timeout
-                )
-                
-                # Handle the response
-                if response.status_code == 200:
-                    app.logger.info(f"Successfully sent interview data to target API")
-                    api_response = response.json()
-                    api_success = True
-                else:
-                    app.logger.warning(f"Target API returned status code: {response.status_code}, Response: {response.text}")
-            except Exception as api_err:
-                app.logger.error(f"Failed to post to target API: {str(api_err)}")
-            
-            # Step 3: Delete the existing data files if API call was successful
-            if api_success:
-                try:
-                    # Use the existing method from store to delete session files
-                    store.delete_session_files()
-                    app.logger.info(f"Deleted session files for {session_id}")
-                except Exception as del_err:
-                    app.logger.error(f"Failed to delete session files: {str(del_err)}")
-            
-            # Return combined results
-            return jsonify({
-                "status": "success" if api_success else "partial_success",
-                "message": "Interview data processed successfully" if api_success else "Data evaluated but API upload failed",
-                "api_response": api_response,
-                "evaluation": evaluation_results
-            })
-            
-        except Exception as e:
-            error_msg = f"Error processing interview data: {str(e)}"
-            app.logger.error(error_msg)
-            import traceback
-            app.logger.error(traceback.format_exc())
-            return jsonify({
-                "status": "error",
-                "message": error_msg
-            }), 500
\ No newline at end of file
+        # The evaluation's scoring is CPU-bound, so the whole flow runs on an OS thread
+        payload, status = run_blocking(
+            asyncio.run, interview_flow.complete_interview(session_id, request.json), name='complete_interview'
+        )
+        return jsonify(payload), status
@@ -0,0 +1,256 @@
+"""
+The interview flow endpoints (generate-question, next-question,
+complete_interview), independent of the framework serving them.
+
+Each handler is a coroutine that takes the request JSON and returns
+(response payload, HTTP status). Flask serves them in eventlet mode
+(routes/http_routes.py) and the ASGI app runs them natively on its event
+loop (asgi.py), where the LLM and upload calls of concurrent requests
+overlap. Work that scans a session's frames goes to a thread.
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+from decouple import config as env_config
+
+import config
+from models.interview_evaluator import answer_evaluations
+from models.question_generator import QuestionGenerator
+from models.session_data_store import SessionDataStore
+from interview_core.outbox import result_outbox
+from interview_core.report_payload import build_report
+
+logger = logging.getLogger(__name__)
+
+
+async def generate_question(data):
+    """Generate an interview question based on company and role"""
+    try:
+        if not data:
+            return {
+                "status": "error",
+                "message": "No data provided"
+            }, 400
+
+        company = data.get('company')
+        role = data.get('role')
+        question_number = data.get('questionNumber', 1)
+        client_id = data.get('client_id')
+
+
+        if not company or not role:
+            return {
+                "status": "error",
+                "message": "Company and role are required"
+            }, 400
+
+        if not client_id:
+            return {
+                "status": "error",
+                "message": "client_id is required"
+            }, 400
+
+        # Create question generator
+        question_generator = QuestionGenerator()
+        session_id = f"{client_id}"
+
+        # Generate question
+        question = await question_generator.generate_questions(role, company, question_number, session_id=session_id)
+
+        # Save the question in the session data store (if we want to)
+        if session_id not in config.session_data_stores:
+            config.session_data_stores[session_id] = SessionDataStore(session_id)
+
+        # Format the question data to match expected format
+        question_data = {
+            "question_number": question_number,
+            "question_text": question,
+            "company": company,
+            "role": role,
+            "client_id": client_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        # Store the question (without answer for now)
+        store = config.session_data_stores[session_id]
+        store.save_response(question_data)
+
+        return {
+            "status": "success",
+            "question": question,
+            "questionNumber": question_number,
+            "company": company,
+            "role": role
+        }, 200
+
+    except Exception as e:
+        error_msg = f"Error generating question: {str(e)}"
+        logger.error(error_msg)
+        return {
+            "status": "error",
+            "message": error_msg
+        }, 500
+
+
+async def next_question(data):
+    """Generate the next question and save the current answer"""
+    try:
+        if not data:
+            return {
+                "status": "error",
+                "message": "No data provided"
+            }, 400
+
+        company = data.get('company')
+        role = data.get('role')
+        current_question_number = data.get('questionNumber')
+        next_question_number = current_question_number + 1
+        answer = data.get('answer', '')
+        client_id = data.get('client_id')
+        analysis = data.get('analysis')
+
+        if not company or not role:
+            return {
+                "status": "error",
+                "message": "Company and role are required"
+            }, 400
+
+        if not client_id:
+            return {
+                "status": "error",
+                "message": "client_id is required"
+            }, 400
+
+        # Create session ID consistent with WebSocket format
+        session_id = f"{client_id}"
+
+        # Save the current question and answer
+        if session_id not in config.session_data_stores:
+            config.session_data_stores[session_id] = SessionDataStore(session_id)
+
+        # Create the question-answer data to save
+        question_answer_data = {
+            "questionNumber": current_question_number,
+            "question_text": data.get('question_text', f"Question {current_question_number}"),
+            "answer": answer,
+            "client_id": client_id,
+            "company": company,
+            "role": role,
+            "timestamp": datetime.now().isoformat(),
+            "speechAnalysis":analysis
+        }
+
+        # Save the response
+        store = config.session_data_stores[session_id]
+        store.save_response(question_answer_data)
+        # Evaluate the answer in the background while the interview goes on
+        answer_evaluations.submit(session_id)
+
+        # Update emotion analysis if available (scans every frame, so off the event loop)
+        await asyncio.to_thread(store.update_emotion_average_results)
+        # store.save_video_analysis_by_question(question_answer_data)
+        await asyncio.to_thread(store.save_video_analysis_by_question)
+
+        # Check if we should generate a new question (limit to 5 questions)
+        if next_question_number <= 5:
+            # Generate the next question
+            question_generator = QuestionGenerator()
+            next_question = await question_generator.generate_questions(role, company, next_question_number, session_id=session_id)
+
+            # Return both the saved answer confirmation and the next question
+            return {
+                "status": "success",
+                "message": "Answer saved and next question generated",
+                "nextQuestion": next_question,
+                "nextQuestionNumber": next_question_number,
+                "company": company,
+                "role": role
+            }, 200
+        else:
+            # No more questions
+            return {
+                "status": "success",
+                "message": "Final answer saved",
+                "complete": True,
+            }, 200
+
+    except Exception as e:
+        error_msg = f"Error processing next question: {str(e)}"
+        logger.error(error_msg)
+        return {
+            "status": "error",
+            "message": error_msg
+        }, 500
+
+
+async def complete_interview(session_id, data):
+    """Retrieve session data, evaluate the interview, send to another backend, and delete existing files"""
+    try:
+        # Check if we have a store for this session
+        if session_id not in config.session_data_stores:
+            return {
+                "status": "error",
+                "message": f"Session {session_id} not found"
+            }, 404
+
+        store = config.session_data_stores[session_id]
+
+        # Since the data is already combined, just take a snapshot of the session;
+        # frames recorded meanwhile are not part of this evaluation
+        snapshot = store.snapshot()
+        session_data = snapshot.to_dict()
+
+        # Step 1: Evaluate the interview data, reusing the answers' background evaluations
+        from models.interview_evaluator import InterviewEvaluator
+        evaluation_results = await InterviewEvaluator.evaluate_interview_data(
+            session_data, emotion_arrays=store.frame_index.emotion_arrays(snapshot.emotion.frames),
+            answer_evaluations=answer_evaluations
+        )
+
+        # Add evaluation results to the session data
+        session_data['evaluation'] = evaluation_results
+
+        # Step 2: Queue the evaluated data for the other endpoint; the outbox
+        # delivers it in the background and retries until it is accepted
+        target_api_url = env_config(
+            "EXPRESS_BACKEND_API_COMPLETE_INTERVIEW",
+            default="http://localhost:3000/api/users/interview/complete/"
+        )
+
+        session_data["user_id"]=data.get("user_id")
+        session_data["role"]=data.get("role")
+
+        upload = None
+        try:
+            report = await asyncio.to_thread(build_report, session_data)
+            upload = await asyncio.to_thread(result_outbox.enqueue, target_api_url, report, session_id)
+        except Exception as outbox_err:
+            logger.error(f"Failed to queue interview data for the target API: {str(outbox_err)}")
+
+        # Step 3: Delete the existing data files once the data is safely queued
+        if upload:
+            try:
+                # Use the existing method from store to delete session files
+                store.delete_session_files()
+                logger.info(f"Deleted session files for {session_id}")
+            except Exception as del_err:
+                logger.error(f"Failed to delete session files: {str(del_err)}")
+
+        # Return combined results
+        return {
+            "status": "success" if upload else "partial_success",
+            "message": "Interview data processed successfully, upload queued" if upload else "Data evaluated but could not be queued for upload",
+            "upload": upload,
+            "evaluation": evaluation_results
+        }, 200
+
+    except Exception as e:
+        error_msg = f"Error processing interview data: {str(e)}"
+        logger.error(error_msg)
+        import traceback
+        logger.error(traceback.format_exc())
+        return {
+            "status": "error",
+            "message": error_msg
+        }, 500
@@ -0,0 +1,60 @@
+from decouple import config
+
+from interview_core.llm_scheduler import llm_scheduler
+from interview_core.metrics import observe_llm_call
+from interview_core.single_flight import llm_single_flight, prompt_key
+
+
+def create_gemini_llm():
+    """
+    Create the Gemini chat model configured in the environment.
+    
+    GOOGLE_GEMINI_API_ENDPOINT optionally points the client at another
+    endpoint, e.g. the fake LLM service used for load testing.
+    """
+    # Imported here so that starting the server does not pay for langchain
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
+    options = {}
+    endpoint = config("GOOGLE_GEMINI_API_ENDPOINT", default="")
+    if endpoint:
+        options['client_options'] = {'api_endpoint': endpoint}
+        options['transport'] = 'rest'
+    
+    # No SDK retries: the LLM scheduler retries, after pausing the model on a 429
+    return ChatGoogleGenerativeAI(
+        model=config("GOOGLE_GEMINI_MODEL_NAME"),
+        google_api_key=config("GOOGLE_GEMINI_API_KEY"),
+        max_retries=0,
+        **options
+    )
+
+
+async def invoke_gemini(llm, prompt, purpose="other", session_id=None):
+    """
+    Call a Gemini chat model, sharing the call with identical ones in flight.
+    
+    The call waits for its slot in the LLM scheduler (rate limits, priority
+    by purpose) and is retried there if it fails transiently.
+    
+    Args:
+        llm: Chat model from create_gemini_llm()
+        prompt: The prompt
+        purpose: Label of the call in the LLM metrics ('question', 'evaluation', ...)
+        session_id: Session the call is for, to spread identical prompts of
+            different sessions over LLM_COALESCE_VARIANTS calls
+    
+    Returns:
+        The model's response message
+    """
+    model = getattr(llm, 'model', None)
+    
+    async def request():
+        with observe_llm_call("gemini", purpose):
+            return await llm.ainvoke(prompt)
+    
+    def call():
+        return llm_scheduler.run("gemini", model, purpose, request)
+    
+    key = prompt_key(prompt, "gemini", model, session_id=session_id)
+    return await llm_single_flight.run(key, call, purpose)
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import threading
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def live_metrics_room(session_id):
+    """Socket.IO room that receives live metrics for a session."""
+    return f"live_metrics:{session_id}"
+
+
+class LiveMetricsEmitter:
+    """
+    Pushes compact live metrics of subscribed sessions over Socket.IO.
+
+    A single background task wakes up `rate_hz` times per second and emits a
+    `live_metrics` event to the room of every subscribed session whose data
+    changed since the last push. It only reads counters that the analysis
+    workers already maintain, so it never blocks frame ingestion.
+
+    `socketio` is a Flask-SocketIO server (eventlet mode) or a python-socketio
+    AsyncServer (ASGI mode), where the task is a coroutine on the event loop.
+    """
+
+    def __init__(self, socketio, rate_hz=None):
+        self.socketio = socketio
+        self.rate_hz = rate_hz or config.LIVE_METRICS_RATE_HZ
+        self._subscriptions = {}   # sid -> set of session ids
+        self._last_sent = {}       # session id -> live_version last pushed
+        self._lock = threading.Lock()
+        self._task = None
+
+    def subscribe(self, sid, session_id):
+        """Subscribe socket `sid` to the live metrics of `session_id`."""
+        with self._lock:
+            self._subscriptions.setdefault(sid, set()).add(session_id)
+            # Make sure the new subscriber gets the current values on the next tick
+            self._last_sent.pop(session_id, None)
+            if self._task is None:
+                is_async = asyncio.iscoroutinefunction(self.socketio.sleep)
+                self._task = self.socketio.start_background_task(self._run_async if is_async else self._run)
+        return live_metrics_room(session_id)
+
+    def unsubscribe(self, sid, session_id=None):
+        """Remove one subscription of `sid`, or all of them if no session is given."""
+        with self._lock:
+            sessions = self._subscriptions.get(sid, set())
+            if session_id is None:
+                sessions.clear()
+            else:
+                sessions.discard(session_id)
+            if not sessions:
+                self._subscriptions.pop(sid, None)
+
+    def _subscribed_sessions(self):
+        with self._lock:
+            return set().union(*self._subscriptions.values()) if self._subscriptions else set()
+
+    def _run(self):
+        interval = 1.0 / self.rate_hz
+        logger.info(f"Live metrics emitter started at {self.rate_hz} Hz")
+
+        while True:
+            self.socketio.sleep(interval)
+            try:
+                for room, metrics in self._updates():
+                    self.socketio.emit('live_metrics', metrics, to=room)
+            except Exception as e:
+                logger.error(f"Error emitting live metrics: {str(e)}")
+
+    async def _run_async(self):
+        interval = 1.0 / self.rate_hz
+        logger.info(f"Live metrics emitter started at {self.rate_hz} Hz")
+
+        while True:
+            await self.socketio.sleep(interval)
+            try:
+                for room, metrics in self._updates():
+                    await self.socketio.emit('live_metrics', metrics, to=room)
+            except Exception as e:
+                logger.error(f"Error emitting live metrics: {str(e)}")
+
+    def _updates(self):
+        """Yield (room, live metrics) for every subscribed session that changed since its last push."""
+        sessions = self._subscribed_sessions()
+
+        # Forget sessions nobody listens to anymore
+        for session_id in list(self._last_sent):
+            if session_id not in sessions:
+                del self._last_sent[session_id]
+
+        for session_id in sessions:
+            store = config.session_data_stores.get(session_id)
+            if store is None:
+                continue
+
+            version = store.live_version
+            if self._last_sent.get(session_id) == version:
+                continue
+
+            self._last_sent[session_id] = version
+            yield live_metrics_room(session_id), store.get_live_metrics()